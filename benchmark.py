@@ -8,14 +8,391 @@
 #    Monday, 25th May 2020 10:43:18 am
 # ....................
 # @description:
-# benchmark of JSP, on size
+# benchmark of the problems, on a seeded grid of sizes
+#  - each case is run in a fresh (spawned) process, so that the peak memory
+#     (ru_maxrss) is of the case only
+#  - the records are saved to JSON, and compared to a baseline
+#
+# usage:
+#   python benchmark.py run --problem jsp --grid small --out bench.json
+#   python benchmark.py compare bench.json baseline.json --tol 0.2
+#   python benchmark.py files data/ta --best-known data/ta/best.txt
+#   python benchmark.py import --out import.json
+#   python benchmark.py formulation
+import argparse
+import json
+import multiprocessing
+import platform
+import resource
+import statistics
+import subprocess
+import sys
+import time
+
 from sched import *
 
+# (jobs, groups, copy, density)
+GRIDS = {
+    'tiny': ((10, 5, 1, 0.8), (10, 5, 2, 0.8)),
+    'small': ((20, 10, 1, 0.8), (20, 10, 3, 0.8),
+              (40, 15, 1, 0.8), (40, 15, 3, 0.8)),
+    'medium': ((60, 15, 1, 0.8), (60, 15, 3, 0.8),
+               (100, 20, 1, 0.8), (100, 20, 3, 0.8)),
+    'large': ((200, 20, 3, 0.8), (500, 20, 3, 0.8), (1000, 20, 3, 0.5)),
+    # (jobs, machines, speeds), of `Parallel`
+    'parallel': ((1000, 20, 1), (1000, 20, 4),
+                 (100000, 200, 1), (100000, 300, 4)),
+}
+
+# metric -> direction, 1 if larger is worse
+METRICS = {
+    'build_time': 1,
+    'solve_time': 1,
+    'extract_time': 1,
+    'first_solution_time': 1,
+    'makespan': 1,
+    'gap': 1,
+    'peak_rss_mb': 1,
+    'import_time': 1,
+}
+
+
+def peak_rss_mb():
+    # ru_maxrss is in KB on linux, in bytes on macOS
+    rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return rss / (1 << 20) if sys.platform == 'darwin' else rss / (1 << 10)
+
+
+def bench_jsp(size, seed, max_sec=10, num_workers=1, **kwargs):
+    """
+    one case of `JSP`
+    :param size: (jobs, groups, copy, density)
+    :return: a record
+    """
+    m, n, p, d = size
+    instance = JSPInstance.rd_instance(m, n, copy=p, density=d, seed=seed)
+    return bench_jsp_instance(instance, max_sec=max_sec,
+                              num_workers=num_workers, **kwargs)
+
+
+def bench_jsp_instance(instance, max_sec=10, num_workers=1, **kwargs):
+    jsp = JSP(instance)
+    first = []
+
+    def on_solution(callback):
+        if not first:
+            first.append(callback.WallTime())
+
+    jsp.cp_create_model(max_sec=max_sec, num_workers=num_workers,
+                        max_sol=10 ** 6, log_search_progress=False,
+                        on_solution=on_solution, **kwargs)
+    stats = jsp.cp_stats
+    makespan = jsp.cp_solution.makespan if jsp.cp_solution else None
+    bound = jsp.cp_solver.BestObjectiveBound()
+    return dict(
+        tasks=instance.n_tasks,
+        machines=int(instance.machine_id.size),
+        variables=stats.counters['variables'],
+        intervals=stats.counters['intervals'],
+        constraints=stats.counters['constraints'],
+        status=stats.counters['status'],
+        build_time=stats.wall('bounds', 'variables', 'constraints',
+                              'index', 'hints'),
+        solve_time=stats.wall('solve'),
+        extract_time=stats.wall('extract'),
+        first_solution_time=first[0] if first else None,
+        makespan=makespan,
+        bound=bound,
+        gap=(makespan - bound) / makespan if makespan else None,
+        phases=stats.phases)
+
+
+def bench_parallel(size, seed, max_sec=10, num_workers=1, **kwargs):
+    """
+    one case of `Parallel`, list scheduling then the cp model
+    :param size: (jobs, machines, speeds)
+    :return: a record
+    """
+    n, m, speeds = size
+    problem = Parallel(*Parallel.rd_instance(n, m, speeds=speeds, seed=seed))
+    _start = time.perf_counter()
+    heuristic = problem.hr_create_sol('best')
+    first_solution_time = time.perf_counter() - _start
+    problem.cp_create_model(warm_start=heuristic, max_sec=max_sec,
+                            num_workers=num_workers, max_sol=10 ** 6,
+                            log_search_progress=False, **kwargs)
+    stats = problem.cp_stats
+    makespan = problem.cp_solution.makespan if problem.cp_solution \
+        else heuristic.makespan
+    bound = max(problem.cp_solver.BestObjectiveBound(),
+                problem.makespan_lb())
+    return dict(
+        tasks=n,
+        machines=m,
+        variables=stats.counters['variables'],
+        constraints=stats.counters['constraints'],
+        status=stats.counters['status'],
+        heuristic=heuristic.makespan,
+        build_time=stats.wall('bounds', 'variables', 'constraints', 'hints'),
+        solve_time=stats.wall('solve'),
+        extract_time=stats.wall('extract'),
+        first_solution_time=first_solution_time,
+        makespan=makespan,
+        bound=bound,
+        gap=(makespan - bound) / makespan if makespan else None,
+        phases=stats.phases)
+
+
+# problem -> function of a case;
+#   a function takes (size, seed, max_sec, num_workers) and returns a record
+PROBLEMS = {
+    'jsp': bench_jsp,
+    'parallel': bench_parallel,
+}
+
+
+def run_case(problem, size, seed, **kwargs):
+    record = PROBLEMS[problem](size, seed, **kwargs)
+    record.update(problem=problem, size=list(size), seed=seed,
+                  peak_rss_mb=peak_rss_mb())
+    return record
+
+
+def run_file(fp, fmt=None, **kwargs):
+    record = bench_jsp_instance(load_benchmark(fp, fmt), **kwargs)
+    record.update(problem='file', size=[os.path.basename(fp)], seed=0,
+                  peak_rss_mb=peak_rss_mb())
+    return record
+
+
+def main(problem='jsp', sizes=GRIDS['small'], seeds=(1,), max_sec=10,
+         num_workers=1, out=None, isolate=True, **kwargs):
+    """
+    run the grid of sizes x seeds
+    :param problem: a key of `PROBLEMS`
+    :param sizes: (jobs, groups, copy, density),
+        or (jobs, machines, speeds) of 'parallel'
+    :param isolate: run each case in a spawned process,
+        otherwise the peak memory is of the whole run
+    :param out: path of the JSON output
+    :return: list of records
+    """
+    if problem not in PROBLEMS:
+        raise ValueError(f"problem: {problem} not in {list(PROBLEMS)}")
+    records = []
+    ctx = multiprocessing.get_context('spawn')
+    for size in sizes:
+        for seed in seeds:
+            args = (problem, tuple(size), seed)
+            kw = dict(max_sec=max_sec, num_workers=num_workers, **kwargs)
+            if isolate:
+                with ctx.Pool(1) as pool:
+                    record = pool.apply(run_case, args, kw)
+            else:
+                record = run_case(*args, **kw)
+            print(json.dumps(record))
+            records.append(record)
+    if out is not None:
+        with open(out, 'w') as f:
+            json.dump(dict(meta=dict(time=time.time(),
+                                     python=platform.python_version(),
+                                     machine=platform.machine(),
+                                     cpu_count=os.cpu_count(),
+                                     max_sec=max_sec,
+                                     num_workers=num_workers),
+                           records=records),
+                      f, indent=2)
+    return records
+
+
+def literature(path, best_known=None, fmt=None, max_sec=10, num_workers=1,
+               out=None):
+    """
+    run the benchmark files of a directory (see `load_benchmark`),
+        each in a spawned process, against the best-known values
+    :param best_known: file of `load_best_known`
+    :param fmt: see `load_benchmark`
+    :return: list of records
+    """
+    best = load_best_known(best_known) if best_known else {}
+    records = []
+    ctx = multiprocessing.get_context('spawn')
+    for name in sorted(os.listdir(path)):
+        fp = os.path.join(path, name)
+        stem = os.path.splitext(name)[0]
+        if not os.path.isfile(fp) or (best and stem not in best):
+            continue
+        try:
+            with ctx.Pool(1) as pool:
+                record = pool.apply(run_file, (fp, fmt),
+                                    dict(max_sec=max_sec,
+                                         num_workers=num_workers))
+        except UnsupportedBenchmarkError as e:
+            print(f"skip {fp}, unsupported: {e}")
+            continue
+        except (ValueError, IndexError) as e:
+            print(f"skip {fp}: {e}")
+            continue
+        lb, ub = best.get(stem, (None, None))
+        record.update(best_lb=lb, best_ub=ub,
+                      gap_to_best=(record['makespan'] - ub) / ub
+                      if ub and record['makespan'] else None)
+        print(json.dumps(record))
+        records.append(record)
+    if out is not None:
+        with open(out, 'w') as f:
+            json.dump(dict(meta=dict(time=time.time(), path=path,
+                                     max_sec=max_sec,
+                                     num_workers=num_workers),
+                           records=records),
+                      f, indent=2)
+    return records
+
+
+def import_time(module='sched', repeat=5, top=10, out=None):
+    """
+    time to import a module in a fresh interpreter (python -X importtime)
+    :param repeat: num of runs, the median is recorded
+    :param top: num of the slowest (cumulative) imports to keep
+    :return: a record
+    """
+    runs = []
+    for _ in range(repeat):
+        proc = subprocess.run([sys.executable, '-X', 'importtime',
+                               '-c', f'import {module}'],
+                              capture_output=True, text=True, check=True)
+        # import time: self [us] | cumulative | imported package
+        cumulative = {}
+        for line in proc.stderr.splitlines():
+            if not line.startswith('import time:') or 'self [us]' in line:
+                continue
+            _, _cumulative, name = line[len('import time:'):].split('|')
+            cumulative[name.strip()] = int(_cumulative) / 1e6
+        runs.append(cumulative)
+    total = statistics.median(r[module] for r in runs)
+    slowest = sorted(runs[-1].items(), key=lambda x: -x[1])[:top]
+    record = dict(problem='import', size=[module], seed=0,
+                  import_time=total, slowest=slowest)
+    print(json.dumps(record))
+    if out is not None:
+        with open(out, 'w') as f:
+            json.dump(dict(meta=dict(time=time.time(),
+                                     python=platform.python_version()),
+                           records=[record]),
+                      f, indent=2)
+    return record
+
+
+def compare(current, baseline, tol=0.2, slack=0.05):
+    """
+    flag the regressions of the current records against the baseline,
+        a metric regresses if it is worse by more than
+        `tol` (relative) and `slack` (absolute)
+    :param current: records, or path of a JSON output
+    :param baseline: records, or path of a JSON output
+    :return: list of regressions
+    """
+    def load(records):
+        if isinstance(records, str):
+            with open(records) as f:
+                records = json.load(f)['records']
+        return {(r['problem'], tuple(r['size']), r['seed']): r
+                for r in records}
+
+    current, baseline = load(current), load(baseline)
+    regressions = []
+    for key, r in current.items():
+        if key not in baseline:
+            continue
+        b = baseline[key]
+        for metric, sign in METRICS.items():
+            new, old = r.get(metric), b.get(metric)
+            if new is None or old is None:
+                if old is not None:
+                    regressions.append(dict(case=key, metric=metric,
+                                            baseline=old, current=new))
+                continue
+            diff = sign * (new - old)
+            if diff > slack and diff > tol * abs(old):
+                regressions.append(dict(case=key, metric=metric,
+                                        baseline=old, current=new))
+    for r in regressions:
+        print(f"regression {r['case']} {r['metric']}: "
+              f"{r['baseline']} -> {r['current']}")
+    missing = baseline.keys() - current.keys()
+    if missing:
+        print(f"cases not run: {sorted(missing)}")
+    print(f"{len(regressions)} regression(s) in {len(current)} case(s)")
+    return regressions
+
+
+def fjsp_formulation(sizes=((20, 10, 3, 0.8), (40, 15, 3, 0.8)),
+                     seed=1, max_sec=30, num_workers=4):
+    """
+    compare the per-machine interval encodings of the flexible JSP,
+        fixed_size=True, optional intervals of the task duration
+        fixed_size=False, variable-size intervals and duration variables
+    :param sizes: (jobs, groups, copy, density)
+    :return: list of result records
+    """
+    records = []
+    for size in sizes:
+        for fixed_size in (False, True):
+            record = run_case('jsp', size, seed, max_sec=max_sec,
+                              num_workers=num_workers,
+                              fixed_size=fixed_size)
+            record['fixed_size'] = fixed_size
+            records.append(record)
+    for r in records:
+        print(r)
+    return records
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description='benchmark of sched')
+    sub = parser.add_subparsers(dest='command', required=True)
+    run = sub.add_parser('run', help='run a grid of cases')
+    run.add_argument('--problem', default='jsp', choices=list(PROBLEMS))
+    run.add_argument('--grid', default='small', choices=list(GRIDS))
+    run.add_argument('--seeds', type=int, nargs='+', default=[1])
+    run.add_argument('--max-sec', type=float, default=10)
+    run.add_argument('--num-workers', type=int, default=1)
+    run.add_argument('--out', default=None)
+    run.add_argument('--no-isolate', action='store_true')
+    cmp = sub.add_parser('compare', help='compare to a baseline')
+    cmp.add_argument('current')
+    cmp.add_argument('baseline')
+    cmp.add_argument('--tol', type=float, default=0.2)
+    cmp.add_argument('--slack', type=float, default=0.05)
+    files = sub.add_parser('files', help='run the benchmark files of a dir')
+    files.add_argument('path')
+    files.add_argument('--best-known', default=None)
+    files.add_argument('--format', default=None, choices=BENCHMARK_FORMATS)
+    files.add_argument('--max-sec', type=float, default=10)
+    files.add_argument('--num-workers', type=int, default=1)
+    files.add_argument('--out', default=None)
+    imp = sub.add_parser('import', help='time of import')
+    imp.add_argument('--module', default='sched')
+    imp.add_argument('--repeat', type=int, default=5)
+    imp.add_argument('--out', default=None)
+    sub.add_parser('formulation', help='see fjsp_formulation')
+    return parser.parse_args(argv)
+
 
-def main(problem, sizes, *args, **kwargs):
-    m, n, p, d = 50, 20, 2, 0.5
-    jobs, machines = JSP.rd_instance(m, n, copy=p, density=d)
-    jsp = JSP(jobs, machines)
-    jsp.cp_create_model(max_sec=500, num_workers=2, max_sol=100)
-    # jsp.create_cp_model(max_sec=500, num_workers=2, para=True)
-    jsp.cp_to_gantt_mermaid()
\ No newline at end of file
+if __name__ == '__main__':
+    args = parse_args()
+    if args.command == 'run':
+        main(problem=args.problem, sizes=GRIDS[args.grid], seeds=args.seeds,
+             max_sec=args.max_sec, num_workers=args.num_workers,
+             out=args.out, isolate=not args.no_isolate)
+    elif args.command == 'files':
+        literature(args.path, best_known=args.best_known, fmt=args.format,
+                   max_sec=args.max_sec, num_workers=args.num_workers,
+                   out=args.out)
+    elif args.command == 'import':
+        import_time(module=args.module, repeat=args.repeat, out=args.out)
+    elif args.command == 'compare':
+        sys.exit(1 if compare(args.current, args.baseline,
+                              tol=args.tol, slack=args.slack) else 0)
+    else:
+        fjsp_formulation()
@@ -1,6 +1,7 @@
 from sched import *
 
 if __name__ == '__main__':
+   setup_logging()
    m, n, p, d = 50, 20, 2, 0.5
    jobs, machines = JSP.rd_instance(m, n, copy=p, density=d)
    jsp = JSP(jobs, machines)
@@ -1 +1,2 @@
-from .model import *
\ No newline at end of file
+from .model import *
+from .batch import *
\ No newline at end of file
@@ -0,0 +1,109 @@
+# ....................
+# @license: %MIT License%:~ http://www.opensource.org/licenses/MIT
+# @project: jobshop
+# @file: /aio.py
+# @description:
+#
+# Asynchronous solve of the cp model (see `JSP.cp_solve_async`)
+#  - the solve runs in an executor of the event loop
+#  - the warm start (default to the best dispatching rule) is the first
+#     incumbent, pushed before the model is built
+#  - each solution found by `SatCallBack` is extracted in the thread
+#     of the solver and pushed to an asyncio.Queue of the loop
+
+__package__ = 'sched.jobshop'
+
+import asyncio
+import functools
+import time
+from collections import namedtuple
+
+
+class CpSolveHandle(object):
+  """
+   Handle of a running cp solve
+    - `async for inc in handle`, the incumbents as they are found,
+        the first is the warm start
+    - `await handle`, the final solution, the best incumbent
+        if the search finds none
+    - `handle.cancel()`, stop the search, the best so far is kept
+  """
+  incumbent = namedtuple('incumbent', ['makespan', 'wall_time', 'solution'])
+
+  def __init__(self, problem, executor=None, **kwargs):
+    self.problem = problem
+    self.loop = asyncio.get_running_loop()
+    self.queue = asyncio.Queue()
+    self.incumbents = []
+    self.cancelled = False
+    self.solved = False
+    self.start = time.time()
+    self.future = self.loop.run_in_executor(
+      executor, functools.partial(self._run, **kwargs))
+    # the end of the incumbents
+    self.future.add_done_callback(lambda _: self.queue.put_nowait(None))
+
+  def _run(self, **kwargs):
+    # in the executor, the warm start first
+    problem = self.problem
+    warm_start = kwargs.pop('warm_start', None)
+    if warm_start is None:
+      warm_start = problem.hr_create_sol(kwargs.get('rule', 'best'),
+                                         busy=kwargs.get('busy'))
+    else:
+      warm_start = problem.cp_sol_container(
+        **problem.as_sol_dict(warm_start))
+    self.loop.call_soon_threadsafe(self._put, self.incumbent(
+      makespan=int(warm_start.makespan),
+      wall_time=time.time() - self.start,
+      solution=warm_start))
+    problem.cp_create_model(warm_start=warm_start,
+                            on_solution=self._on_solution,
+                            **kwargs)
+
+  def _on_solution(self, callback):
+    # in the thread of the solver
+    if self.cancelled:
+      callback.StopSearch()
+    self.solved = True
+    sol = self.problem.cp_extract_sol(callback)
+    inc = self.incumbent(makespan=sol.makespan,
+                         wall_time=callback.WallTime(),
+                         solution=sol)
+    self.loop.call_soon_threadsafe(self._put, inc)
+
+  def _put(self, inc):
+    self.incumbents.append(inc)
+    self.queue.put_nowait(inc)
+
+  @property
+  def best(self):
+    """the last incumbent, `None` if none is found yet"""
+    return self.incumbents[-1] if self.incumbents else None
+
+  def done(self):
+    return self.future.done()
+
+  def cancel(self):
+    """
+      stop the search, `await` the handle for the best solution so far;
+        if the search is not started yet, it stops at the first solution
+      """
+    self.cancelled = True
+    if self.problem.cp_solver is not None:
+      self.problem.cp_solver.StopSearch()
+
+  async def __aiter__(self):
+    while True:
+      inc = await self.queue.get()
+      if inc is None:
+        # for the next iteration
+        self.queue.put_nowait(None)
+        return
+      yield inc
+
+  def __await__(self):
+    yield from self.future.__await__()
+    if self.solved:
+      return self.problem.cp_solution
+    return self.best.solution if self.best is not None else None
@@ -0,0 +1,99 @@
+# ....................
+# @license: %MIT License%:~ http://www.opensource.org/licenses/MIT
+# @project: jobshop
+# @file: /batch.py
+# @description:
+#
+# Solve many independent (F)JSP instances across a process pool,
+#   the cores are split between the concurrent solves:
+#   each CP-SAT solve gets cpu_count // processes search workers.
+
+__package__ = 'sched.jobshop'
+
+import concurrent.futures as cf
+import logging
+import os
+import time
+from collections import namedtuple
+from typing import Any, Iterable, Iterator
+
+from sched.jobshop.model import JSP, JSPInstance
+
+logger = logging.getLogger(f"{__package__}.batch")
+
+solve_result = namedtuple('solve_result',
+                          ['index',
+                           'status',
+                           'makespan',
+                           'schedule',
+                           'timings'])
+
+
+def solve_one(index: int, instance: Any, **kwargs) -> solve_result:
+  """
+    solve one instance by `JSP.cp_create_model`
+    :param index: position of the instance in the batch
+    :param instance: a `JSPInstance`, or a tuple (jobs, machines)
+    :param kwargs: for `JSP` and `JSP.cp_create_model`
+    :return: the schedule is a `sched.Schedule` message (or None)
+    """
+  _start = time.time()
+  if isinstance(instance, JSPInstance):
+    jsp = JSP(instance, **kwargs)
+  else:
+    jsp = JSP(*instance, **kwargs)
+  jsp.cp_create_model(**kwargs)
+  solved = jsp.cp_solution is not None
+  solver = jsp.cp_solver
+  wall = time.time() - _start
+  solve = solver.WallTime() if solver is not None else 0.0
+  return solve_result(
+    index=index,
+    status=solver.StatusName(jsp.cp_status) if solver is not None
+    else 'UNKNOWN',
+    makespan=jsp.cp_solution.makespan if solved else None,
+    schedule=jsp.sol_to_proto() if solved else None,
+    timings=dict(solve=solve,
+                 build=wall - solve,
+                 wall=wall))
+
+
+def solve_many(instances: Iterable[Any],
+               max_workers: int = None,
+               ordered: bool = True,
+               **kwargs) -> Iterator[solve_result]:
+  """
+    solve the instances in a `ProcessPoolExecutor`
+    :param instances: `JSPInstance` or tuples (jobs, machines)
+    :param max_workers: num of processes,
+            default to min(num of instances, cpu count)
+    :param ordered: yield the results in the order of submission,
+            otherwise as they complete
+    :param kwargs: for `JSP.cp_create_model`,
+            `num_workers` defaults to an even split of the cores
+    :return: iterator of `solve_result`,
+            an instance that fails has the status 'ERROR: ...',
+            the others are not affected
+    """
+  instances = list(instances)
+  cores = os.cpu_count() or 1
+  max_workers = max_workers or max(min(len(instances), cores), 1)
+  kwargs.setdefault('num_workers', max(cores // max_workers, 1))
+  kwargs.setdefault('log_search_progress', False)
+  logger.info(f'solve {len(instances)} instances in {max_workers} processes'
+              f' of {kwargs["num_workers"]} search workers')
+  with cf.ProcessPoolExecutor(max_workers=max_workers) as executor:
+    futures = {executor.submit(solve_one, k, ins, **kwargs): k
+               for k, ins in enumerate(instances)}
+    for f in futures if ordered else cf.as_completed(futures):
+      try:
+        result = f.result()
+      except Exception as e:
+        k = futures[f]
+        logger.warning(f'instance {k} failed: {e!r}')
+        result = solve_result(index=k,
+                              status=f'ERROR: {e!r}',
+                              makespan=None,
+                              schedule=None,
+                              timings={})
+      yield result
@@ -0,0 +1,69 @@
+# ....................
+# @license: %MIT License%:~ http://www.opensource.org/licenses/MIT
+# @project: jobshop
+# @file: /bounds.py
+# @description:
+#
+# Preprocessing of the (flexible) JSP, on the flattened arrays
+#   (see `sched.jobshop.instance.JSPInstance`)
+#  - head of a task, the earliest start by the release and route of its job
+#  - tail of a task, the work of its job that remains after it
+#  - a lower bound of the makespan, by the jobs and by the groups
+
+__package__ = 'sched.jobshop'
+
+import numpy as np
+
+
+def heads_tails(job_ptr: np.ndarray,
+                task_duration: np.ndarray,
+                release: np.ndarray = None):
+  """
+    heads and tails of all tasks from the routes, in one pass of cumsum
+    :param job_ptr: CSR offsets of the tasks of each job
+    :param task_duration: (least) duration of each task
+    :param release: release time of each job
+    :return: head, tail of each task
+    """
+  sizes = np.diff(job_ptr)
+  task_job = np.repeat(np.arange(sizes.size), sizes)
+  csum = np.zeros(task_duration.size + 1, dtype=np.int64)
+  np.cumsum(task_duration, out=csum[1:])
+  before = csum[:-1] - csum[job_ptr[:-1]][task_job]
+  total = csum[job_ptr[1:]] - csum[job_ptr[:-1]]
+  tail = total[task_job] - before - task_duration
+  head = before if release is None else before + release[task_job]
+  return head, tail
+
+
+def makespan_lb(head: np.ndarray,
+                tail: np.ndarray,
+                task_group: np.ndarray,
+                task_duration: np.ndarray,
+                group_size: np.ndarray,
+                task_work: np.ndarray = None):
+  """
+    lower bound of the makespan,
+      max of the longest job and of the most loaded group,
+      a group cannot start before its least head,
+      and cannot finish before its least tail.
+    :param task_work: work of each task on its group,
+            default to `task_duration`
+            (they differ if a task can be split over the machines)
+    :return:
+    """
+  if task_duration.size == 0:
+    return 0
+  lb_job = (head + task_duration + tail).max()
+  n_groups = group_size.size
+  task_work = task_duration if task_work is None else task_work
+  load = np.bincount(task_group, weights=task_work, minlength=n_groups)
+  _head = np.full(n_groups, np.iinfo(np.int64).max)
+  _tail = np.full(n_groups, np.iinfo(np.int64).max)
+  np.minimum.at(_head, task_group, head)
+  np.minimum.at(_tail, task_group, tail)
+  used = load > 0
+  lb_group = _head[used] \
+             + np.ceil(load[used] / group_size[used]).astype(np.int64) \
+             + _tail[used]
+  return int(max(lb_job, lb_group.max(initial=0)))
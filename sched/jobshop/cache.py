@@ -0,0 +1,182 @@
+# ....................
+# @license: %MIT License%:~ http://www.opensource.org/licenses/MIT
+# @project: jobshop
+# @file: /cache.py
+# @description:
+#
+# An on-disk cache of schedules, keyed by `JSPInstance.fingerprint`
+#  - one .npz file per key, the schedule in the canonical order of
+#     `JSPInstance.canonical_order`: the rank of the job, of the group,
+#     and of the machine in its group of each row, so a schedule is
+#     reused by an instance with the jobs given in another order,
+#     or with other ids of the machines in a group
+#  - the time of the last use of an entry is the mtime of its file;
+#     `put` evicts the entries older than `max_age`, then the least
+#     recently used ones until the files fit in `max_bytes`
+#
+# usage:
+#   cache = JSPSolutionCache('cache/jsp')
+#   jsp.cp_create_model(cache=cache)
+
+__package__ = 'sched.jobshop'
+
+import os
+import tempfile
+import time
+
+import numpy as np
+
+from sched.jobshop.gantt import schedule_arrays
+
+
+class JSPSolutionCache(object):
+  """
+   Schedules by key on disk, with an age and size based LRU eviction
+  """
+  suffix = '.npz'
+
+  def __init__(self, path: str, max_bytes: int = 1 << 30,
+               max_age: float = 30 * 86400):
+    """
+      :param path: a directory, created if needed
+      :param max_bytes: of all the files
+      :param max_age: seconds since the last use of an entry
+      """
+    self.path = path
+    self.max_bytes = max_bytes
+    self.max_age = max_age
+    os.makedirs(path, exist_ok=True)
+
+  def _file(self, key):
+    return os.path.join(self.path, f'{key}{self.suffix}')
+
+  def __contains__(self, key):
+    return os.path.exists(self._file(key))
+
+  def __len__(self):
+    return len(self.entries())
+
+  def entries(self):
+    """
+      :return: list of (key, mtime, size), the least recently used first
+      """
+    entries = []
+    for f in os.listdir(self.path):
+      if not f.endswith(self.suffix):
+        continue
+      try:
+        stat = os.stat(os.path.join(self.path, f))
+      except FileNotFoundError:
+        continue
+      entries.append((f[:-len(self.suffix)], stat.st_mtime, stat.st_size))
+    return sorted(entries, key=lambda e: e[1])
+
+  def get(self, key):
+    """
+      :return: dict of the arrays of the entry,
+        job, group, machine (ranks), start, end, makespan, optimal;
+        None if missing or expired
+      """
+    fp = self._file(key)
+    try:
+      if time.time() - os.stat(fp).st_mtime > self.max_age:
+        os.remove(fp)
+        return None
+      with np.load(fp) as f:
+        entry = {k: f[k] for k in f.files}
+      os.utime(fp)
+    except (FileNotFoundError, OSError, ValueError):
+      return None
+    return entry
+
+  def put(self, key, **arrays):
+    """
+      write an entry (atomically), then evict
+      :param arrays: see `get`
+      """
+    fd, tmp = tempfile.mkstemp(suffix='.tmp', dir=self.path)
+    try:
+      with os.fdopen(fd, 'wb') as f:
+        np.savez(f, **arrays)
+      os.replace(tmp, self._file(key))
+    finally:
+      if os.path.exists(tmp):
+        os.remove(tmp)
+    self.evict()
+
+  def evict(self):
+    """
+      :return: the keys evicted
+      """
+    now = time.time()
+    entries = self.entries()
+    evicted = [k for k, mtime, _ in entries if now - mtime > self.max_age]
+    entries = [e for e in entries if e[0] not in evicted]
+    total = sum(size for *_, size in entries)
+    for k, _, size in entries:
+      if total <= self.max_bytes:
+        break
+      evicted.append(k)
+      total -= size
+    for k in evicted:
+      try:
+        os.remove(self._file(k))
+      except FileNotFoundError:
+        pass
+    return evicted
+
+  def clear(self):
+    for k, *_ in self.entries():
+      os.remove(self._file(k))
+
+
+def cache_entry(instance, sol, optimal=False):
+  """
+    a schedule in the canonical order of the instance
+    :param instance: `JSPInstance`
+    :param sol: see `schedule_arrays`
+    :param optimal: if the makespan is proved optimal
+    :return: dict of arrays, see `JSPSolutionCache.get`
+    """
+  job_order, group_order, machine_rank = instance.canonical_order()
+  job_rank = dict(zip(instance.job_id[job_order].tolist(),
+                      range(job_order.size)))
+  group_rank = dict(zip(instance.group_id[group_order].tolist(),
+                        range(group_order.size)))
+  machine_keys = zip(instance.group_id[instance.machine_group].tolist(),
+                     instance.machine_id.tolist())
+  _machine_rank = dict(zip(machine_keys, machine_rank.tolist()))
+  job, group, machine, start, end = schedule_arrays(sol)
+  job = np.asarray(job).tolist()
+  group = np.asarray(group).tolist()
+  machine = np.asarray(machine).tolist()
+  return dict(
+    job=np.fromiter((job_rank[j] for j in job), dtype=np.int64,
+                    count=len(job)),
+    group=np.fromiter((group_rank[g] for g in group), dtype=np.int64,
+                      count=len(group)),
+    machine=np.fromiter(
+      (_machine_rank[g, m] for g, m in zip(group, machine)),
+      dtype=np.int64, count=len(machine)),
+    start=np.asarray(start, dtype=np.int64),
+    end=np.asarray(end, dtype=np.int64),
+    makespan=np.int64(sol.makespan),
+    optimal=np.bool_(optimal))
+
+
+def cache_schedule(instance, entry):
+  """
+    the inverse of `cache_entry`
+    :return: job, group, machine (ids), start, end
+    """
+  job_order, group_order, machine_rank = instance.canonical_order()
+  # the machine (position) of each group and rank
+  machine_pos = np.empty(machine_rank.size, dtype=np.int64)
+  machine_pos[instance.group_ptr[instance.machine_group] + machine_rank] = \
+    np.arange(machine_rank.size)
+  group = group_order[entry['group']]
+  machine = machine_pos[instance.group_ptr[group] + entry['machine']]
+  return (instance.job_id[job_order[entry['job']]].tolist(),
+          instance.group_id[group].tolist(),
+          instance.machine_id[machine].tolist(),
+          entry['start'], entry['end'])
@@ -0,0 +1,149 @@
+# ....................
+# @license: %MIT License%:~ http://www.opensource.org/licenses/MIT
+# @project: jobshop
+# @file: /gantt.py
+# @description:
+#
+# Gantt records of a schedule
+#  - the assignments (job, group, machine, start, end) are sorted
+#     by machine and start in one pass (lexsort), and cut into
+#     one block per machine
+#  - the records are generated, to be streamed to
+#     a Mermaid.js gantt record, or a CSV/JSON file
+
+__package__ = 'sched.jobshop'
+
+import csv
+import datetime
+import json
+from typing import Any, Dict, List
+
+import numpy as np
+
+GANTT_FIELDS = ('machine', 'group', 'job', 'start', 'end', 'duration',
+                'start_time', 'end_time')
+
+# units of `numpy.timedelta64` -> duration suffixes of Mermaid.js
+MERMAID_UNITS = {'ms': 'ms', 's': 's', 'm': 'm', 'h': 'h', 'D': 'd', 'W': 'w'}
+
+
+def schedule_arrays(sol):
+  """
+    the assignments of a schedule, one per task and machine used
+    :param sol: a `JSPSchedule`, or a `cp_sol_container` or its dict
+    :return: job, group, machine, start, end
+    """
+  if hasattr(sol, 'start') and hasattr(sol, 'machine'):
+    return sol.job, sol.group, sol.machine, sol.start, sol.end
+  sol = sol._asdict() if hasattr(sol, '_asdict') else sol
+  keys = [k for k, v in sol['task_opt_on_m'].items() if v]
+  start = np.fromiter((sol['task_start_on_m'][k] for k in keys),
+                      dtype=np.int64, count=len(keys))
+  end = np.fromiter((sol['task_end_on_m'][k] for k in keys),
+                    dtype=np.int64, count=len(keys))
+  job, group, machine = (np.array([k[i] for k in keys], dtype=object)
+                         for i in range(3))
+  return job, group, machine, start, end
+
+
+def gantt_records(sol, machines: Dict[Any, List] = None,
+                  start_date: datetime.datetime = None,
+                  unit: str = 'm'):
+  """
+    the assignments by machine, by start time in each machine
+    :param sol: see `schedule_arrays`
+    :param machines: dict of `JSPMachine` by group, for the order of
+            the machines, and to keep machines without tasks;
+            default to the machines of the schedule
+    :param start_date: time 0, default to now
+    :param unit: of the time, a unit of `numpy.timedelta64`
+    :return: a generator of (machine, group, records),
+            records is a dict of arrays with the keys `GANTT_FIELDS`
+    """
+  job, group, machine, start, end = schedule_arrays(sol)
+  if machines is None:
+    keys = list(dict.fromkeys(zip(group.tolist(), machine.tolist())))
+  else:
+    keys = [(g, m.idx) for g, m_list in machines.items() for m in m_list]
+  position = {k: i for i, k in enumerate(keys)}
+  m_pos = np.fromiter(
+    (position[k] for k in zip(group.tolist(), machine.tolist())),
+    dtype=np.int64, count=start.size)
+
+  order = np.lexsort((start, m_pos))
+  m_pos = m_pos[order]
+  columns = dict(job=job[order], group=group[order],
+                 machine=machine[order], start=start[order],
+                 end=end[order])
+  columns['duration'] = columns['end'] - columns['start']
+  _start_date = np.datetime64(
+    datetime.datetime.now() if start_date is None else start_date, 's')
+  for k in ('start', 'end'):
+    columns[f'{k}_time'] = np.char.replace(np.datetime_as_string(
+      _start_date + columns[k].astype(f'timedelta64[{unit}]'),
+      unit='s'), 'T', ' ')
+
+  # cut into the blocks of the machines
+  bounds = np.searchsorted(m_pos, np.arange(len(keys) + 1))
+  for i, (g, m_id) in enumerate(keys):
+    lo, hi = bounds[i], bounds[i + 1]
+    yield m_id, g, {k: v[lo:hi] for k, v in columns.items()}
+
+
+def gantt_mermaid_lines(records, title='schedule of (f)jsp', header=(),
+                        unit: str = 'm'):
+  """
+    the lines of a Mermaid.js gantt record
+    :param records: generator of `gantt_records`
+    :param header: see `sched.util.MERMAID_GANTT_HEADER`
+    :param unit: of the time, as in `gantt_records`,
+            one of `MERMAID_UNITS`
+    :return: a generator of lines
+    """
+  if unit not in MERMAID_UNITS:
+    raise ValueError(f"unit: {unit} not in {tuple(MERMAID_UNITS)}")
+  suffix = MERMAID_UNITS[unit]
+  yield from header
+  yield f"title {title}"
+  for m_id, g, rec in records:
+    yield f"section M{m_id}@{g}"
+    for j, s, d in zip(rec['job'].tolist(), rec['start_time'].tolist(),
+                       rec['duration'].tolist()):
+      yield f"{j} :active, {j}@{g}, {s}, {d}{suffix}"
+
+
+def _rows(records):
+  for _, _, rec in records:
+    yield from zip(*(rec[k].tolist() for k in GANTT_FIELDS))
+
+
+def gantt_to_csv(records, fp):
+  """
+    :param records: generator of `gantt_records`
+    :param fp:
+    :return: num of rows
+    """
+  n = 0
+  with open(fp, 'w', newline='') as f:
+    writer = csv.writer(f)
+    writer.writerow(GANTT_FIELDS)
+    for row in _rows(records):
+      writer.writerow(row)
+      n += 1
+  return n
+
+
+def gantt_to_json(records, fp):
+  """
+    JSON lines, one object per assignment
+    :param records: generator of `gantt_records`
+    :param fp:
+    :return: num of rows
+    """
+  n = 0
+  with open(fp, 'w') as f:
+    for row in _rows(records):
+      f.write(json.dumps(dict(zip(GANTT_FIELDS, row)), default=str))
+      f.write('\n')
+      n += 1
+  return n
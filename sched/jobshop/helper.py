@@ -46,6 +46,7 @@ class JSPTask(Task):
       'job_id', 'group',
       'start', 'end', 'duration',
    ]
+   _aliases = {'machine': 'group'}
 
    def __str__(self):
       # check sufficiency
@@ -56,12 +57,16 @@ class JSPTask(Task):
 class SatCallBack(cp_model.CpSolverSolutionCallback):
    """(Constraint Programming)
        Satisfactory solver callback
+
+       on_solution, a function called with the callback
+         at each solution (in the thread of the solver)
    """
    logger = logging.getLogger(f"{__package__}.{__name__}")
 
-   def __init__(self, v, solution_limit=20, time_limit=100):
+   def __init__(self, v, solution_limit=20, time_limit=100, on_solution=None):
       cp_model.CpSolverSolutionCallback.__init__(self)
       self.v = v
+      self.on_solution = on_solution
       self.__solution_count = 0
       self.__solution_limit = solution_limit
       self.__start_time = time.time()
@@ -72,6 +77,8 @@ class SatCallBack(cp_model.CpSolverSolutionCallback):
       current_time = time.time()
 
       logger.info(f'%.2f - {self.v} :={self.Value(self.v)}\n' % self.WallTime())
+      if self.on_solution is not None:
+         self.on_solution(self)
       if self.__solution_count >= self.__solution_limit:
          logger.info('Stop search after %i solutions' % self.__solution_limit)
          self.StopSearch()
@@ -0,0 +1,193 @@
+# ....................
+# @license: %MIT License%:~ http://www.opensource.org/licenses/MIT
+# @project: jobshop
+# @file: /heuristic.py
+# @description:
+#
+# Priority dispatching heuristics for the (flexible) JSP,
+#   on the arrays of `sched.jobshop.instance.JSPInstance`
+#  - an active schedule generation scheme (Giffler & Thompson),
+#     event-driven: the candidates (next task of every job) wait in
+#     heaps of the group of the task, and a heap of the groups is keyed
+#     by the earliest completion of their candidates; a step only
+#     updates the heaps of the group and of the job it dispatched,
+#     so a schedule costs O(T log J) for T tasks and J jobs
+#  - in a group with copies, the task is put on the machine
+#     that is free first (ties go to the least loaded one)
+
+__package__ = 'sched.jobshop'
+
+import heapq
+
+import numpy as np
+
+DISPATCHING_RULES = ('spt', 'lpt', 'mwkr', 'fifo')
+
+
+def _pop_stale(heap, epoch):
+  """drop the entries (..., job, epoch) of jobs that moved since"""
+  while heap and heap[0][-1] != epoch[heap[0][-2]]:
+    heapq.heappop(heap)
+
+
+def dispatch(job_ptr: np.ndarray,
+             task_group: np.ndarray,
+             task_duration: np.ndarray,
+             group_ptr: np.ndarray,
+             release: np.ndarray = None,
+             machine_ready: np.ndarray = None,
+             rule: str = 'mwkr'):
+  """
+    active schedule generation with a priority dispatching rule,
+      at each step, take the candidate with the earliest completion c*,
+      the conflict set is the candidates in the same group that
+      can start before c*, and the rule picks one of them.
+
+    :param job_ptr: CSR offsets of the tasks of each job
+    :param task_group: group (position) of each task
+    :param task_duration: duration of each task
+    :param group_ptr: CSR offsets of the machines of each group
+    :param release: release time of each job
+    :param machine_ready: time from which each machine is available
+    :param rule: one of `DISPATCHING_RULES`
+            - spt, shortest processing time
+            - lpt, longest processing time
+            - mwkr, most work remaining (of the job)
+            - fifo, first come (to the queue of the group) first served
+    :return: start time and machine (position) of each task
+    """
+  if rule not in DISPATCHING_RULES:
+    raise ValueError(f"rule: {rule} not in {DISPATCHING_RULES}")
+  n_jobs = job_ptr.size - 1
+  n_tasks = task_duration.size
+  n_groups = group_ptr.size - 1
+  task_start = np.zeros(n_tasks, dtype=np.int64)
+  task_machine = np.zeros(n_tasks, dtype=np.int64)
+  if n_tasks == 0:
+    return task_start, task_machine
+
+  _ptr = job_ptr.tolist()
+  _group = task_group.tolist()
+  _duration = task_duration.tolist()
+  _start = [0] * n_tasks
+  _machine = [0] * n_tasks
+  job_ready = [0] * n_jobs if release is None \
+    else np.asarray(release, dtype=np.int64).tolist()
+  m_ready = [0] * int(group_ptr[-1]) if machine_ready is None \
+    else np.asarray(machine_ready, dtype=np.int64).tolist()
+  remaining = np.add.reduceat(np.append(task_duration, 0),
+                              job_ptr[:-1]).tolist()
+  # the next task of each job
+  nxt = _ptr[:-1]
+  # bumped when a job moves, its heap entries of before are stale
+  epoch = [0] * n_jobs
+
+  # the machines of each group, (ready, load, position), free first
+  machines = [[(m_ready[m], 0, m) for m in range(lo, hi)]
+              for lo, hi in zip(group_ptr[:-1].tolist(),
+                                group_ptr[1:].tolist())]
+  for heap in machines:
+    heapq.heapify(heap)
+  # the candidates of each group, by state:
+  #  - waiting, not ready before the group, (ready, j), (ready + d, j)
+  #  - ready, start when the group does, (d, j), (priority, j)
+  wait_ready = [[] for _ in range(n_groups)]
+  wait_end = [[] for _ in range(n_groups)]
+  ready_dur = [[] for _ in range(n_groups)]
+  ready_rule = [[] for _ in range(n_groups)]
+  # the groups by (earliest completion, job), version of the entry
+  groups = []
+  version = [0] * n_groups
+  # the rule of each job, the smaller first
+  priority = [0] * n_jobs
+  heappush, heappop = heapq.heappush, heapq.heappop
+
+  def _enter(j, g):
+    d = _duration[nxt[j]]
+    r = job_ready[j]
+    epoch[j] += 1
+    # fixed while the job waits in the group
+    priority[j] = d if rule == 'spt' else -d if rule == 'lpt' \
+      else -remaining[j] if rule == 'mwkr' else r
+    if r <= machines[g][0][0]:
+      heappush(ready_dur[g], (d, j, epoch[j]))
+      heappush(ready_rule[g], (priority[j], j, epoch[j]))
+    else:
+      heappush(wait_ready[g], (r, j, epoch[j]))
+      heappush(wait_end[g], (r + d, j, epoch[j]))
+
+  def _update(g):
+    # the waiting candidates ready by the time the group is ready
+    g_ready = machines[g][0][0]
+    _wait = wait_ready[g]
+    _pop_stale(_wait, epoch)
+    while _wait and _wait[0][0] <= g_ready:
+      _enter(heappop(_wait)[1], g)
+      _pop_stale(_wait, epoch)
+    _pop_stale(wait_end[g], epoch)
+    _pop_stale(ready_dur[g], epoch)
+    key = None
+    if ready_dur[g]:
+      d, j, _ = ready_dur[g][0]
+      key = (g_ready + d, j)
+    if wait_end[g] and (key is None or wait_end[g][0][:2] < key):
+      key = wait_end[g][0][:2]
+    version[g] += 1
+    if key is not None:
+      heappush(groups, (*key, g, version[g]))
+
+  for j in range(n_jobs):
+    if nxt[j] < _ptr[j + 1]:
+      _enter(j, _group[nxt[j]])
+  for g in range(n_groups):
+    _update(g)
+
+  while groups:
+    c_star, a, g, v = heappop(groups)
+    if v != version[g]:
+      continue
+    g_ready = machines[g][0][0]
+    # the conflict set: the candidates of the group starting before c*,
+    #  picked by the rule, then the earliest start, then the job
+    best = (priority[a], max(job_ready[a], g_ready), a)
+    _pop_stale(ready_rule[g], epoch)
+    if g_ready < c_star and ready_rule[g]:
+      pr, j, _ = ready_rule[g][0]
+      best = min(best, (pr, g_ready, j))
+    # the waiting ones ready before c*, a walk of the top of the heap
+    _wait = wait_ready[g]
+    stack = [0] if _wait else []
+    while stack:
+      i = stack.pop()
+      r, j, e = _wait[i]
+      if r >= c_star:
+        continue
+      if e == epoch[j]:
+        best = min(best, (priority[j], r, j))
+      stack.extend(c for c in (2 * i + 1, 2 * i + 2) if c < len(_wait))
+    j = best[-1]
+    k = nxt[j]
+    d = _duration[k]
+
+    # the machine free first in the group, least loaded on ties
+    _ready, load, m = machines[g][0]
+    start = max(job_ready[j], _ready)
+    end = start + d
+    heapq.heapreplace(machines[g], (end, load + d, m))
+    _start[k] = start
+    _machine[k] = m
+
+    job_ready[j] = end
+    remaining[j] -= d
+    nxt[j] = k + 1
+    epoch[j] += 1
+    if k + 1 < _ptr[j + 1]:
+      _g = _group[k + 1]
+      _enter(j, _g)
+      if _g != g:
+        _update(_g)
+    _update(g)
+
+  task_start[:] = _start
+  task_machine[:] = _machine
+  return task_start, task_machine
@@ -0,0 +1,305 @@
+# ....................
+# @license: %MIT License%:~ http://www.opensource.org/licenses/MIT
+# @project: jobshop
+# @file: /instance.py
+# @description:
+#
+# Array-backed (struct of arrays) instance of the (flexible) JSP
+#  - tasks are stored job by job, in route order;
+#     the tasks of the k-th job are `job_ptr[k]:job_ptr[k + 1]`
+#  - machines are stored group by group;
+#     the machines of the g-th group are `group_ptr[g]:group_ptr[g + 1]`
+#  - jobs and groups are referred to by position,
+#     `job_id` and `group_id` keep the original ids
+
+__package__ = 'sched.jobshop'
+
+import hashlib
+import json
+
+import numpy as np
+
+from sched.jobshop.helper import *
+from sched.protobuf import schema_pb2
+
+
+class JSPInstance(object):
+  """
+   A (flexible) JSP instance as NumPy arrays
+  """
+  __slots__ = [
+    'job_id', 'job_release', 'job_due', 'job_ptr',
+    'task_seq', 'task_group', 'task_duration',
+    'group_id', 'group_ptr', 'machine_id',
+  ]
+
+  def __init__(self, job_id, job_release, job_due, job_ptr,
+               task_seq, task_group, task_duration,
+               group_id, group_ptr, machine_id=None):
+    self.job_id = np.asarray(job_id)
+    self.job_release = np.asarray(job_release, dtype=np.int64)
+    self.job_due = np.asarray(job_due, dtype=np.int64)
+    self.job_ptr = np.asarray(job_ptr, dtype=np.int64)
+    self.task_seq = np.asarray(task_seq, dtype=np.int64)
+    self.task_group = np.asarray(task_group, dtype=np.int64)
+    self.task_duration = np.asarray(task_duration, dtype=np.int64)
+    self.group_id = np.asarray(group_id)
+    self.group_ptr = np.asarray(group_ptr, dtype=np.int64)
+    if machine_id is None:
+      # machines are numbered from 0 in each group
+      machine_id = np.arange(self.group_ptr[-1]) \
+                   - np.repeat(self.group_ptr[:-1], self.group_size)
+    self.machine_id = np.asarray(machine_id)
+
+  def __str__(self):
+    return f"JSPInstance(jobs={self.n_jobs}, tasks={self.n_tasks}, " \
+           f"groups={self.n_groups}, machines={self.machine_id.size})"
+
+  def __repr__(self):
+    return self.__str__()
+
+  @property
+  def n_jobs(self):
+    return self.job_ptr.size - 1
+
+  @property
+  def n_tasks(self):
+    return self.task_duration.size
+
+  @property
+  def n_groups(self):
+    return self.group_ptr.size - 1
+
+  @property
+  def group_size(self):
+    return np.diff(self.group_ptr)
+
+  @property
+  def task_job(self):
+    """position of the job of each task"""
+    return np.repeat(np.arange(self.n_jobs), np.diff(self.job_ptr))
+
+  @property
+  def machine_group(self):
+    """position of the group of each machine"""
+    return np.repeat(np.arange(self.n_groups), self.group_size)
+
+  def job_tasks(self, jobs):
+    """
+      :param jobs: positions of the jobs
+      :return: positions of their tasks, job by job
+      """
+    jobs = np.asarray(jobs, dtype=np.int64)
+    sizes = np.diff(self.job_ptr)[jobs]
+    ends = np.cumsum(sizes)
+    return np.arange(ends[-1] if ends.size else 0) \
+           - np.repeat(ends - sizes - self.job_ptr[jobs], sizes)
+
+  def select_jobs(self, jobs):
+    """
+      a sub-instance of some jobs, with all the groups and machines
+      :param jobs: positions of the jobs, in the order to keep
+      :return:
+      """
+    jobs = np.asarray(jobs, dtype=np.int64)
+    sizes = np.diff(self.job_ptr)[jobs]
+    job_ptr = np.zeros(jobs.size + 1, dtype=np.int64)
+    np.cumsum(sizes, out=job_ptr[1:])
+    tasks = self.job_tasks(jobs)
+    return JSPInstance(
+      job_id=self.job_id[jobs],
+      job_release=self.job_release[jobs],
+      job_due=self.job_due[jobs],
+      job_ptr=job_ptr,
+      task_seq=self.task_seq[tasks],
+      task_group=self.task_group[tasks],
+      task_duration=self.task_duration[tasks],
+      group_id=self.group_id,
+      group_ptr=self.group_ptr,
+      machine_id=self.machine_id)
+
+  def canonical_order(self):
+    """
+      an order of the jobs, the groups and the machines in each group
+        by their ids (as str), not by the order they were given in
+      :return: the positions of the jobs, the groups,
+        and the rank of each machine in its group
+      """
+    job_order = np.argsort(self.job_id.astype(str), kind='stable')
+    group_order = np.argsort(self.group_id.astype(str), kind='stable')
+    machine_key = self.machine_id.astype(str)
+    machine_rank = np.empty(machine_key.size, dtype=np.int64)
+    for lo, hi in zip(self.group_ptr[:-1].tolist(),
+                      self.group_ptr[1:].tolist()):
+      _order = np.argsort(machine_key[lo:hi], kind='stable')
+      machine_rank[lo + _order] = np.arange(hi - lo)
+    return job_order, group_order, machine_rank
+
+  def fingerprint(self):
+    """
+      a canonical hash of the content: the jobs (ids, release, due,
+        routes and durations) and the groups (ids and sizes);
+        invariant to the order of the jobs and the groups,
+        and to the ids of the machines in a group
+      :return: a hex digest
+      """
+    job_order, group_order, _ = self.canonical_order()
+    group_rank = np.empty(self.n_groups, dtype=np.int64)
+    group_rank[group_order] = np.arange(self.n_groups)
+    tasks = self.job_tasks(job_order)
+    h = hashlib.sha256()
+    h.update(json.dumps([self.job_id.astype(str)[job_order].tolist(),
+                         self.group_id.astype(str)[group_order].tolist()]
+                        ).encode())
+    for arr in (self.job_release[job_order], self.job_due[job_order],
+                np.diff(self.job_ptr)[job_order],
+                self.group_size[group_order],
+                group_rank[self.task_group[tasks]],
+                self.task_duration[tasks]):
+      h.update(np.ascontiguousarray(arr, dtype=np.int64).tobytes())
+    return h.hexdigest()
+
+  def has_revisit(self):
+    """if any route visits a group more than once"""
+    key = self.task_job * max(self.n_groups, 1) + self.task_group
+    return np.unique(key).size < key.size
+
+  @staticmethod
+  def from_objects(jobs: Dict[Any, JSPJob],
+                   machines: Dict[Any, List[JSPMachine]]):
+    """
+      build from the dicts of `JSPJob` and `JSPMachine` objects
+      :param jobs:
+      :param machines: machines by group
+      :return:
+      """
+    group_ids = list(machines.keys())
+    group_pos = {g: i for i, g in enumerate(group_ids)}
+    sizes = [len(job.tasks) for job in jobs.values()]
+    n_tasks = sum(sizes)
+    job_ptr = np.zeros(len(sizes) + 1, dtype=np.int64)
+    np.cumsum(sizes, out=job_ptr[1:])
+    group_ptr = np.zeros(len(group_ids) + 1, dtype=np.int64)
+    np.cumsum([len(machines[g]) for g in group_ids], out=group_ptr[1:])
+
+    def tasks(attr):
+      return (attr(t) for job in jobs.values() for t in job.tasks)
+
+    return JSPInstance(
+      job_id=[job.idx for job in jobs.values()],
+      job_release=[getattr(job, 'release', 0) or 0 for job in jobs.values()],
+      job_due=[-1 if getattr(job, 'due', None) is None else job.due
+               for job in jobs.values()],
+      job_ptr=job_ptr,
+      task_seq=np.fromiter(
+        tasks(lambda t: getattr(t, 'seq', 0)), dtype=np.int64,
+        count=n_tasks),
+      task_group=np.fromiter(
+        tasks(lambda t: group_pos[t.group]), dtype=np.int64,
+        count=n_tasks),
+      task_duration=np.fromiter(
+        tasks(lambda t: t.duration), dtype=np.int64, count=n_tasks),
+      group_id=group_ids,
+      group_ptr=group_ptr,
+      machine_id=[m.idx for g in group_ids for m in machines[g]])
+
+  def to_objects(self):
+    """
+      build the dicts of `JSPJob` and `JSPMachine` objects,
+        as in `JSP.rd_instance`
+      :return: jobs, machines
+      """
+    job_id = self.job_id.tolist()
+    group_id = self.group_id.tolist()
+    machine_id = self.machine_id.tolist()
+    task_seq = self.task_seq.tolist()
+    task_group = self.task_group.tolist()
+    task_duration = self.task_duration.tolist()
+    job_ptr = self.job_ptr.tolist()
+    jobs = {}
+    for k, (j, r, d) in enumerate(zip(job_id,
+                                      self.job_release.tolist(),
+                                      self.job_due.tolist())):
+      jobs[j] = JSPJob(idx=j, release=r, due=d)
+      jobs[j].tasks = [
+        JSPTask(idx=j, seq=task_seq[i], group=group_id[task_group[i]],
+                duration=task_duration[i])
+        for i in range(job_ptr[k], job_ptr[k + 1])
+      ]
+    group_ptr = self.group_ptr.tolist()
+    machines = {
+      g: [JSPMachine(idx=machine_id[i], group=g)
+          for i in range(group_ptr[k], group_ptr[k + 1])]
+      for k, g in enumerate(group_id)
+    }
+    return jobs, machines
+
+  def to_proto(self):
+    """
+      to the protobuf message `sched.JSPInstance`,
+        ids of jobs, groups and machines must be integers
+      :return:
+      """
+    for attr in ('job_id', 'group_id', 'machine_id'):
+      ids = getattr(self, attr)
+      if ids.size and ids.dtype.kind not in 'iu':
+        raise ValueError(f"{attr} must be integers for the protobuf "
+                         f"message, not {ids.dtype}")
+    message = schema_pb2.JSPInstance()
+    for attr in self.__slots__:
+      getattr(message, attr).extend(getattr(self, attr).tolist())
+    return message
+
+  @staticmethod
+  def from_proto(message):
+    """
+      from the protobuf message `sched.JSPInstance`, or its bytes
+      :param message:
+      :return:
+      """
+    if isinstance(message, bytes):
+      message = schema_pb2.JSPInstance.FromString(message)
+    return JSPInstance(**{
+      attr: np.fromiter(getattr(message, attr), dtype=np.int64,
+                        count=len(getattr(message, attr)))
+      for attr in JSPInstance.__slots__
+    })
+
+  @staticmethod
+  def rd_instance(m: int, n: int, copy: int = 1, density: float = 0.8,
+                  seed=None):
+    """
+      Randomly generate a (flexible) JSP instance, vectorized,
+        the distribution is the one of `JSP.rd_instance`
+      :param m: num of jobs
+      :param n: num of groups
+      :param copy: each group has randomly 1-copy identical machines
+      :param density: average machine-job adjacent rate
+      :param seed: seed of `numpy.random.default_rng`
+      :return: a `JSPInstance`
+      """
+    rng = np.random.default_rng(seed)
+    # shuffled routes, one row per job
+    routes = rng.permuted(np.tile(np.arange(n, dtype=np.int64), (m, 1)),
+                          axis=1)
+    keep = rng.random((m, n)) >= 1 - density
+    sizes = keep.sum(axis=1)
+    job_ptr = np.zeros(m + 1, dtype=np.int64)
+    np.cumsum(sizes, out=job_ptr[1:])
+    # jobs without a task are dropped
+    job_ptr = np.unique(job_ptr)
+    _, task_seq = np.nonzero(keep)
+    task_group = routes[keep]
+    group_ptr = np.zeros(n + 1, dtype=np.int64)
+    np.cumsum(rng.integers(1, copy + 1, size=n), out=group_ptr[1:])
+    n_jobs = job_ptr.size - 1
+    return JSPInstance(
+      job_id=np.flatnonzero(sizes),
+      job_release=np.zeros(n_jobs, dtype=np.int64),
+      job_due=np.full(n_jobs, 100, dtype=np.int64),
+      job_ptr=job_ptr,
+      task_seq=task_seq,
+      task_group=task_group,
+      task_duration=rng.integers(1, 6, size=task_group.size),
+      group_id=np.arange(n),
+      group_ptr=group_ptr)
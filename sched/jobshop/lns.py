@@ -0,0 +1,192 @@
+# ....................
+# @license: %MIT License%:~ http://www.opensource.org/licenses/MIT
+# @project: jobshop
+# @file: /lns.py
+# @description:
+#
+# Large neighborhood search around the cp model (see `JSP.ln_solve`)
+#  - the model is built once; at each iteration a neighborhood of tasks
+#     is relaxed, the other tasks keep their machines (by the domains
+#     of their options) and their order on the machines (by temporary
+#     precedences), but not their start; the domains are restored and
+#     the temporary constraints truncated from the proto after the solve
+#  - a neighborhood selector is a function (state, size, rng) -> mask,
+#     the tasks (in the order of `JSPInstance`) to relax
+#  - the size of each neighborhood is adapted: up if the solve of the
+#     neighborhood is complete, down if it hits the time limit
+
+__package__ = 'sched.jobshop'
+
+from collections import namedtuple
+
+import numpy as np
+
+from sched.jobshop.solution import evaluate
+
+_INT_MIN = -(1 << 62)
+
+ln_state = namedtuple('ln_state',
+                      ['instance',
+                       'task_start',
+                       'task_end',
+                       'row_task',
+                       'row_machine',
+                       'makespan'])
+
+
+def ln_schedule_state(instance, index, sol, row_task, machine_pos):
+  """
+    :param instance: `JSPInstance`
+    :param index: `cp_index_container`
+    :param sol: `JSPSchedule` of the model of the index
+    :param row_task: task (position) of each row of the index
+    :param machine_pos: machine (position) of each row of the index
+    :return: `ln_state`
+    """
+  used = sol.opt > 0
+  return ln_state(instance=instance,
+                  task_start=evaluate(sol.values, index.task_start),
+                  task_end=evaluate(sol.values, index.task_end),
+                  row_task=row_task[used],
+                  row_machine=machine_pos[used],
+                  makespan=sol.makespan)
+
+
+def _jobs_mask(instance, jobs, size):
+  """all the tasks of the first jobs, until `size` tasks are relaxed"""
+  sizes = np.diff(instance.job_ptr)[jobs]
+  n = np.searchsorted(np.cumsum(sizes), size) + 1
+  mask = np.zeros(instance.n_tasks, dtype=bool)
+  mask[instance.job_tasks(jobs[:n])] = True
+  return mask
+
+
+def random_machines(state, size, rng):
+  """the tasks on some random machines"""
+  data = state.instance
+  mask = np.zeros(data.n_tasks, dtype=bool)
+  for m in rng.permutation(data.machine_id.size):
+    if mask.sum() >= size:
+      break
+    mask[state.row_task[state.row_machine == m]] = True
+  return mask
+
+
+def time_window(state, size, rng):
+  """the tasks starting in a random time window"""
+  order = np.argsort(state.task_start, kind='stable')
+  lo = rng.integers(0, max(order.size - size, 0) + 1)
+  mask = np.zeros(order.size, dtype=bool)
+  mask[order[lo:lo + size]] = True
+  return mask
+
+
+def random_jobs(state, size, rng):
+  """all the tasks of some random jobs"""
+  data = state.instance
+  return _jobs_mask(data, rng.permutation(data.n_jobs), size)
+
+
+def critical_path(state, size, rng):
+  """
+    the jobs of a critical path, i.e., a chain of tasks ending at the
+      makespan, each starting at the end of its job or machine predecessor;
+      in a random order, then the other jobs at random
+    """
+  data = state.instance
+  start, end = state.task_start.tolist(), state.task_end.tolist()
+  task_job = data.task_job
+  first = np.zeros(data.n_tasks, dtype=bool)
+  first[data.job_ptr[:-1][np.diff(data.job_ptr) > 0]] = True
+  # the task ending at a time on a machine
+  machine_end = {(m, end[k]): k for k, m in
+                 zip(state.row_task.tolist(), state.row_machine.tolist())}
+  task_machines = {}
+  for k, m in zip(state.row_task.tolist(), state.row_machine.tolist()):
+    task_machines.setdefault(k, []).append(m)
+
+  k = int(np.argmax(state.task_end))
+  path = [k]
+  # a chain of zero durations may loop
+  while len(path) <= data.n_tasks:
+    if not first[k] and end[k - 1] == start[k]:
+      k = k - 1
+    else:
+      _prev = [machine_end.get((m, start[k]))
+               for m in task_machines.get(k, ())]
+      _prev = [p for p in _prev if p is not None and p != k]
+      if not _prev:
+        break
+      k = _prev[0]
+    path.append(k)
+  jobs = rng.permutation(np.unique(task_job[path]))
+  others = rng.permutation(np.setdiff1d(np.arange(data.n_jobs), jobs))
+  return _jobs_mask(data, np.concatenate([jobs, others]), size)
+
+
+LNS_NEIGHBORHOODS = {
+  'random_machines': random_machines,
+  'time_window': time_window,
+  'random_jobs': random_jobs,
+  'critical_path': critical_path,
+}
+
+
+class AdaptiveSize(object):
+  """
+   Size of a neighborhood, as a fraction of the tasks,
+     multiplied by `rate` after a complete solve of the neighborhood
+     and divided by it after a time out, within [lo, hi]
+  """
+
+  def __init__(self, size=0.1, lo=0.01, hi=0.8, rate=1.2):
+    self.size = size
+    self.lo, self.hi = lo, hi
+    self.rate = rate
+
+  def update(self, complete):
+    self.size = min(self.hi, self.size * self.rate) if complete \
+      else max(self.lo, self.size / self.rate)
+    return self.size
+
+
+def fix_domains(proto, idx, values):
+  """
+    fix the variables to their values by their domains
+    :param proto: `CpModelProto`
+    :param idx: the indices of the variables
+    :param values: the solution vector
+    :return: the domains before, for `restore_domains`
+    """
+  saved = []
+  for i, v in zip(idx.tolist(), values[idx].tolist()):
+    domain = proto.variables[i].domain
+    saved.append((i, list(domain)))
+    domain[:] = [v, v]
+  return saved
+
+
+def restore_domains(proto, saved):
+  for i, domain in saved:
+    proto.variables[i].domain[:] = domain
+
+
+def add_precedences(proto, before, after):
+  """
+    temporary constraints, `before[k] <= after[k]`
+    :param proto: `CpModelProto`
+    :param before: the indices of the variables (e.g., ends)
+    :param after: the indices of the variables (e.g., starts)
+    :return: the num of constraints before, for `truncate_constraints`
+    """
+  n = len(proto.constraints)
+  for a, b in zip(before.tolist(), after.tolist()):
+    linear = proto.constraints.add().linear
+    linear.vars.extend((a, b))
+    linear.coeffs.extend((1, -1))
+    linear.domain.extend((_INT_MIN, 0))
+  return n
+
+
+def truncate_constraints(proto, n):
+  del proto.constraints[n:]
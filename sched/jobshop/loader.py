@@ -0,0 +1,271 @@
+# ....................
+# @license: %MIT License%:~ http://www.opensource.org/licenses/MIT
+# @project: jobshop
+# @file: /loader.py
+# @description:
+#
+# Loaders of the benchmark files of the (flexible) JSP into `JSPInstance`
+#  - orlib, the OR-Library format: a line `n m`, then one line per job
+#     of m pairs `machine duration`, machines from 0
+#  - taillard, the format of E. Taillard: a line `n m ...`, then
+#     n lines of m durations, then n lines of m machines, from 1;
+#     text lines (`Times`, `Machines`, ...) are skipped
+#  - brandimarte, the FJSP format: a line `n m ...`, then one line per job,
+#     `#ops`, and for each op `k` and k pairs `machine duration`, from 1;
+#     only the files whose alternative machines form groups of identical
+#     machines are supported (see `load_brandimarte`), which excludes
+#     most of Mk01-Mk10: a `JSPInstance` has no machine-dependent
+#     durations, nor overlapping machine sets;
+#     the others raise `UnsupportedBenchmarkError`
+#  the numbers are streamed from the file, use `.to_objects()` of the result
+#  for the dicts of `JSPJob` and `JSPMachine`.
+#
+# usage:
+#   instance = load_benchmark('data/ft06.txt')
+#   for name, instance in load_benchmark_dir('data/ta'):
+#     ...
+
+__package__ = 'sched.jobshop'
+
+import logging
+import os
+from typing import Dict, Iterator
+
+import numpy as np
+
+from sched.jobshop.instance import JSPInstance
+
+logger = logging.getLogger(__package__)
+
+# brandimarte: groups of identical machines only, see `load_brandimarte`
+BENCHMARK_FORMATS = ('orlib', 'taillard', 'brandimarte')
+
+
+class UnsupportedBenchmarkError(Exception):
+  """
+   A valid benchmark file a `JSPInstance` cannot represent,
+    e.g., a Brandimarte FJSP with machine-dependent durations
+  """
+
+
+def _numeric_lines(f):
+  """the lines of integers, others (blank, comments, titles) are skipped"""
+  for line in f:
+    tokens = line.split()
+    if not tokens:
+      continue
+    try:
+      yield [int(float(x)) for x in tokens]
+    except ValueError:
+      continue
+
+
+def _tokens(lines):
+  for values in lines:
+    yield from values
+
+
+def _header(lines, fp):
+  values = next(lines, None)
+  if values is None or len(values) < 2:
+    raise ValueError(f"{fp}: no header `n m`")
+  return values[0], values[1]
+
+
+def _from_matrix(n, m, machine, duration):
+  # a route of m tasks per job, one machine per group
+  return JSPInstance(
+    job_id=np.arange(n),
+    job_release=np.zeros(n, dtype=np.int64),
+    job_due=np.full(n, -1, dtype=np.int64),
+    job_ptr=np.arange(n + 1) * m,
+    task_seq=np.tile(np.arange(m), n),
+    task_group=machine.ravel(),
+    task_duration=duration.ravel(),
+    group_id=np.arange(m),
+    group_ptr=np.arange(m + 1))
+
+
+def load_orlib(fp: str) -> JSPInstance:
+  """
+    an instance in the OR-Library format (the first one of the file)
+    :param fp:
+    :return:
+    """
+  with open(fp) as f:
+    lines = _numeric_lines(f)
+    n, m = _header(lines, fp)
+    pairs = np.fromiter(_tokens(lines), dtype=np.int64, count=2 * n * m)
+  pairs = pairs.reshape(n, m, 2)
+  return _from_matrix(n, m, pairs[..., 0], pairs[..., 1])
+
+
+def load_taillard(fp: str) -> JSPInstance:
+  """
+    an instance in the Taillard format
+    :param fp:
+    :return:
+    """
+  with open(fp) as f:
+    lines = _numeric_lines(f)
+    n, m = _header(lines, fp)
+    values = np.fromiter(_tokens(lines), dtype=np.int64, count=2 * n * m)
+  duration, machine = values.reshape(2, n, m)
+  return _from_matrix(n, m, machine - 1, duration)
+
+
+def load_brandimarte(fp: str) -> JSPInstance:
+  """
+    an instance in the Brandimarte (FJSP) format,
+      the alternative machines of an op must be a group of identical machines:
+      the machine sets of the ops are the same or disjoint,
+      and an op has the same duration on all machines of its set.
+      machines used by no op are dropped.
+      NOTE: this is not the case of most files of the literature
+      (e.g., Mk01-Mk10), they raise `UnsupportedBenchmarkError`
+    :param fp:
+    :return:
+    """
+  job_ptr, task_duration, task_machines = [0], [], []
+  with open(fp) as f:
+    lines = _numeric_lines(f)
+    n, _ = _header(lines, fp)
+    for j in range(n):
+      values = next(lines, None)
+      if values is None:
+        raise ValueError(f"{fp}: {n} jobs expected, {j} found")
+      ops, pos = values[0], 1
+      for o in range(ops):
+        k = values[pos]
+        pairs = values[pos + 1:pos + 1 + 2 * k]
+        pos += 1 + 2 * k
+        durations = set(pairs[1::2])
+        if len(durations) != 1:
+          raise UnsupportedBenchmarkError(
+            f"{fp}: op {o} of job {j} has durations "
+            f"{sorted(durations)} on its machines, "
+            f"not a group of identical machines")
+        task_machines.append(frozenset(pairs[0::2]))
+        task_duration.append(durations.pop())
+      job_ptr.append(job_ptr[-1] + ops)
+
+  # the machine sets as groups
+  groups = {}
+  group_of_machine = {}
+  for s in task_machines:
+    if s in groups:
+      continue
+    for _m in s:
+      if _m in group_of_machine:
+        raise UnsupportedBenchmarkError(
+          f"{fp}: machine {_m} is in the sets "
+          f"{sorted(group_of_machine[_m])} and {sorted(s)}, "
+          f"the sets are not a partition into groups")
+      group_of_machine[_m] = s
+    groups[s] = len(groups)
+  group_sets = sorted(groups, key=groups.get)
+  group_ptr = np.zeros(len(group_sets) + 1, dtype=np.int64)
+  np.cumsum([len(s) for s in group_sets], out=group_ptr[1:])
+  n_jobs = len(job_ptr) - 1
+  sizes = np.diff(job_ptr)
+  return JSPInstance(
+    job_id=np.arange(n_jobs),
+    job_release=np.zeros(n_jobs, dtype=np.int64),
+    job_due=np.full(n_jobs, -1, dtype=np.int64),
+    job_ptr=job_ptr,
+    task_seq=np.arange(sizes.sum()) - np.repeat(job_ptr[:-1], sizes),
+    task_group=[groups[s] for s in task_machines],
+    task_duration=task_duration,
+    group_id=np.arange(len(group_sets)),
+    group_ptr=group_ptr,
+    machine_id=[_m - 1 for s in group_sets for _m in sorted(s)])
+
+
+def sniff_format(fp: str) -> str:
+  """
+    guess the format of a benchmark file,
+      .fjs is brandimarte, else by the size of the first line after `n m`
+    :param fp:
+    :return: one of `BENCHMARK_FORMATS`
+    """
+  if fp.endswith('.fjs'):
+    return 'brandimarte'
+  with open(fp) as f:
+    lines = _numeric_lines(f)
+    n, m = _header(lines, fp)
+    values = next(lines, [])
+  if len(values) == 2 * m:
+    return 'orlib'
+  if len(values) == m:
+    return 'taillard'
+  return 'brandimarte'
+
+
+def load_benchmark(fp: str, fmt: str = None) -> JSPInstance:
+  """
+    :param fp:
+    :param fmt: one of `BENCHMARK_FORMATS`, default to `sniff_format`
+    :return:
+    """
+  fmt = sniff_format(fp) if fmt is None else fmt
+  if fmt == 'orlib':
+    return load_orlib(fp)
+  if fmt == 'taillard':
+    return load_taillard(fp)
+  if fmt == 'brandimarte':
+    return load_brandimarte(fp)
+  raise ValueError(f"format: {fmt} not in {BENCHMARK_FORMATS}")
+
+
+def load_benchmark_dir(path: str, fmt: str = None,
+                       suffixes=('.txt', '.jsp', '.fjs', ''),
+                       skip_unsupported: bool = False) \
+    -> Iterator:
+  """
+    load the benchmark files of a directory, in the order of the names,
+      files that cannot be read are skipped with a warning
+    :param path:
+    :param fmt: see `load_benchmark`
+    :param suffixes: of the files to load
+    :param skip_unsupported: skip (with a warning) the files that raise
+            `UnsupportedBenchmarkError`, otherwise it is raised
+    :return: a generator of (name, `JSPInstance`),
+            name is the file name without the suffix
+    """
+  for name in sorted(os.listdir(path)):
+    fp = os.path.join(path, name)
+    stem, suffix = os.path.splitext(name)
+    if not os.path.isfile(fp) or suffix not in suffixes:
+      continue
+    try:
+      instance = load_benchmark(fp, fmt)
+    except UnsupportedBenchmarkError as e:
+      if not skip_unsupported:
+        raise
+      logger.warning(f"skip {fp}, unsupported: {e}")
+      continue
+    except (ValueError, IndexError) as e:
+      logger.warning(f"skip {fp}: {e}")
+      continue
+    yield stem, instance
+
+
+def load_best_known(fp: str) -> Dict:
+  """
+    best-known values, one instance a line, `name value` or `name lb ub`,
+      lines starting with # are skipped
+    :param fp:
+    :return: dict of name -> (lb, ub)
+    """
+  best = {}
+  with open(fp) as f:
+    for line in f:
+      tokens = line.split()
+      if not tokens or tokens[0].startswith('#') or len(tokens) < 2:
+        continue
+      try:
+        values = [int(float(x)) for x in tokens[1:3]]
+      except ValueError:
+        continue
+      best[tokens[0]] = (values[0], values[-1])
+  return best
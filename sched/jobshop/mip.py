@@ -0,0 +1,292 @@
+# ....................
+# @license: %MIT License%:~ http://www.opensource.org/licenses/MIT
+# @project: jobshop
+# @file: /mip.py
+# @description:
+#
+# MIP formulations of the (flexible) JSP, see `JSP.mp_create_model`
+#  - the columns and the constraints are built in bulk from the index
+#     arrays of `JSPInstance`, as bounds and types of the columns,
+#     and (row, col, value) triplets of the constraint matrix by sense
+#  - the domains are the heads, tails and the makespan upper bound
+#     of the dispatching rules, so the big-M values are small
+#  - disjunctive, start times, machine assignments and
+#     an order binary per pair of tasks of a group that may overlap
+#  - time_indexed, a binary per task, machine and start time
+
+__package__ = 'sched.jobshop'
+
+from collections import namedtuple
+
+import numpy as np
+
+MIP_FORMULATIONS = ('disjunctive', 'time_indexed')
+
+mip_container = namedtuple('mip_container',
+                           ['kind',
+                            'lb',
+                            'ub',
+                            'vtype',
+                            'obj',
+                            'rows',
+                            'cols',
+                            'vals',
+                            'sense',
+                            'rhs',
+                            'col_task',
+                            'col_machine',
+                            'col_start'])
+
+
+class _Constraints(object):
+  """the triplets of the rows, by blocks"""
+
+  def __init__(self):
+    self.n = 0
+    self.rows, self.cols, self.vals = [], [], []
+    self.sense, self.rhs = [], []
+
+  def add(self, rows, cols, vals, sense, rhs):
+    """
+      :param rows: row (in the block) of each entry
+      :param sense: '<', '>' or '='
+      :param rhs: of each row of the block
+      """
+    rhs = np.asarray(rhs, dtype=float)
+    self.rows.append(np.asarray(rows, dtype=np.int64) + self.n)
+    self.cols.append(np.asarray(cols, dtype=np.int64))
+    self.vals.append(np.broadcast_to(np.asarray(vals, dtype=float),
+                                     self.rows[-1].shape))
+    self.sense.append(np.full(rhs.size, sense))
+    self.rhs.append(rhs)
+    self.n += rhs.size
+
+  def arrays(self):
+    return tuple(np.concatenate(v) if v else np.zeros(0)
+                 for v in (self.rows, self.cols, self.vals,
+                           self.sense, self.rhs))
+
+
+def _task_machines(instance, tasks):
+  """the (task, machine position) of the machines of the group of each task"""
+  group = instance.task_group[tasks]
+  size = instance.group_size[group]
+  task = np.repeat(tasks, size)
+  machine = np.repeat(instance.group_ptr[group], size) \
+            + np.arange(size.sum()) - np.repeat(np.cumsum(size) - size, size)
+  return task, machine
+
+
+def _precedences(instance):
+  """the tasks with a successor in their job, and the last tasks"""
+  job = instance.task_job
+  last = instance.job_ptr[1:][np.diff(instance.job_ptr) > 0] - 1
+  _prev = np.flatnonzero(job[:-1] == job[1:])
+  return _prev, last
+
+
+def disjunctive(instance, head, tail, lb, ub):
+  """
+    the disjunctive (Manne) formulation, columns:
+      s, start of each task; C, the makespan;
+      x, option of each task on each machine of its group (of copies);
+      y, if task k is before task l, for each pair k < l of a group
+        that may overlap in [head, ub - tail]
+    :param instance: `JSPInstance`
+    :param head: earliest start of each task
+    :param tail: work of the job after each task
+    :param lb: of the makespan
+    :param ub: of the makespan, the horizon
+    :return: `mip_container`
+    """
+  data = instance
+  n = data.n_tasks
+  p = data.task_duration
+  est, lst = head, ub - tail - p
+  group_size = data.group_size
+  flex = np.flatnonzero(group_size[data.task_group] > 1)
+  x_task, x_machine = _task_machines(data, flex)
+  n_x = x_task.size
+  # the first option of each task (of a group of copies),
+  #   the options of a task are by machine of its group
+  x_first = np.zeros(n, dtype=np.int64)
+  _size = group_size[data.task_group[flex]]
+  x_first[flex] = np.cumsum(_size) - _size
+
+  # pairs of a group that may overlap
+  order = np.argsort(data.task_group, kind='stable')
+  bounds = np.searchsorted(data.task_group[order],
+                           np.arange(data.n_groups + 1))
+  pair_k, pair_l = [], []
+  for g in range(data.n_groups):
+    tasks = order[bounds[g]:bounds[g + 1]]
+    i, j = np.triu_indices(tasks.size, 1)
+    pair_k.append(tasks[i])
+    pair_l.append(tasks[j])
+  pair_k = np.concatenate(pair_k) if pair_k else np.zeros(0, dtype=np.int64)
+  pair_l = np.concatenate(pair_l) if pair_l else np.zeros(0, dtype=np.int64)
+  m1 = lst[pair_k] + p[pair_k] - est[pair_l]
+  m2 = lst[pair_l] + p[pair_l] - est[pair_k]
+  keep = (m1 > 0) & (m2 > 0)
+  pair_k, pair_l, m1, m2 = pair_k[keep], pair_l[keep], m1[keep], m2[keep]
+  n_y = pair_k.size
+
+  c_col = n
+  x_off = n + 1
+  y_off = x_off + n_x
+  lb_ = np.concatenate([est, [lb], np.zeros(n_x + n_y)]).astype(float)
+  ub_ = np.concatenate([lst, [ub], np.ones(n_x + n_y)]).astype(float)
+  vtype = np.array(['C'] * (n + 1) + ['B'] * (n_x + n_y))
+  obj = np.zeros(lb_.size)
+  obj[c_col] = 1
+
+  cons = _Constraints()
+  # precedences of the routes, and the makespan
+  _prev, last = _precedences(data)
+  r = np.arange(_prev.size)
+  cons.add(np.repeat(r, 2), np.stack([_prev + 1, _prev], axis=1).ravel(),
+           np.tile([1, -1], r.size), '>', p[_prev])
+  r = np.arange(last.size)
+  cons.add(np.repeat(r, 2),
+           np.stack([np.full(last.size, c_col), last], axis=1).ravel(),
+           np.tile([1, -1], r.size), '>', p[last])
+  # a machine of the group
+  if n_x:
+    _tasks, _rows = np.unique(x_task, return_inverse=True)
+    cons.add(_rows, x_off + np.arange(n_x), 1, '=', np.ones(_tasks.size))
+
+  # the pairs on a single machine
+  single = group_size[data.task_group[pair_k]] == 1
+  k, l, _m1, _m2 = pair_k[single], pair_l[single], m1[single], m2[single]
+  y = y_off + np.flatnonzero(single)
+  r = np.arange(k.size)
+  #  y = 1, k before l: s_k - s_l + M1 y <= M1 - p_k
+  cons.add(np.repeat(r, 3), np.stack([k, l, y], axis=1).ravel(),
+           np.stack([np.ones(r.size), -np.ones(r.size), _m1],
+                    axis=1).ravel(), '<', _m1 - p[k])
+  #  y = 0, l before k: s_l - s_k - M2 y <= -p_l
+  cons.add(np.repeat(r, 3), np.stack([l, k, y], axis=1).ravel(),
+           np.stack([np.ones(r.size), -np.ones(r.size), -_m2],
+                    axis=1).ravel(), '<', -p[l])
+
+  # the pairs on each machine of a group of copies,
+  #   relaxed unless both are on the machine
+  copies = np.flatnonzero(~single)
+  _, _machine = _task_machines(data, pair_k[copies])
+  pair = np.repeat(copies, group_size[data.task_group[pair_k[copies]]])
+  k, l, _m1, _m2 = pair_k[pair], pair_l[pair], m1[pair], m2[pair]
+  y = y_off + pair
+  _rank = _machine - data.group_ptr[data.task_group[k]]
+  xk = x_off + x_first[k] + _rank
+  xl = x_off + x_first[l] + _rank
+  r = np.arange(k.size)
+  ones = np.ones(r.size)
+  #  s_k - s_l + M1 y + M1 x_km + M1 x_lm <= 3 M1 - p_k
+  cons.add(np.repeat(r, 5), np.stack([k, l, y, xk, xl], axis=1).ravel(),
+           np.stack([ones, -ones, _m1, _m1, _m1], axis=1).ravel(),
+           '<', 3 * _m1 - p[k])
+  #  s_l - s_k - M2 y + M2 x_km + M2 x_lm <= 2 M2 - p_l
+  cons.add(np.repeat(r, 5), np.stack([l, k, y, xk, xl], axis=1).ravel(),
+           np.stack([ones, -ones, -_m2, _m2, _m2], axis=1).ravel(),
+           '<', 2 * _m2 - p[l])
+
+  rows, cols, vals, sense, rhs = cons.arrays()
+  return mip_container(kind='disjunctive', lb=lb_, ub=ub_, vtype=vtype,
+                       obj=obj, rows=rows, cols=cols, vals=vals,
+                       sense=sense, rhs=rhs,
+                       col_task=x_task, col_machine=x_machine,
+                       col_start=np.full(n_x, -1, dtype=np.int64))
+
+
+def time_indexed(instance, head, tail, lb, ub):
+  """
+    the time-indexed formulation, columns:
+      x, if a task starts on a machine of its group at a time
+        in [head, ub - tail - duration]; C, the makespan (the last column)
+    :param instance: `JSPInstance`
+    :return: `mip_container`, see `disjunctive`
+    """
+  data = instance
+  n = data.n_tasks
+  p = data.task_duration
+  est, lst = head, ub - tail - p
+  # (task, machine), then the times of each
+  tm_task, tm_machine = _task_machines(data, np.arange(n))
+  width = (lst - est + 1)[tm_task]
+  col_task = np.repeat(tm_task, width)
+  col_machine = np.repeat(tm_machine, width)
+  col_start = np.repeat(est[tm_task], width) \
+              + np.arange(width.sum()) - np.repeat(np.cumsum(width) - width,
+                                                   width)
+  n_x = col_task.size
+  c_col = n_x
+  lb_ = np.concatenate([np.zeros(n_x), [lb]]).astype(float)
+  ub_ = np.concatenate([np.ones(n_x), [ub]]).astype(float)
+  vtype = np.array(['B'] * n_x + ['C'])
+  obj = np.zeros(n_x + 1)
+  obj[c_col] = 1
+  cols = np.arange(n_x)
+
+  cons = _Constraints()
+  # a machine and a start of each task
+  cons.add(col_task, cols, 1, '=', np.ones(n))
+  # a machine does a task at a time, x covers [t, t + p)
+  _p = p[col_task]
+  cover = np.repeat(cols, _p)
+  times = np.repeat(col_start, _p) \
+          + np.arange(_p.sum()) - np.repeat(np.cumsum(_p) - _p, _p)
+  _slots, _rows = np.unique(col_machine[cover] * (ub + 1) + times,
+                            return_inverse=True)
+  cons.add(_rows, cover, 1, '<', np.ones(_slots.size))
+  # precedences of the routes: sum t x_next - sum t x_prev >= p_prev
+  _prev, last = _precedences(data)
+  row_of = np.full(n, -1, dtype=np.int64)
+  row_of[_prev] = np.arange(_prev.size)
+  as_prev = row_of[col_task] >= 0
+  as_next = np.zeros(n, dtype=bool)
+  as_next[_prev + 1] = True
+  as_next = as_next[col_task]
+  cons.add(np.concatenate([row_of[col_task[as_prev]],
+                           row_of[col_task[as_next] - 1]]),
+           np.concatenate([cols[as_prev], cols[as_next]]),
+           np.concatenate([-col_start[as_prev], col_start[as_next]]),
+           '>', p[_prev])
+  # makespan: C - sum t x_last >= p_last
+  row_of = np.full(n, -1, dtype=np.int64)
+  row_of[last] = np.arange(last.size)
+  as_last = row_of[col_task] >= 0
+  cons.add(np.concatenate([row_of[col_task[as_last]], np.arange(last.size)]),
+           np.concatenate([cols[as_last], np.full(last.size, c_col)]),
+           np.concatenate([-col_start[as_last], np.ones(last.size)]),
+           '>', p[last])
+
+  rows, cols, vals, sense, rhs = cons.arrays()
+  return mip_container(kind='time_indexed', lb=lb_, ub=ub_, vtype=vtype,
+                       obj=obj, rows=rows, cols=cols, vals=vals,
+                       sense=sense, rhs=rhs,
+                       col_task=col_task, col_machine=col_machine,
+                       col_start=col_start)
+
+
+def mip_decode(instance, mip, values):
+  """
+    :param instance: `JSPInstance`
+    :param mip: `mip_container`
+    :param values: of the columns
+    :return: start and machine (position) of each task
+    """
+  data = instance
+  n = data.n_tasks
+  if mip.kind == 'disjunctive':
+    task_start = np.rint(values[:n]).astype(np.int64)
+    # single machine groups, then the option of the others
+    task_machine = data.group_ptr[data.task_group].copy()
+    opt = np.rint(values[n + 1:n + 1 + mip.col_task.size]) > 0
+    task_machine[mip.col_task[opt]] = mip.col_machine[opt]
+    return task_start, task_machine
+  chosen = np.rint(values[:mip.col_task.size]) > 0
+  task_start = np.zeros(n, dtype=np.int64)
+  task_machine = np.zeros(n, dtype=np.int64)
+  task_start[mip.col_task[chosen]] = mip.col_start[chosen]
+  task_machine[mip.col_task[chosen]] = mip.col_machine[chosen]
+  return task_start, task_machine
@@ -17,12 +17,28 @@
 
 __package__ = 'sched.jobshop'
 
-import datetime
+import bisect
+import math
+import multiprocessing
 import pickle
+import queue
 import random
 from collections import defaultdict, namedtuple
 
+from sched.jobshop.aio import *
+from sched.jobshop.bounds import *
+from sched.jobshop.cache import *
+from sched.jobshop.gantt import *
 from sched.jobshop.helper import *
+from sched.jobshop.heuristic import *
+from sched.jobshop.instance import *
+from sched.jobshop.lns import *
+from sched.jobshop.loader import *
+from sched.jobshop.mip import *
+from sched.jobshop.portfolio import *
+from sched.jobshop.solution import *
+from sched.jobshop.store import *
+from sched.protobuf import schema_pb2
 
 
 class JSP(Problem):
@@ -30,11 +46,73 @@ class JSP(Problem):
    An instance of Job Shop Scheduling Problem
   """
 
-  def mp_create_model(self, *args, **kwargs):
-    pass
+  def mp_create_model(self, formulation='disjunctive', **kwargs):
+    """
+      build (and solve) a MIP model of the JSP, see `sched.jobshop.mip`,
+        the columns and the rows are added in bulk to a `ModelWrapper`,
+        the horizon is the bounds of `cp_preprocess`
+      :param formulation: one of `MIP_FORMULATIONS`
+      :param kwargs:
+         - solver, 'copt' or 'gurobi', default to 'copt'
+         - solve, default to True
+         - max_sec, time limit of the solve
+         - verbose, log of the solver, default to 0
+      :return: `mp_solution` if solved
+      """
+    if formulation not in MIP_FORMULATIONS:
+      raise ValueError(f"formulation: {formulation} "
+                       f"not in {MIP_FORMULATIONS}")
+    if self.is_parallel:
+      raise ValueError('the mip model of a parallel JSP is not supported')
+    data = self.instance
+    self.mp_stats = stats = PhaseStats('mp')
+    with stats.phase('preprocess'):
+      head, tail = heads_tails(data.job_ptr, data.task_duration,
+                               data.job_release)
+      lb = makespan_lb(head, tail, data.task_group, data.task_duration,
+                       data.group_size)
+      ub, *_ = self.hr_dispatch(rule='best')
+      ub = max(int(ub), lb)
+    with stats.phase('formulation'):
+      mip = globals()[formulation](data, head, tail, lb, ub)
+    with stats.phase('model'):
+      self.mp_model = ModelWrapper(solver_name=kwargs.get('solver', 'copt'),
+                                   verbose=kwargs.get('verbose', 0))
+      x = self.mp_model.add_mvar(mip.lb, mip.ub, mip.vtype, mip.obj)
+      self.mp_model.add_mconstr(x, mip.rows, mip.cols, mip.vals,
+                                mip.sense, mip.rhs)
+    self.mp_formulation = mip
+    stats.count(formulation=formulation, columns=mip.lb.size,
+                rows=mip.rhs.size, nonzeros=mip.vals.size, lb=lb, ub=ub)
+    self.logger.info(f'{formulation} mip of {mip.lb.size} columns, '
+                     f'{mip.rhs.size} rows, makespan in [{lb}, {ub}]')
+    if not kwargs.get('solve', True):
+      return None
+    with stats.phase('solve'):
+      self.mp_model.optimize(max_seconds=kwargs.get('max_sec'))
+    return self.mp_extract_sol()
 
-  def mp_extract_sol(self, *args, **kwargs):
-    pass
+  def mp_extract_sol(self):
+    """
+      the solution of `mp_model`, in the layout of `cp_solution`
+      :return: a `cp_sol_container`, None if no solution is found
+      """
+    if not self.mp_model.has_solution():
+      self.logger.info('the mip model has no solution')
+      self.mp_solution = None
+      return None
+    data = self.instance
+    task_start, task_machine = mip_decode(
+      data, self.mp_formulation, np.asarray(self.mp_model.values))
+    self.mp_solution = self.sol_from_arrays(
+      job=data.job_id[data.task_job].tolist(),
+      group=data.group_id[data.task_group].tolist(),
+      machine=data.machine_id[task_machine].tolist(),
+      start=task_start,
+      end=task_start + data.task_duration)
+    self.logger.info(f'mip: makespan := {self.mp_solution.makespan}, '
+                     f'objective := {self.mp_model.objective_value}')
+    return self.mp_solution
 
   __name__ = f"{__package__}.JSP"
   logger = logging.getLogger(__name__)
@@ -60,21 +138,55 @@ class JSP(Problem):
                 'task_opt_on_m',
                 'makespan'])
 
+  cp_layout_container = \
+    namedtuple('cp_layout',
+               ['single',
+                'fixed',
+                'machine_intervals',
+                'task_durations',
+                'task_options',
+                'no_overlap',
+                'job_end',
+                'down',
+                'symmetry',
+                'makespan'])
+
+  # rules of `cp_add_symmetry`, the first is the default
+  SYMMETRY_RULES = ('first_use', 'load')
+
+  cp_bound_container = \
+    namedtuple('cp_bounds',
+               ['head',
+                'tail',
+                'duration',
+                'lb',
+                'ub'])
+
   def __init__(self,
-               jobs: Dict[Any, JSPJob] = None,
+               jobs: Union[Dict[Any, JSPJob], JSPInstance] = None,
                machines: Dict[Any, List[JSPMachine]] = None,
                **kwargs):
+    """
+      :param jobs: dict of `JSPJob`, or a `JSPInstance`
+      :param machines: dict of `JSPMachine` by group,
+              not needed for a `JSPInstance`
+      """
+    if isinstance(jobs, JSPInstance):
+      self.instance = jobs
+      jobs, machines = self.instance.to_objects()
+    elif jobs and machines:
+      self.instance = JSPInstance.from_objects(jobs, machines)
     if not (jobs and machines):
       raise ValueError('Cannot initialize the problem')
+    if self.instance.has_revisit():
+      raise ValueError('Cannot initialize the problem, '
+                       'a route visits a group more than once')
 
     self.jobs = jobs
     self.groups = machines
 
-    try:
-      self.mp_model: ModelWrapper = ModelWrapper(solver_name='copt')
-    except Exception as e:
-      logger.warning("Cannot create an optimization wrapper")
-      self.mp_model = None
+    # created on first access, see `mp_model`
+    self._mp_model = None
 
     # bool is flexible jsp
     self.is_fjsp = 0
@@ -85,68 +197,512 @@ class JSP(Problem):
         break
 
     # attrs for constraint programming
-    self._ub_variable = \
-      sum(t.duration for job in self.jobs.values() for t in job.tasks)
+    self._ub_variable = int(self.instance.task_duration.sum())
 
+    self.cp_bounds = None
     self.cp_vars = None
+    self.cp_index = None
     self.cp_model = None
     self.cp_solver = None
     self.cp_solution_printer = None
     self.cp_status = None
     self.cp_solution = None
+    self.cp_stats = PhaseStats('cp')
+    # attrs for incremental rescheduling, see `freeze_before`
+    self.cp_layout = None
+    self.cp_frozen = set()
+    self.cp_now = 0
+    # the rule of the symmetry breaking, see `cp_add_symmetry`
+    self.cp_symmetry = None
+
+    # attrs for mathematical programming, see `mp_create_model`
+    self.mp_formulation = None
+    self.mp_solution = None
+    self.mp_stats = PhaseStats('mp')
+
+    # attrs for dispatching heuristics
+    self.hr_solution = None
+    # attrs for rolling horizon
+    self.rh_solution = None
+    # attrs for large neighborhood search
+    self.ln_solution = None
+    # attrs for the portfolio, see `pf_solve`
+    self.pf_solution = None
+    self.pf_stats = PhaseStats('pf')
+
+  @property
+  def mp_model(self) -> ModelWrapper:
+    """the wrapper of a mathematical programming solver (COPT), or None"""
+    if self._mp_model is None:
+      try:
+        self._mp_model = ModelWrapper(solver_name='copt')
+      except Exception:
+        logger.warning("Cannot create an optimization wrapper")
+    return self._mp_model
+
+  @mp_model.setter
+  def mp_model(self, value):
+    self._mp_model = value
 
   def cp_create_model(self, **kwargs):
     """
       create and solve a constraint programming model;
          backend := cp_model.CpModel
       :param kwargs:
+         - warm_start, a schedule to start from:
+            a `cp_sol_container` (e.g., `self.cp_solution`,
+            `self.hr_create_sol()`), its dict, or a file from `dump_solution`;
+            its values are set as solution hints and
+            its makespan caps the makespan
+         - bounds, bool, default True,
+            use the heads, tails and makespan bounds of `cp_preprocess`
+            as domains instead of [0, sum of durations];
+            without a warm start, the schedule of the dispatching rule
+            of the ub is the warm start
+         - rule, of the dispatching rule of `cp_preprocess`, default 'best'
+         - lean, bool, default True,
+            a task on a group of a single machine is one fixed-size interval
+            on the task start and end; the per-machine variables
+            are only created for groups with copies
+         - fixed_size, bool, default True,
+            for a (non-parallel) flexible JSP, each machine of the group
+            has an optional interval of the task duration, present by its
+            option, on the task start and end; no duration variables,
+            nor the MinEquality/MaxEquality links.
+            if False, the variable-size per-machine intervals are used.
+         - on_solution, a function called with the `SatCallBack`
+            at each solution, see `cp_solve_async`
+         - stats_fp, a file to append the JSON line of `self.cp_stats`,
+            the wall time and memory of the phases and the size of the model
+         - flow, bool, default False,
+            minimize the makespan, then the sum of the ends of the jobs,
+            so the jobs end as early as they can (e.g., in `rh_solve`)
+         - busy, dict of (group, machine) -> list of (start, end),
+            fixed intervals the machines are not available in,
+            e.g., the tasks committed before, see `rh_solve`
+         - solve, bool, default True,
+            if False, only build the model (`self.cp_model`), see `ln_solve`
+         - parameters, dict of name -> value of the `CpSolver` parameters,
+            e.g., dict(optimize_with_core=True), see `pf_solve`
+         - symmetry, bool or one of `SYMMETRY_RULES`, default False,
+            break the symmetry of the identical machines of a group,
+            see `cp_add_symmetry`; True is the first rule
+         - cache, a `JSPSolutionCache` or its path, keyed by `cache_key`;
+            a cached schedule is a warm start; if it is optimal, the
+            model is solved with the hinted values fixed (no search),
+            so `self.cp_solution` and the model are as after a solve;
+            the schedule of the solve is cached if it is better;
+            not used with busy or flow
       :return:
       """
 
+    warm_start = kwargs.get('warm_start')
+    if warm_start is not None:
+      warm_start = self.as_sol_dict(warm_start)
+    busy = kwargs.get('busy') or {}
+
+    # the cp instance
+    model = cp_model.CpModel()
+    self.cp_stats = stats = PhaseStats('cp')
+
+    cache, cached = kwargs.get('cache'), None
+    if cache is not None and not (busy or kwargs.get('flow', False)):
+      if isinstance(cache, str):
+        cache = JSPSolutionCache(cache)
+      with stats.phase('cache'):
+        cached = cache.get(self.cache_key())
+      stats.count(cache='miss' if cached is None else
+                  'optimal' if cached['optimal'] else 'feasible')
+    else:
+      cache = None
+    if cached is not None:
+      _sol = self.sol_from_arrays(*cache_schedule(self.instance, cached))
+      if cached['optimal'] or warm_start is None \
+          or _sol.makespan < warm_start['makespan']:
+        warm_start = _sol._asdict()
+
+    with stats.phase('bounds'):
+      if kwargs.get('bounds', True):
+        bounds = self.cp_preprocess(warm_start=warm_start, busy=busy,
+                                    rule=kwargs.get('rule', 'best'))
+        if warm_start is None:
+          # the search would have to beat the ub for a first schedule
+          warm_start = self.as_sol_dict(self.hr_solution)
+      else:
+        # the tasks can be put after the busy intervals
+        ub = self._ub_variable + max(
+          (e for v in busy.values() for _, e in v), default=0)
+        if warm_start is not None:
+          ub = min(ub, int(warm_start['makespan']))
+        bounds = self.cp_bounds = self.cp_bound_container(
+          head=defaultdict(int),
+          tail=defaultdict(int),
+          duration=defaultdict(int),
+          lb=0,
+          ub=ub)
+    with stats.phase('variables'):
+      makespan = model.NewIntVar(bounds.lb, bounds.ub, name='C_max')
+      self.cp_vars = self.cp_var_container(task_start={},
+                                           task_end={},
+                                           task_start_on_m={},
+                                           task_end_on_m={},
+                                           task_dur_on_m={},
+                                           task_opt_on_m={},
+                                           task_int_on_m={},
+                                           makespan=makespan)
+      # groups of a single machine
+      single = {g for g, m_list in self.groups.items()
+                if len(m_list) == 1} if kwargs.get('lean', True) else set()
+      # groups of copies, with fixed-size optional intervals
+      fixed = {g for g in self.groups if g not in single} \
+        if kwargs.get('fixed_size', True) and not self.is_parallel else set()
+      self.cp_layout = self.cp_layout_container(
+        single=single,
+        fixed=fixed,
+        machine_intervals=defaultdict(list),
+        task_durations=defaultdict(list),
+        task_options=defaultdict(list),
+        no_overlap={},
+        job_end=[],
+        down={},
+        symmetry={},
+        makespan=None)
+      self.cp_add_job_vars(model, self.jobs.values(), bounds)
+
+    with stats.phase('constraints'):
+      self.cp_add_job_cons(model, self.jobs.values())
+      machine_intervals = self.cp_layout.machine_intervals
+
+      # fixed intervals of the busy machines
+      machines = {(g, m.idx) for g, m_list in self.groups.items()
+                  for m in m_list}
+      for (g, m_id), v in busy.items():
+        if (g, m_id) not in machines:
+          continue
+        for _s, _e in v:
+          machine_intervals[g, m_id].append(model.NewIntervalVar(
+            _s, _e - _s, _e, f'busy-{g}_{m_id}_{_s}'))
+
+      # non-overlapping
+      for k, v in machine_intervals.items():
+        self.cp_layout.no_overlap[k] = model.AddNoOverlap(v).Index()
+
+      # makespan
+      job_end = self.cp_layout.job_end
+      job_end.extend(self.cp_vars.task_end[job.idx, job.tasks[-1].group]
+                     for _, job in self.jobs.items())
+      self.cp_layout = self.cp_layout._replace(
+        makespan=model.AddMaxEquality(makespan, job_end).Index())
+
+      self.cp_symmetry = None
+      if kwargs.get('symmetry', False):
+        _rule = kwargs['symmetry']
+        self.cp_add_symmetry(model, rule=self.SYMMETRY_RULES[0]
+                             if _rule is True else _rule, busy=busy)
+
+      if kwargs.get('flow', False):
+        # the makespan first, then the sum of the job ends
+        model.Minimize(makespan * (len(job_end) * bounds.ub + 1)
+                       + sum(job_end))
+      else:
+        model.Minimize(makespan)
+
+    with stats.phase('index'):
+      self.cp_index = cp_index(self.cp_vars)
+    if self.cp_layout.symmetry:
+      with stats.phase('hints'):
+        # few schedules are found by the search alone under the symmetry
+        if warm_start is None:
+          warm_start = self.as_sol_dict(self.hr_create_sol('best', busy=busy))
+        warm_start = self.cp_symmetric_sol(warm_start)
+    if warm_start is not None:
+      with stats.phase('hints'):
+        stats.count(hints=self.cp_add_hints(model, warm_start))
+    self.cp_count_model(model)
+    self.cp_model = model
+    self.cp_frozen = set()
+    self.cp_now = 0
+    if kwargs.get('solve', True):
+      if cached is not None and cached['optimal']:
+        # the model with the hinted values fixed, it is solved in presolve
+        self.logger.info(f'cached optimal: makespan := '
+                         f'{int(cached["makespan"])}')
+        self.cp_solve(**{**kwargs, 'parameters': {
+          **kwargs.get('parameters', {}),
+          'fix_variables_to_their_hinted_value': True}})
+        if self.cp_status == cp_model.OPTIMAL:
+          return
+        self.logger.warning('the cached schedule does not fit the model')
+      self.cp_solve(**kwargs)
+      if cache is not None and self.cp_solution is not None:
+        self.cache_put(cache, cached)
+
+  def cache_key(self):
+    """
+      the key of the schedules of the problem in a `JSPSolutionCache`,
+        the fingerprint of the instance, and the parallel mode
+      """
+    return self.instance.fingerprint() + ('-para' if self.is_parallel else '')
+
+  def cache_put(self, cache, cached=None):
+    """
+      cache `self.cp_solution` if it is better than the entry
+      :param cache: a `JSPSolutionCache`
+      :param cached: the entry, see `JSPSolutionCache.get`
+      :return: if cached
+      """
+    sol = self.cp_solution
+    optimal = self.cp_status == cp_model.OPTIMAL
+    if cached is not None and (
+        cached['optimal'] or sol.makespan > cached['makespan']
+        or (sol.makespan == cached['makespan'] and not optimal)):
+      return False
+    with self.cp_stats.phase('cache'):
+      cache.put(self.cache_key(),
+                **cache_entry(self.instance, sol, optimal=optimal))
+    return True
+
+  def cp_symmetry_groups(self, busy=None):
+    """
+      the groups of identical machines, i.e., of copies
+        without busy intervals nor a machine down, not in a parallel JSP
+      :param busy: see `cp_create_model`
+      :return: dict of group -> the tasks (keys) of the group, in job order
+      """
+    if self.is_parallel:
+      return {}
+    _busy = {g for g, _ in (busy or {})} | {g for g, _ in self.cp_layout.down}
+    tasks = {g: [] for g, m_list in self.groups.items()
+             if len(m_list) > 1 and g not in _busy}
+    for job in self.jobs.values():
+      for t in job.tasks:
+        if t.group in tasks:
+          tasks[t.group].append((job.idx, t.group))
+    return tasks
+
+  def cp_add_symmetry(self, model, rule='first_use', busy=None):
+    """
+      break the symmetry of the identical machines of a group,
+        it keeps one of the c! assignments of each schedule;
+        the constraints of a group are in `self.cp_layout.symmetry`
+      :param model:
+      :param rule: one of `SYMMETRY_RULES`
+         - 'first_use', the first task (in job order) is on the first
+            machine, and a task is on the machine k + 1 only if a task
+            before it is on the machine k; with `used[i, k]`, if the
+            machine k is used by the first i + 1 tasks,
+              opt[i, k + 1] => used[i - 1, k],
+              used[i, k] <=> used[i - 1, k] or opt[i, k].
+         - 'load', the loads (work) of the machines are non-increasing
+      :param busy: see `cp_create_model`
+      :return: num of groups
+      """
+    if rule not in self.SYMMETRY_RULES:
+      raise ValueError(f"symmetry: {rule} not in {self.SYMMETRY_RULES}")
+    self.cp_symmetry = rule
+    task_opt_on_m = self.cp_vars.task_opt_on_m
+    duration = self.cp_bounds.duration
+    symmetry = self.cp_layout.symmetry
+    n_literals, log_removed = 0, 0.0
+    for g, tasks in self.cp_symmetry_groups(busy).items():
+      m_ids = [m.idx for m in self.groups[g]]
+      opt = [[task_opt_on_m[j, g, m_id] for m_id in m_ids]
+             for j, _ in tasks]
+      cons = []
+      if rule == 'load':
+        work = [max(duration[k], 1) for k in tasks]
+        load = [sum(p * _opt[k] for p, _opt in zip(work, opt))
+                for k in range(len(m_ids))]
+        cons.extend(model.Add(a >= b).Index()
+                    for a, b in zip(load[:-1], load[1:]))
+      else:
+        used_prev = None
+        for i, _opt in enumerate(opt):
+          if used_prev is None:
+            cons.extend(model.Add(v == 0).Index() for v in _opt[1:])
+          else:
+            cons.extend(model.AddImplication(v, u).Index()
+                        for v, u in zip(_opt[1:], used_prev))
+          if i == len(opt) - 1:
+            break
+          # the last machine is not needed
+          used = [model.NewBoolVar(f'used-{g}_{m_id}_{i}')
+                  for m_id in m_ids[:-1]]
+          n_literals += len(used)
+          for k, u in enumerate(used):
+            _or = [_opt[k]] if used_prev is None else [used_prev[k], _opt[k]]
+            cons.append(model.AddBoolOr(_or + [u.Not()]).Index())
+            cons.extend(model.AddImplication(v, u).Index() for v in _or)
+          used_prev = used
+      symmetry[g] = cons
+      log_removed += math.lgamma(len(m_ids) + 1) / math.log(10)
+    self.cp_stats.count(symmetry=rule,
+                        symmetry_groups=len(symmetry),
+                        symmetry_literals=n_literals,
+                        symmetry_constraints=sum(map(len, symmetry.values())),
+                        symmetry_log10_removed=round(log_removed, 2))
+    self.logger.info(f'symmetry ({rule}) of {len(symmetry)} groups, '
+                     f'10^{log_removed:.1f} assignments removed')
+    return len(symmetry)
+
+  def cp_drop_symmetry(self, groups=None):
+    """
+      clear the symmetry constraints of some groups in the proto,
+        e.g., a task is frozen on a machine, or a machine is down
+      :param groups: default to all
+      :return: the groups dropped
+      """
+    symmetry = self.cp_layout.symmetry
+    groups = [g for g in (list(symmetry) if groups is None else groups)
+              if g in symmetry]
+    proto = self.cp_model.Proto()
+    for g in groups:
+      for i in symmetry.pop(g):
+        proto.constraints[i].Clear()
+    if groups:
+      self.logger.info(f'symmetry of {len(groups)} groups dropped')
+    return groups
+
+  def cp_symmetric_sol(self, sol):
+    """
+      relabel the machines of a schedule in the groups of
+        `self.cp_layout.symmetry` by the rule of `cp_add_symmetry`,
+        so it is a solution (hint) of the model
+      :param sol: dict of `cp_sol_container` fields
+      :return: dict of `cp_sol_container` fields
+      """
+    symmetry = self.cp_layout.symmetry
+    duration = self.cp_bounds.duration
+    job, group, machine, start, end = schedule_arrays(sol)
+    job = np.asarray(job).tolist()
+    group = np.asarray(group).tolist()
+    machine = np.asarray(machine).tolist()
+    task_machine = dict(zip(zip(job, group), machine))
+    relabel = {}
+    for g, tasks in self.cp_symmetry_groups().items():
+      if g not in symmetry:
+        continue
+      m_ids = [m.idx for m in self.groups[g]]
+      if self.cp_symmetry == 'load':
+        load = dict.fromkeys(m_ids, 0)
+        for k in tasks:
+          load[task_machine[k]] += max(duration[k], 1)
+        order = sorted(m_ids, key=lambda m_id: -load[m_id])
+      else:
+        order = list(dict.fromkeys(task_machine[k] for k in tasks))
+        order += [m_id for m_id in m_ids if m_id not in order]
+      relabel.update({(g, m_id): m_ids[k] for k, m_id in enumerate(order)})
+    machine = [relabel.get((g, m_id), m_id)
+               for g, m_id in zip(group, machine)]
+    return self.sol_from_arrays(job, group, machine, start, end)._asdict()
+
+  def cp_solve(self, **kwargs):
+    """
+      solve `self.cp_model`, see `cp_create_model` for the kwargs
+      :return:
+      """
     max_sec = kwargs.get('max_sec', 20)
     max_sol = kwargs.get('max_sol', 20)
     num_workers = kwargs.get('num_workers', 2)
-    # the cp instance
-    model = cp_model.CpModel()
+    model, stats = self.cp_model, self.cp_stats
+    self.cp_solver = solver = cp_model.CpSolver()
+    solver.parameters.max_time_in_seconds = max_sec
+    solver.parameters.log_search_progress = \
+      kwargs.get('log_search_progress', True)
+    solver.parameters.num_search_workers = num_workers
+    solver.parameters.repair_hint = kwargs.get('repair_hint', False)
+    for k, v in kwargs.get('parameters', {}).items():
+      setattr(solver.parameters, k, v)
+    self.cp_solution_printer = solution_printer = SatCallBack(
+      self.cp_vars.makespan, max_sol, max_sec,
+      on_solution=kwargs.get('on_solution'))
+    with stats.phase('solve'):
+      self.cp_status = status = solver.SolveWithSolutionCallback(
+        model, solution_printer)
+    stats.count(solutions=solution_printer.solution_count(),
+                status=solver.StatusName(status),
+                branches=solver.NumBranches(),
+                conflicts=solver.NumConflicts())
+    self.logger.info('Status = %s' % solver.StatusName(status))
+    self.logger.info('Number of solutions found: %i' %
+                     solution_printer.solution_count())
+    if solution_printer.solution_count() > 0:
+      with stats.phase('extract'):
+        self.cp_solution = self.cp_extract_sol()
+    self.logger.info(self.cp_solver.ResponseStats())
+    self.logger.info(f'stats: {stats}')
+    if kwargs.get('stats_fp') is not None:
+      stats.dump(kwargs['stats_fp'])
 
-    # create variables
-    task_start = {}
-    task_end = {}
-    task_start_on_m = {}
-    task_end_on_m = {}
-    task_dur_on_m = {}
-    task_opt_on_m = {}
-    task_int_on_m = {}
-    makespan = model.NewIntVar(0, self._ub_variable, name='C_max')
-
-    # reduced maps
-    machine_intervals = defaultdict(list)
-    task_durations = defaultdict(list)
-    task_options = defaultdict(list)
-    for _, job in self.jobs.items():
+  def cp_add_job_vars(self, model, jobs, bounds):
+    """
+      the variables of the tasks of some jobs, in `self.cp_vars`,
+        and their intervals and options by machine in `self.cp_layout`
+      :param model:
+      :param jobs: `JSPJob`s
+      :param bounds: `cp_bound_container`
+      :return:
+      """
+    task_start, task_end, task_start_on_m, task_end_on_m, task_dur_on_m, \
+    task_opt_on_m, task_int_on_m, _ = self.cp_vars
+    single, fixed = self.cp_layout.single, self.cp_layout.fixed
+    machine_intervals = self.cp_layout.machine_intervals
+    task_durations = self.cp_layout.task_durations
+    task_options = self.cp_layout.task_options
+    for job in jobs:
       job_id = job.idx
       for t in job.tasks:  # iterate over the route
         dur, g = t.duration, t.group
         group_name_suffix = f"{job_id}@{g}"
-        start_var = model.NewIntVar(0, self._ub_variable,
+        _head = bounds.head[job_id, g]
+        _ub = bounds.ub - bounds.tail[job_id, g]
+        _dur = bounds.duration[job_id, g]
+        start_var = model.NewIntVar(_head, _ub - _dur,
                                     f'start-{group_name_suffix}')
-        end_var = model.NewIntVar(0, self._ub_variable,
+        end_var = model.NewIntVar(_head + _dur, _ub,
                                   f'end-{group_name_suffix}')
         task_start[job_id, g] = start_var
         task_end[job_id, g] = end_var
+        if g in single:
+          m_id = self.groups[g][0].idx
+          interval_var = model.NewIntervalVar(
+            start_var, dur, end_var, name=f'interval-{group_name_suffix}')
+          task_start_on_m[job_id, g, m_id] = start_var
+          task_end_on_m[job_id, g, m_id] = end_var
+          task_dur_on_m[job_id, g, m_id] = dur
+          task_opt_on_m[job_id, g, m_id] = 1
+          task_int_on_m[job_id, g, m_id] = interval_var
+          machine_intervals[g, m_id].append(interval_var)
+          continue
+        if g in fixed:
+          for machine in self.groups[g]:
+            m_id = machine.idx
+            suffix = f'{job_id}_{g}_{m_id}'
+            m_option_var = model.NewBoolVar(f'opt-{suffix}')
+            m_interval_var = model.NewOptionalIntervalVar(
+              start_var, dur, end_var, m_option_var,
+              name=f'interval-{suffix}')
+            task_start_on_m[job_id, g, m_id] = start_var
+            task_end_on_m[job_id, g, m_id] = end_var
+            task_dur_on_m[job_id, g, m_id] = dur * m_option_var
+            task_opt_on_m[job_id, g, m_id] = m_option_var
+            task_int_on_m[job_id, g, m_id] = m_interval_var
+            machine_intervals[g, m_id].append(m_interval_var)
+            task_options[job_id, g].append(m_option_var)
+          continue
         for machine in self.groups[g]:
           m_id = machine.idx
           suffix = f'{job_id}_{g}_{m_id}'
-          m_start_var = model.NewIntVar(0, self._ub_variable,
-                                        f'start-{suffix}')
-          m_end_var = model.NewIntVar(0, self._ub_variable, f'end-{suffix}')
-          m_duration_var = model.NewIntVar(0, self._ub_variable,
+          m_start_var = model.NewIntVar(_head, _ub, f'start-{suffix}')
+          m_end_var = model.NewIntVar(_head, _ub, f'end-{suffix}')
+          m_duration_var = model.NewIntVar(0, min(dur, _ub - _head),
                                            f'dur-{suffix}')
           m_option_var = model.NewBoolVar(f'opt-{suffix}')
-          m_interval_var = model.NewIntervalVar(m_start_var,
-                                                m_duration_var,
-                                                m_end_var,
-                                                name=f'interval-{suffix}')
+          # an unused machine must not block the others
+          #   (a zero-size interval still counts in NoOverlap)
+          m_interval_var = model.NewOptionalIntervalVar(
+            m_start_var, m_duration_var, m_end_var, m_option_var,
+            name=f'interval-{suffix}')
           task_start_on_m[job_id, g, m_id] = m_start_var
           task_end_on_m[job_id, g, m_id] = m_end_var
           task_dur_on_m[job_id, g, m_id] = m_duration_var
@@ -156,26 +712,52 @@ class JSP(Problem):
           task_durations[job_id, g].append(m_duration_var)
           task_options[job_id, g].append(m_option_var)
 
+  def cp_add_job_cons(self, model, jobs):
+    """
+      the constraints of the tasks of some jobs,
+        but the non-overlapping and the makespan
+      :param model:
+      :param jobs: `JSPJob`s
+      :return:
+      """
+    task_start, task_end, task_start_on_m, task_end_on_m, task_dur_on_m, \
+    task_opt_on_m, _, _ = self.cp_vars
+    single, fixed = self.cp_layout.single, self.cp_layout.fixed
+    task_durations = self.cp_layout.task_durations
+    task_options = self.cp_layout.task_options
+    jobs = list(jobs)
     # parallel scheduling?
     if not self.is_parallel:
-      for _, job in self.jobs.items():
+      for job in jobs:
         for t in job.tasks:
+          if t.group in single:
+            continue
           model.Add(sum(task_options[job.idx, t.group]) == 1)
+          if t.group in fixed:
+            continue
           for machine in self.groups[t.group]:
-            model.Add(task_dur_on_m[job.idx, t.group, machine.idx] == t.duration) \
-              .OnlyEnforceIf(task_opt_on_m[job.idx, t.group, machine.idx])
+            _key = job.idx, t.group, machine.idx
+            model.Add(task_dur_on_m[_key] == t.duration) \
+              .OnlyEnforceIf(task_opt_on_m[_key])
     else:
-      for _, job in self.jobs.items():
+      for job in jobs:
         for t in job.tasks:
+          if t.group in single:
+            continue
           model.Add(sum(task_durations[job.idx, t.group]) == t.duration)
-
-    # non-overlapping
-    for k, v in machine_intervals.items():
-      model.AddNoOverlap(v)
+          # a machine is used iff it takes a part of the task
+          for machine in self.groups[t.group]:
+            _key = job.idx, t.group, machine.idx
+            model.Add(task_dur_on_m[_key] >= 1) \
+              .OnlyEnforceIf(task_opt_on_m[_key])
+            model.Add(task_dur_on_m[_key] == 0) \
+              .OnlyEnforceIf(task_opt_on_m[_key].Not())
 
     # precedences
-    for _, job in self.jobs.items():
+    for job in jobs:
       for t in job.tasks:
+        if t.group in single or t.group in fixed:
+          continue
         m_list = self.groups[t.group]
         model.AddMinEquality(task_start[job.idx, t.group],
                              (task_start_on_m[job.idx, t.group, _m.idx]
@@ -189,49 +771,847 @@ class JSP(Problem):
         model.Add(
           task_start[job.idx, _next.group] >= task_end[job.idx, _prev.group])
 
-    # makespan
-    model.AddMaxEquality(
-      makespan,
-      [task_end[job.idx, job.tasks[-1].group] for _, job in self.jobs.items()])
-
-    model.Minimize(makespan)
-
-    self.cp_vars = self.cp_var_container(task_start=task_start,
-                                         task_end=task_end,
-                                         task_start_on_m=task_start_on_m,
-                                         task_end_on_m=task_end_on_m,
-                                         task_dur_on_m=task_dur_on_m,
-                                         task_opt_on_m=task_opt_on_m,
-                                         task_int_on_m=task_int_on_m,
-                                         makespan=makespan)
-    self.cp_model = model
-    self.cp_solver = solver = cp_model.CpSolver()
-    solver.parameters.max_time_in_seconds = max_sec
-    solver.parameters.log_search_progress = True
-    solver.parameters.num_search_workers = num_workers
-    self.cp_solution_printer = solution_printer = SatCallBack(
-      makespan, max_sol, max_sec)
-    self.cp_status = status = solver.SolveWithSolutionCallback(
-      model, solution_printer)
-    self.logger.info('Status = %s' % solver.StatusName(status))
-    self.logger.info('Number of solutions found: %i' %
-                     solution_printer.solution_count())
-    if solution_printer.solution_count() > 0:
-      self.cp_solution = self.cp_sol_container(**self.cp_extract_sol())
-    self.logger.info(self.cp_solver.ResponseStats())
+    # the machines down, see `remove_machine`
+    for (g, m_id), at in self.cp_layout.down.items():
+      for job in jobs:
+        self.cp_add_down(model, job, g, m_id, at)
+
+  def cp_count_model(self, model=None):
+    """
+      counters of the size of a cp model, in `self.cp_stats`
+      :param model: default to `self.cp_model`
+      :return:
+      """
+    proto = (self.cp_model if model is None else model).Proto()
+    kinds = defaultdict(int)
+    for c in proto.constraints:
+      kinds[c.WhichOneof('constraint')] += 1
+    intervals = kinds.pop('interval', 0)
+    self.cp_stats.count(variables=len(proto.variables),
+                        intervals=intervals,
+                        constraints=sum(kinds.values()),
+                        **{f'constraints_{k}': v for k, v in kinds.items()})
+    return self.cp_stats.counters
+
+  def cp_preprocess(self, **kwargs):
+    """
+      bounds for the variables of the cp model,
+        - head, the earliest start of a task by its job route and release
+        - tail, the work of the job after the task
+        - duration, the least span of a task
+            (for a parallel model, a task can be split over its group)
+        - lb, ub, bounds of the makespan;
+            ub is the makespan of the warm start, if any,
+            else of the dispatching rule, whose schedule is kept
+            in `self.hr_solution` (e.g., as the hint of the cp model)
+        so that a task lies in [head, ub - tail].
+      :param kwargs:
+         - warm_start, dict of `cp_sol_container` fields
+         - busy, see `cp_create_model`
+         - rule, see `hr_create_sol`, default to 'best'
+      :return:
+      """
+    data = self.instance
+    group_size = data.group_size
+    task_duration = data.task_duration
+    if self.is_parallel:
+      _size = group_size[data.task_group]
+      task_duration = (task_duration + _size - 1) // _size
+    head, tail = heads_tails(data.job_ptr, task_duration, data.job_release)
+    lb = makespan_lb(head, tail, data.task_group, task_duration,
+                     group_size, task_work=data.task_duration)
+    warm_start = kwargs.get('warm_start')
+    if warm_start is not None:
+      ub = int(warm_start['makespan'])
+    else:
+      ub = self.hr_create_sol(kwargs.get('rule', 'best'),
+                              busy=kwargs.get('busy')).makespan
+    ub = max(ub, lb)
+
+    keys = list(zip(data.job_id[data.task_job].tolist(),
+                    data.group_id[data.task_group].tolist()))
+    self.cp_bounds = self.cp_bound_container(
+      head=dict(zip(keys, head.tolist())),
+      tail=dict(zip(keys, tail.tolist())),
+      duration=dict(zip(keys, task_duration.tolist())),
+      lb=lb,
+      ub=int(ub))
+    self.logger.info(f'makespan in [{lb}, {ub}], '
+                     f'sum of durations := {self._ub_variable}')
+    return self.cp_bounds
 
-  def cp_extract_sol(self):
-    solution = {}
+  def cp_add_hints(self, model, sol: Dict):
+    """
+      set the values of a schedule as solution hints,
+        keys not in the model (e.g., of another instance) are skipped
+      :param model:
+      :param sol: dict of `cp_sol_container` fields
+      :return: num of hints
+      """
     vars_dict = self.cp_vars._asdict()
+    hinted = set()
     for _attr in self.cp_sol_container._fields:
-      vars = vars_dict[_attr]
-      if isinstance(vars, dict):
-        solution[_attr] = {k: self.cp_solver.Value(v) for k, v in vars.items()}
+      vars, vals = vars_dict[_attr], sol.get(_attr)
+      if vals is None:
+        continue
+      if not isinstance(vars, dict):
+        vars, vals = {None: vars}, {None: vals}
+      for k, v in vars.items():
+        # a variable may be shared by several keys, e.g., in a lean model
+        if k in vals and isinstance(v, cp_model.IntVar) \
+            and v.Index() not in hinted:
+          model.AddHint(v, int(vals[k]))
+          hinted.add(v.Index())
+    self.logger.info(f'warm start with {len(hinted)} hints')
+    return len(hinted)
+
+  def cp_extract_sol(self, solver=None):
+    """
+      read the schedule from the solution vector at once,
+        see `sched.jobshop.solution`
+      :param solver: default to `self.cp_solver`;
+              a `SatCallBack` gives the current solution of the search
+      :return: a `JSPSchedule`, its arrays are the machines used by the tasks,
+              and the fields of `cp_sol_container` are dicts built on access
+      """
+    solver = self.cp_solver if solver is None else solver
+    return JSPSchedule.from_solver(self.cp_index, solver)
+
+  def cp_solve_async(self, executor=None, **kwargs):
+    """
+      run `cp_create_model` in an executor of the running event loop,
+        call it from a coroutine; one solve at a time for a `JSP`;
+        the first incumbent is the warm start, by default the
+        schedule of the dispatching rule (kwarg rule, default 'best').
+        usage:
+          handle = jsp.cp_solve_async(max_sec=60)
+          async for inc in handle:
+            ...  # inc.makespan, inc.wall_time, inc.solution
+          sol = await handle
+      :param executor: default to the executor of the loop
+      :param kwargs: see `cp_create_model`
+      :return: a `CpSolveHandle`
+      """
+    return CpSolveHandle(self, executor=executor, **kwargs)
+
+  def cp_add_down(self, model, job, g, m_id, at):
+    """a task of the job on the machine ends before it is down"""
+    for t in job.tasks:
+      if t.group != g:
+        continue
+      _key = job.idx, g, m_id
+      _end = self.cp_vars.task_end_on_m[_key]
+      _opt = self.cp_vars.task_opt_on_m[_key]
+      if isinstance(_opt, cp_model.IntVar):
+        model.Add(_end <= at).OnlyEnforceIf(_opt)
+      else:
+        model.Add(_end <= at)
+
+  def add_jobs(self, jobs):
+    """
+      add jobs, e.g., rush orders; if the cp model is built,
+        only the variables and constraints of the new jobs are added,
+        the non-overlapping and the makespan constraints are extended
+        in the proto, and the horizon is extended by their work.
+        the new jobs do not start before `self.cp_now`,
+        see `freeze_before` and `cp_resolve`
+      :param jobs: dict of `JSPJob`, or a `JSPInstance` on the same groups
+      :return:
+      """
+    if isinstance(jobs, JSPInstance):
+      jobs, _ = jobs.to_objects()
+    _dup = set(jobs) & set(self.jobs)
+    if _dup:
+      raise ValueError(f'jobs already in the problem: {sorted(_dup)}')
+    _unknown = {t.group for job in jobs.values()
+                for t in job.tasks} - set(self.groups)
+    if _unknown:
+      raise ValueError(f'groups not in the problem: {sorted(_unknown)}')
+    new = JSPInstance.from_objects(jobs, self.groups)
+    if new.has_revisit():
+      raise ValueError('a route visits a group more than once')
+    self.jobs.update(jobs)
+    self.instance = JSPInstance.from_objects(self.jobs, self.groups)
+    self._ub_variable = int(self.instance.task_duration.sum())
+    if self.cp_model is None:
+      return
+
+    model, layout = self.cp_model, self.cp_layout
+    proto = model.Proto()
+    with self.cp_stats.phase('add_jobs'):
+      task_duration = new.task_duration
+      if self.is_parallel:
+        _size = new.group_size[new.task_group]
+        task_duration = (task_duration + _size - 1) // _size
+      release = np.maximum(new.job_release, self.cp_now)
+      head, tail = heads_tails(new.job_ptr, task_duration, release)
+      # the new jobs one after another after the schedule
+      bounds = self.cp_bounds
+      ub = max(bounds.ub, int(release.max(initial=0))) \
+           + int(new.task_duration.sum())
+      delta = ub - bounds.ub
+      keys = list(zip(new.job_id[new.task_job].tolist(),
+                      new.group_id[new.task_group].tolist()))
+      bounds.head.update(zip(keys, head.tolist()))
+      bounds.tail.update(zip(keys, tail.tolist()))
+      bounds.duration.update(zip(keys, task_duration.tolist()))
+      self.cp_bounds = bounds = bounds._replace(ub=ub)
+
+      # extend the domains of the tasks not frozen and the makespan
+      index = self.cp_index
+      frozen = self.cp_frozen_mask(index)
+      _vars = np.concatenate([
+        index.task_start[~frozen[0], 0], index.task_end[~frozen[0], 0],
+        index.row_start[~frozen[1], 0], index.row_end[~frozen[1], 0],
+        index.makespan[:, 0]])
+      for i in np.unique(_vars[_vars >= 0]).tolist():
+        proto.variables[i].domain[-1] += delta
+
+      machine_intervals = layout.machine_intervals
+      _sizes = {k: len(v) for k, v in machine_intervals.items()}
+      self.cp_add_job_vars(model, jobs.values(), bounds)
+      self.cp_add_job_cons(model, jobs.values())
+      for k, v in machine_intervals.items():
+        _new = v[_sizes.get(k, 0):]
+        if not _new:
+          continue
+        if k in layout.no_overlap:
+          proto.constraints[layout.no_overlap[k]].no_overlap.intervals \
+            .extend(_i.Index() for _i in _new)
+        else:
+          layout.no_overlap[k] = model.AddNoOverlap(v).Index()
+
+      # makespan, and the sum of the job ends (flow)
+      job_end = [self.cp_vars.task_end[job.idx, job.tasks[-1].group]
+                 for job in jobs.values()]
+      layout.job_end.extend(job_end)
+      lin_max = proto.constraints[layout.makespan].lin_max
+      for _end in job_end:
+        expr = lin_max.exprs.add()
+        expr.vars.append(_end.Index())
+        expr.coeffs.append(1)
+      objective = proto.objective
+      if len(objective.vars) > 1:
+        _pos = list(objective.vars).index(self.cp_vars.makespan.Index())
+        objective.coeffs[_pos] = len(layout.job_end) * bounds.ub + 1
+        objective.vars.extend(_end.Index() for _end in job_end)
+        objective.coeffs.extend(1 for _ in job_end)
+      self.cp_index = cp_index(self.cp_vars)
+      self.cp_count_model(model)
+    self.logger.info(f'{len(jobs)} jobs added, horizon := {bounds.ub}')
+
+  def remove_machine(self, group, idx, at=None):
+    """
+      a machine of the cp model is down from a time on, for good;
+        a task frozen on it (see `freeze_before`) is finished first
+      :param group:
+      :param idx: id of the machine in the group
+      :param at: default to `self.cp_now`
+      :return: the time the machine is down from
+      """
+    if self.cp_model is None:
+      raise ValueError('no cp model, see `cp_create_model`')
+    if all(m.idx != idx for m in self.groups.get(group, ())):
+      raise ValueError(f'machine {idx} not in group {group}')
+    at = self.cp_now if at is None else at
+    sol = self.cp_solution
+    if self.cp_frozen and sol is not None:
+      on_m = (sol.group == group) & (sol.machine == idx)
+      at = max([at] + [e for j, g, e in zip(sol.job[on_m].tolist(),
+                                            sol.group[on_m].tolist(),
+                                            sol.end[on_m].tolist())
+                       if (j, g) in self.cp_frozen])
+    if len(self.groups[group]) == 1:
+      self.logger.warning(f'the only machine of group {group} is down '
+                          f'from {at}')
+    model = self.cp_model
+    with self.cp_stats.phase('remove_machine'):
+      self.cp_drop_symmetry([group])
+      self.cp_layout.down[group, idx] = at
+      for job in self.jobs.values():
+        self.cp_add_down(model, job, group, idx, at)
+    self.logger.info(f'machine {idx}@{group} down from {at}')
+    return at
+
+  def cp_frozen_mask(self, index):
+    """the tasks and the rows of the index frozen by `freeze_before`"""
+    return tuple(
+      np.fromiter((k in self.cp_frozen for k in zip(_job.tolist(),
+                                                    _group.tolist())),
+                  dtype=bool, count=_job.size)
+      for _job, _group in ((index.task_job, index.task_group),
+                           (index.row_job, index.row_group)))
+
+  def freeze_before(self, t):
+    """
+      the tasks of `self.cp_solution` started before t are pinned,
+        i.e., their start, end and machines are fixed in the model;
+        the others start from t, see `cp_resolve`
+      :param t: the time now
+      :return: num of tasks pinned
+      """
+    sol = self.cp_solution
+    if sol is None or self.cp_model is None:
+      raise ValueError('no schedule to freeze, see `cp_create_model`')
+    proto = self.cp_model.Proto()
+    with self.cp_stats.phase('freeze'):
+      # the index of the schedule, the jobs added after are not started
+      index = sol.index
+      started = evaluate(sol.values, index.task_start) < t
+      self.cp_frozen.update(
+        (j, g) for j, g, _s in zip(index.task_job.tolist(),
+                                   index.task_group.tolist(),
+                                   started.tolist()) if _s)
+      tasks, rows = self.cp_frozen_mask(index)
+      # a frozen task keeps its machine
+      self.cp_drop_symmetry({g for _, g in self.cp_frozen})
+      _vars = np.concatenate([index.task_start[tasks, 0],
+                              index.task_end[tasks, 0]]
+                             + [v[rows, 0] for v in (index.row_start,
+                                                     index.row_end,
+                                                     index.row_dur,
+                                                     index.row_opt)])
+      fix_domains(proto, np.unique(_vars[_vars >= 0]), sol.values)
+      # the others start from t
+      index = self.cp_index
+      tasks, rows = self.cp_frozen_mask(index)
+      _vars = np.concatenate([index.task_start[~tasks, 0],
+                              index.row_start[~rows, 0]])
+      for i in np.unique(_vars[_vars >= 0]).tolist():
+        domain = proto.variables[i].domain
+        domain[0] = max(domain[0], t)
+    self.cp_now = max(self.cp_now, t)
+    self.logger.info(f'{int(tasks.sum())} tasks frozen before {t}')
+    return int(tasks.sum())
+
+  def cp_resolve(self, **kwargs):
+    """
+      solve the cp model again after the events
+        (`add_jobs`, `remove_machine`, `freeze_before`)
+      :param kwargs: see `cp_solve`, e.g., max_sec, and
+         - hint, 'previous', the values of `self.cp_solution`, or
+            'repair', the schedule of `hr_repair_sol`;
+            default to 'repair' if a machine is down
+      :return: the schedule, also `self.cp_solution`,
+              None if no schedule is found (`self.cp_solution` is kept)
+      """
+    if self.cp_model is None:
+      raise ValueError('no cp model, see `cp_create_model`')
+    proto = self.cp_model.Proto()
+    proto.solution_hint.Clear()
+    hint = kwargs.get('hint') or \
+           ('repair' if self.cp_layout.down else 'previous')
+    if hint == 'repair':
+      with self.cp_stats.phase('hints'):
+        self.cp_add_hints(self.cp_model,
+                          self.as_sol_dict(self.hr_repair_sol()))
+    elif self.cp_solution is not None:
+      values = self.cp_solution.values[:-1]
+      proto.solution_hint.vars.extend(range(values.size))
+      proto.solution_hint.values.extend(values.tolist())
+    self.cp_solve(**kwargs)
+    return self.cp_solution \
+      if self.cp_solution_printer.solution_count() > 0 else None
+
+  def hr_dispatch(self, rule='best', busy=None):
+    """
+      run the dispatching rule(s) on the arrays of `self.instance`
+      :param rule: one of `DISPATCHING_RULES`,
+              or 'best' to keep the best of them
+      :param busy: see `cp_create_model`,
+              a machine is ready after its last busy interval
+      :return: makespan, rule, start and machine (position) of each task
+      """
+    data = self.instance
+    rules = DISPATCHING_RULES if rule == 'best' else (rule,)
+    machine_ready = self.machine_ready(busy) if busy else None
+    best = None
+    for _rule in rules:
+      task_start, task_machine = dispatch(data.job_ptr,
+                                          data.task_group,
+                                          data.task_duration,
+                                          data.group_ptr,
+                                          release=data.job_release,
+                                          machine_ready=machine_ready,
+                                          rule=_rule)
+      makespan = int((task_start + data.task_duration).max(initial=0))
+      if best is None or makespan < best[0]:
+        best = (makespan, _rule, task_start, task_machine)
+    return best
+
+  def machine_ready(self, busy):
+    """
+      :param busy: see `cp_create_model`
+      :return: the end of the last busy interval of each machine (position)
+      """
+    data = self.instance
+    keys = zip(data.group_id[data.machine_group].tolist(),
+               data.machine_id.tolist())
+    return np.fromiter((max((e for _, e in busy.get(k, ())), default=0)
+                        for k in keys),
+                       dtype=np.int64, count=data.machine_id.size)
+
+  def hr_create_sol(self, rule='mwkr', **kwargs):
+    """
+      create a schedule by a priority dispatching rule,
+        see `sched.jobshop.heuristic.dispatch`;
+        the schedule has the layout of `cp_sol_container`,
+        it is feasible for the cp model and thus an upper bound.
+      :param rule: one of `DISPATCHING_RULES`,
+              or 'best' to keep the best of them
+      :param kwargs:
+         - busy, see `cp_create_model`
+      :return:
+      """
+    data = self.instance
+    makespan, _rule, task_start, task_machine = self.hr_dispatch(
+      rule=rule, busy=kwargs.get('busy'))
+    self.logger.info(f'dispatching rule {_rule}: makespan := {makespan}')
+    self.hr_solution = self.sol_from_arrays(
+      job=data.job_id[data.task_job].tolist(),
+      group=data.group_id[data.task_group].tolist(),
+      machine=data.machine_id[task_machine].tolist(),
+      start=task_start,
+      end=task_start + data.task_duration)
+    return self.hr_solution
+
+  def hr_repair_sol(self, rule='best'):
+    """
+      a schedule around the tasks frozen in `self.cp_solution`,
+        see `freeze_before`: the other tasks are dispatched from
+        `self.cp_now` and the end of the frozen tasks of their jobs,
+        the frozen tasks are busy intervals of their machines,
+        and the machines down (see `remove_machine`) are never ready
+      :param rule: see `hr_dispatch`
+      :return: a `cp_sol_container`
+      """
+    data = self.instance
+    sol = self.cp_solution
+    keys = zip(data.job_id[data.task_job].tolist(),
+               data.group_id[data.task_group].tolist())
+    frozen = np.fromiter((k in self.cp_frozen for k in keys), dtype=bool,
+                         count=data.n_tasks)
+    job, group, machine, start, end = (
+      v[np.fromiter((k in self.cp_frozen for k in zip(
+        sol.job.tolist(), sol.group.tolist())), dtype=bool,
+        count=len(sol))] for v in schedule_arrays(sol)) \
+      if sol is not None and frozen.any() \
+      else (np.zeros(0, dtype=np.int64),) * 5
+    busy = defaultdict(list)
+    for g, m_id, _e in zip(group.tolist(), machine.tolist(), end.tolist()):
+      busy[g, m_id].append((0, _e))
+    never = self.cp_bounds.ub + self._ub_variable
+    for (g, m_id), at in self.cp_layout.down.items():
+      busy[g, m_id].append((at, never))
+
+    # the tasks not frozen, the frozen ones are a prefix of each job
+    _sizes = np.add.reduceat(np.append(~frozen, False), data.job_ptr[:-1])
+    _sizes[np.diff(data.job_ptr) == 0] = 0
+    job_ptr = np.zeros(data.n_jobs + 1, dtype=np.int64)
+    np.cumsum(_sizes, out=job_ptr[1:])
+    job_ready = np.maximum(data.job_release, self.cp_now)
+    _ends = defaultdict(int)
+    for j, _e in zip(job.tolist(), end.tolist()):
+      _ends[j] = max(_ends[j], _e)
+    for k, j in enumerate(data.job_id.tolist()):
+      job_ready[k] = max(job_ready[k], _ends[j])
+    machine_ready = self.machine_ready(busy)
+    best = None
+    for _rule in (DISPATCHING_RULES if rule == 'best' else (rule,)):
+      task_start, task_machine = dispatch(job_ptr,
+                                          data.task_group[~frozen],
+                                          data.task_duration[~frozen],
+                                          data.group_ptr,
+                                          release=job_ready,
+                                          machine_ready=machine_ready,
+                                          rule=_rule)
+      makespan = int((task_start + data.task_duration[~frozen])
+                     .max(initial=0))
+      if best is None or makespan < best[0]:
+        best = (makespan, task_start, task_machine)
+    _, task_start, task_machine = best
+    return self.sol_from_arrays(
+      job=job.tolist() + data.job_id[data.task_job[~frozen]].tolist(),
+      group=group.tolist() + data.group_id[data.task_group[~frozen]].tolist(),
+      machine=machine.tolist() + data.machine_id[task_machine].tolist(),
+      start=np.concatenate([start, task_start]),
+      end=np.concatenate([end, task_start + data.task_duration[~frozen]]))
+
+  def rh_solve(self, window=100, overlap=20, order='start', max_sec=10,
+               keep=None, **kwargs):
+    """
+      rolling horizon, solve the jobs by windows in an order;
+        a window is solved by `cp_create_model` with the tasks committed
+        before as busy intervals, then its first `window - overlap` jobs
+        are committed, the others are solved again in the next window.
+      :param window: num of jobs of a window
+      :param overlap: num of jobs of a window solved again in the next one
+      :param order: start, by the start of the first task of the job
+              in the best dispatching rule; or release
+      :param max_sec: time limit of a window
+      :param keep: num of the last busy intervals of a machine kept
+              in a window, the earlier ones are merged into one from 0,
+              default to `window`; `float('inf')` to keep all
+      :param kwargs: of `cp_create_model`, flow defaults to True
+      :return: the schedule, a `cp_sol_container`, also `self.rh_solution`
+      """
+    if not 0 <= overlap < window:
+      raise ValueError(f"overlap: {overlap} not in [0, window: {window})")
+    data = self.instance
+    n_jobs = data.n_jobs
+    makespan, _, task_start, task_machine = self.hr_dispatch(rule='best')
+    if order == 'start':
+      key = np.minimum.reduceat(np.append(task_start, 0), data.job_ptr[:-1])
+    elif order == 'release':
+      key = data.job_release
+    else:
+      raise ValueError(f"order: {order} not in ['start', 'release']")
+    jobs = np.lexsort((np.arange(n_jobs), data.job_release, key))
+    keep = window if keep is None else keep
+
+    busy = defaultdict(list)
+    parts = []
+    pos, k = 0, 0
+    while pos < n_jobs:
+      batch = jobs[pos:pos + window]
+      commit = batch if pos + window >= n_jobs else batch[:window - overlap]
+      _busy = self.rh_busy(busy, keep)
+      sub = JSP(data.select_jobs(batch), para=self.is_parallel)
+      hint = sub.hr_create_sol('best', busy=_busy)
+      sub.cp_create_model(**{'flow': True, **kwargs},
+                          max_sec=max_sec, busy=_busy, warm_start=hint)
+      sol = hint if sub.cp_solution is None else sub.cp_solution
+      job, group, machine, start, end = schedule_arrays(sol)
+      mask = np.isin(job, data.job_id[commit])
+      part = tuple(v[mask] for v in (job, group, machine, start, end))
+      for g, m_id, _s, _e in zip(*(v.tolist() for v in part[1:])):
+        busy[g, m_id].append((_s, _e))
+      parts.append(part)
+      self.logger.info(f'window {k}: jobs [{pos}, {pos + batch.size}), '
+                       f'{commit.size} committed, '
+                       f'makespan := {int(part[4].max(initial=0))}')
+      pos += commit.size
+      k += 1
+
+    job, group, machine, start, end = (
+      np.concatenate([p[i] for p in parts]) for i in range(5))
+    self.rh_solution = self.sol_from_arrays(job=job.tolist(),
+                                            group=group.tolist(),
+                                            machine=machine.tolist(),
+                                            start=start, end=end)
+    self.logger.info(f'rolling horizon of {k} windows: '
+                     f'makespan := {self.rh_solution.makespan}')
+    if makespan < self.rh_solution.makespan:
+      # the windows are myopic, keep the dispatching of all jobs if better
+      self.logger.info(f'dispatching of all jobs is better: '
+                       f'makespan := {makespan}')
+      self.rh_solution = self.sol_from_arrays(
+        job=data.job_id[data.task_job].tolist(),
+        group=data.group_id[data.task_group].tolist(),
+        machine=data.machine_id[task_machine].tolist(),
+        start=task_start, end=task_start + data.task_duration)
+    return self.rh_solution
+
+  @staticmethod
+  def rh_busy(busy, keep=None):
+    """
+      the busy intervals of the machines, with the last `keep` of each
+        machine as they are, and the earlier ones merged into one from 0
+      :param busy: see `cp_create_model`
+      :param keep: None to keep all
+      :return:
+      """
+    if keep is None:
+      return busy
+    _busy = {}
+    for k, v in busy.items():
+      if len(v) <= keep:
+        _busy[k] = v
+        continue
+      v = sorted(v)
+      if keep == 0:
+        _busy[k] = [(0, max(e for _, e in v))]
       else:
-        solution[_attr] = self.cp_solver.Value(vars)
-    return solution
+        _busy[k] = [(0, v[-keep][0])] + v[-keep:] if v[-keep][0] > 0 \
+          else v[-keep:]
+    return _busy
 
-  def cp_to_gantt_mermaid(self, fp='result', start_date=None):
+  def ln_solve(self, max_sec=60, iter_sec=2, neighborhoods=None, size=0.1,
+               init_sec=None, seed=None, on_iteration=None, **kwargs):
+    """
+      large neighborhood search, see `sched.jobshop.lns`;
+        the model of `cp_create_model` is built once and solved for
+        `init_sec` from the warm start; then each iteration relaxes the
+        tasks of a neighborhood, keeps the machines and the order of
+        the others as in the incumbent, and solves for `iter_sec`
+        from the incumbent.
+      :param max_sec: time limit of the search, the build excluded
+      :param iter_sec: time limit of an iteration
+      :param neighborhoods: dict of name -> selector,
+              default to `LNS_NEIGHBORHOODS`; the selectors that improve
+              the makespan are chosen more often
+      :param size: initial size of each neighborhood, a fraction of the tasks
+      :param init_sec: time limit of the first solve, default to 10%
+      :param seed: of `numpy.random.default_rng`
+      :param on_iteration: a function called with the incumbent after
+              each solve, the search stops if it returns True
+      :param kwargs: of `cp_create_model`,
+              warm_start defaults to the best dispatching rule
+      :return: the schedule, a `JSPSchedule`, also `self.ln_solution`
+      """
+    data = self.instance
+    rng = np.random.default_rng(seed)
+    neighborhoods = neighborhoods or LNS_NEIGHBORHOODS
+    names = list(neighborhoods)
+    if kwargs.get('warm_start') is None:
+      kwargs['warm_start'] = self.hr_create_sol('best')
+    self.cp_create_model(**kwargs, solve=False)
+    model, index, stats = self.cp_model, self.cp_index, self.cp_stats
+    proto = model.Proto()
+    n_vars = len(proto.variables)
+    lb = self.cp_bounds.lb if kwargs.get('bounds', True) else 0
+
+    # the task (position) of each row, i.e., of a task and a machine
+    task_pos = {k: i for i, k in enumerate(
+      zip(index.task_job.tolist(), index.task_group.tolist()))}
+    row_task = np.fromiter(
+      (task_pos[k] for k in zip(index.row_job.tolist(),
+                                index.row_group.tolist())),
+      dtype=np.int64, count=index.row_job.size)
+    machine_pos = {k: i for i, k in enumerate(
+      zip(data.group_id[data.machine_group].tolist(),
+          data.machine_id.tolist()))}
+    row_machine = np.fromiter(
+      (machine_pos[k] for k in zip(index.row_group.tolist(),
+                                   index.row_machine.tolist())),
+      dtype=np.int64, count=row_task.size)
+    # the options and durations on the machines (a constant is -1)
+    row_var = np.stack([index.row_opt[:, 0], index.row_dur[:, 0]], axis=1)
+    row_start, row_end = index.row_start[:, 0], index.row_end[:, 0]
+    makespan_var = int(index.makespan[0, 0])
+
+    # the solver in use, e.g., to stop the search from another thread
+    self.cp_solver = solver = cp_model.CpSolver()
+    solver.parameters.num_search_workers = kwargs.get('num_workers', 2)
+    solver.parameters.log_search_progress = False
+    solver.parameters.max_time_in_seconds = \
+      0.1 * max_sec if init_sec is None else init_sec
+    _start = time.perf_counter()
+    with stats.phase('solve'):
+      status = solver.Solve(model)
+    if status not in (cp_model.OPTIMAL, cp_model.FEASIBLE):
+      self.logger.warning(f'no initial solution: {solver.StatusName(status)}')
+      return None
+    best = JSPSchedule.from_solver(index, solver)
+    objective = solver.ObjectiveValue()
+    self.logger.info(f'lns initial: makespan := {best.makespan}')
+    done = status == cp_model.OPTIMAL
+    if on_iteration is not None:
+      done = on_iteration(best) or done
+
+    sizes = {k: AdaptiveSize(size) for k in names}
+    scores = np.ones(len(names))
+    n_iter, n_improved = 0, 0
+    while not done and best.makespan > lb:
+      left = max_sec - (time.perf_counter() - _start)
+      if left <= 0:
+        break
+      i = rng.choice(len(names), p=scores / scores.sum())
+      name = names[i]
+      values = best.values[:-1]
+      with stats.phase('neighborhood'):
+        state = ln_schedule_state(data, index, best, row_task, row_machine)
+        relaxed = neighborhoods[name](
+          state, max(1, int(sizes[name].size * data.n_tasks)), rng)
+        # the other tasks keep their machines and their order
+        _fixed = ~relaxed[row_task]
+        _vars = row_var[_fixed].ravel()
+        _vars = np.unique(_vars[_vars >= 0])
+        saved = fix_domains(proto, _vars, values)
+        used = _fixed & (best.opt > 0)
+        _rows = np.flatnonzero(used)
+        _rows = _rows[np.lexsort((best.values[row_start[_rows]],
+                                  row_machine[_rows]))]
+        _next = row_machine[_rows[1:]] == row_machine[_rows[:-1]]
+        n_cons = add_precedences(proto, row_end[_rows[:-1]][_next],
+                                 row_start[_rows[1:]][_next])
+        _domain = list(proto.variables[makespan_var].domain)
+        proto.variables[makespan_var].domain[:] = [_domain[0], best.makespan]
+        proto.solution_hint.Clear()
+        proto.solution_hint.vars.extend(range(n_vars))
+        proto.solution_hint.values.extend(values.tolist())
+      solver.parameters.max_time_in_seconds = min(iter_sec, left)
+      with stats.phase('solve'):
+        status = solver.Solve(model)
+      truncate_constraints(proto, n_cons)
+      restore_domains(proto, saved)
+      proto.variables[makespan_var].domain[:] = _domain
+
+      n_iter += 1
+      sizes[name].update(status in (cp_model.OPTIMAL, cp_model.INFEASIBLE))
+      improved = False
+      if status in (cp_model.OPTIMAL, cp_model.FEASIBLE) \
+          and solver.ObjectiveValue() <= objective:
+        sol = JSPSchedule.from_solver(index, solver)
+        improved = sol.makespan < best.makespan
+        best, objective = sol, solver.ObjectiveValue()
+      if improved:
+        n_improved += 1
+        self.logger.info(f'lns {n_iter} {name} '
+                         f'({int(relaxed.sum())} tasks): '
+                         f'makespan := {best.makespan}')
+      scores[i] = 0.9 * scores[i] + 0.1 * improved + 0.01
+      if on_iteration is not None and on_iteration(best):
+        break
+
+    stats.count(iterations=n_iter, improvements=n_improved,
+                makespan=best.makespan,
+                sizes={k: round(v.size, 4) for k, v in sizes.items()})
+    self.logger.info(f'lns of {n_iter} iterations: '
+                     f'makespan := {best.makespan}')
+    self.cp_solution = self.ln_solution = best
+    return best
+
+  def pf_solve(self, max_sec=60, strategies=None, start_method=None,
+               **kwargs):
+    """
+      race a portfolio of strategies in processes, see
+        `sched.jobshop.portfolio`; the best dispatching rule is the first
+        incumbent, then the best schedule found by any strategy is kept
+        and shared (a strategy starts from the best one at the time),
+        until the deadline or until the makespan meets a lower bound
+        (of `cp_preprocess` or of a strategy)
+      :param max_sec: the deadline, from the start of the processes
+      :param strategies: keys of `PORTFOLIO_STRATEGIES`, default to all,
+              the 'mp' ones are skipped without COPT or GUROBI
+      :param start_method: of `multiprocessing.get_context`
+      :param kwargs:
+         - seed, of the 'ln' strategies
+         - grace, seconds to wait for the schedules sent before the stop,
+            default to 2, then the processes are terminated
+      :return: a `cp_sol_container`, also `self.pf_solution`
+      """
+    data = self.instance
+    self.pf_stats = stats = PhaseStats('pf')
+    with stats.phase('heuristic'):
+      lb = self.cp_preprocess().lb
+      best = self.hr_solution
+    arrays = schedule_arrays(best)
+    makespan, winner = best.makespan, 'heuristic'
+    # no race if the dispatching rule meets the lower bound
+    _strategies = pf_strategies(strategies, parallel=self.is_parallel) \
+      if makespan > lb else {}
+    status = {}
+    ctx = multiprocessing.get_context(start_method)
+    # the best schedule is shared in task order, not for a parallel JSP
+    task_start, task_machine = (None, None) if self.is_parallel \
+      else pf_tasks(data)(arrays)
+    shared = pf_shared(
+      stop=ctx.Event(), best=ctx.Value('q', makespan),
+      lb=ctx.Value('q', lb),
+      start=None if task_start is None
+      else ctx.Array('q', task_start.tolist(), lock=False),
+      machine=None if task_machine is None
+      else ctx.Array('q', task_machine.tolist(), lock=False))
+    messages = ctx.Queue()
+    procs = []
+    for name, strategy in _strategies.items():
+      if strategy['method'] == 'ln':
+        strategy.setdefault('seed', kwargs.get('seed'))
+      procs.append(ctx.Process(
+        target=pf_run, name=f'pf-{name}', daemon=True,
+        args=(name, strategy, data, self.is_parallel, arrays, max_sec,
+              shared, messages)))
+
+    def receive(timeout):
+      nonlocal arrays, makespan, winner
+      tag, name, *msg = messages.get(timeout=timeout)
+      if tag == 'solution' and msg[0] < makespan:
+        makespan, arrays = msg
+        winner = name
+        self.logger.info(f'portfolio {name}: makespan := {makespan}')
+      elif tag == 'done':
+        status[name] = msg[0]
+
+    with stats.phase('race'):
+      _deadline = time.perf_counter() + max_sec
+      for p in procs:
+        p.start()
+      while makespan > shared.lb.value and len(status) < len(procs):
+        left = _deadline - time.perf_counter()
+        if left <= 0:
+          break
+        try:
+          receive(min(left, 0.5))
+        except queue.Empty:
+          pass
+      shared.stop.set()
+      # the schedules sent before the stop
+      _deadline = time.perf_counter() + kwargs.get('grace', 2)
+      while len(status) < len(procs) \
+          and time.perf_counter() < _deadline:
+        try:
+          receive(0.1)
+        except queue.Empty:
+          pass
+      for p in procs:
+        p.join(timeout=0.1)
+        if p.is_alive():
+          p.terminate()
+          p.join()
+    optimal = makespan <= shared.lb.value
+    stats.count(strategies=list(_strategies), status=status, winner=winner,
+                makespan=makespan, lb=int(shared.lb.value), optimal=optimal)
+    self.logger.info(f'portfolio: makespan := {makespan} by {winner}, '
+                     f'lb := {shared.lb.value}, optimal := {optimal}')
+    self.pf_solution = self.sol_from_arrays(*arrays)
+    return self.pf_solution
+
+  def sol_from_arrays(self, job, group, machine, start, end):
+    """
+      assemble a `cp_sol_container` from a schedule given task by task,
+        machines of the group not chosen get an empty slot,
+        at the first point of the task not inside a busy slot of the machine
+      :return:
+      """
+    busy = defaultdict(list)
+    for j, g, m_id, s, e in zip(job, group, machine, start, end):
+      busy[g, m_id].append((int(s), int(e)))
+    for v in busy.values():
+      v.sort()
+    busy_start = {k: [s for s, _ in v] for k, v in busy.items()}
+
+    def empty_slot(g, m_id, s, e):
+      _starts = busy_start.get((g, m_id), [])
+      idx = bisect.bisect_left(_starts, s) - 1
+      if idx >= 0 and busy[g, m_id][idx][1] > s:
+        _end = busy[g, m_id][idx][1]
+        return _end if _end <= e else s
+      return s
+
+    task_start, task_end = {}, {}
+    task_start_on_m, task_end_on_m = {}, {}
+    task_dur_on_m, task_opt_on_m = {}, {}
+    for j, g, m_id, s, e in zip(job, group, machine, start, end):
+      s, e = int(s), int(e)
+      task_start[j, g], task_end[j, g] = s, e
+      for _m in self.groups[g]:
+        _opt = int(_m.idx == m_id)
+        _s = s if _opt else empty_slot(g, _m.idx, s, e)
+        task_start_on_m[j, g, _m.idx] = _s
+        task_end_on_m[j, g, _m.idx] = e if _opt else _s
+        task_dur_on_m[j, g, _m.idx] = e - s if _opt else 0
+        task_opt_on_m[j, g, _m.idx] = _opt
+    return self.cp_sol_container(task_start=task_start,
+                                 task_end=task_end,
+                                 task_start_on_m=task_start_on_m,
+                                 task_end_on_m=task_end_on_m,
+                                 task_dur_on_m=task_dur_on_m,
+                                 task_opt_on_m=task_opt_on_m,
+                                 makespan=max(task_end.values(), default=0))
+
+  def cp_to_gantt_mermaid(self, fp='result', start_date=None, sol=None,
+                          unit='m'):
     """
         
       Serialize to Mermaid.js Gantt graph
@@ -248,58 +1628,56 @@ class JSP(Problem):
           21 :active, a21, 08:30:50 , 4m
           ...
       ```
-      :return:
+      :param sol: a schedule (see `sched.jobshop.gantt.schedule_arrays`),
+              default to `self.cp_solution`
+      :param unit: of the time, see `sched.jobshop.gantt.MERMAID_UNITS`
+      :return: the directory of the record and the html
       """
-    sol = self.cp_solution
-    # 3-d data:
-    # job_id, group_id, machine_id
-    start = pd.Series(sol.task_start_on_m)
-    dur = pd.Series(sol.task_dur_on_m)
-    opt = pd.Series(sol.task_opt_on_m)
-    _start_date = datetime.datetime.now() if start_date is None else start_date
-
-    def generate_sections():
-      # ==== sections ====
-      for g, machines in self.groups.items():
-        for m in machines:
-          yield f"section {m}"
-          try:
-            _start = start[:, m.group, m.idx]
-            _dur = dur[:, m.group, m.idx]
-            _opt = opt[:, m.group, m.idx]
-            for job_id, _start in _start.items():
-              val = _opt[job_id]
-              if val == 0:
-                continue
-              start_time = _start_date + datetime.timedelta(
-                minutes=int(_start))
-              yield f"{job_id} :active, {job_id}@{g}, {start_time.strftime('%Y-%m-%d %H:%M:%S')}, {_dur[job_id]}m"
-          except:
-            self.logger.warning(f"no task started @{m}")
-
-    try:
-      data = generate_sections()
+    sol = self.cp_solution if sol is None else sol
+    if sol is None:
+      raise ValueError('no solution to serialize')
+    with self.cp_stats.phase('gantt'):
       _dir = f'{fp}/%d' % time.time()
-      os.mkdir(_dir)
+      os.makedirs(_dir)
       record_path = f'{_dir}/gantt.record'
       html_path = f'{_dir}/gantt.html'
+      records = gantt_records(sol, machines=self.groups,
+                              start_date=start_date, unit=unit)
       with open(record_path, 'w') as f:
-        for line in MERMAID_GANTT_HEADER:
-          f.write(line)
-          f.write('\n')
-        f.write(f"title schedule of (f)jsp\n")
-        for line in data:
+        for line in gantt_mermaid_lines(records,
+                                        header=MERMAID_GANTT_HEADER,
+                                        unit=unit):
           f.write(line)
           f.write('\n')
-    except Exception as e:
-      self.logger.exception(e)
-
-    else:
       render_meimaid_html(record_path=record_path,
-                          fp=html_path)
+                          fp=html_path,
+                          stream=True)
 
-      self.logger.info(f"solution to gantt graph finished\n"
-                       f"saved to {_dir}")
+    self.logger.info(f"solution to gantt graph finished\n"
+                     f"saved to {_dir}")
+    return _dir
+
+  def cp_export_gantt(self, fp, fmt='csv', start_date=None, sol=None,
+                      unit='m'):
+    """
+      export the assignments by machine, for other viewers,
+        see `sched.jobshop.gantt.GANTT_FIELDS` for the columns
+      :param fp: the file path
+      :param fmt: csv, or json (JSON lines)
+      :param sol: default to `self.cp_solution`
+      :param unit: of the time, a unit of `numpy.timedelta64`
+      :return: num of rows
+      """
+    sol = self.cp_solution if sol is None else sol
+    if sol is None:
+      raise ValueError('no solution to export')
+    if fmt not in ('csv', 'json'):
+      raise ValueError(f"format: {fmt} not implemented yet")
+    records = gantt_records(sol, machines=self.groups, start_date=start_date,
+                            unit=unit)
+    if fmt == 'csv':
+      return gantt_to_csv(records, fp)
+    return gantt_to_json(records, fp)
 
   # ===================
   # utility functions
@@ -339,21 +1717,129 @@ class JSP(Problem):
     }
     return jobs, machines
 
+  def as_sol_dict(self, sol) -> Dict:
+    """
+      a schedule as a dict of `cp_sol_container` fields
+      :param sol: `cp_sol_container`, dict, `sched.Schedule` message,
+              or path of `dump_solution`
+      :return:
+      """
+    if isinstance(sol, str):
+      sol = self.load_solution(sol)
+    if isinstance(sol, schema_pb2.Schedule):
+      sol = self.sol_from_arrays(job=sol.job, group=sol.group,
+                                 machine=sol.machine, start=sol.start,
+                                 end=sol.end)
+    if hasattr(sol, '_asdict'):
+      sol = sol._asdict()
+    if not isinstance(sol, dict):
+      raise ValueError(f"cannot read a schedule from {type(sol)}")
+    return sol
+
+  def sol_to_proto(self, sol=None):
+    """
+      a schedule to the protobuf message `sched.Schedule`,
+        one row per machine used by a task
+      :param sol: default to `self.cp_solution`
+      :return:
+      """
+    message = schema_pb2.Schedule()
+    if sol is None or sol is self.cp_solution:
+      sol = self.cp_solution
+      if self.cp_solver is not None:
+        message.status = self.cp_solver.StatusName(self.cp_status)
+    if isinstance(sol, JSPSchedule):
+      message.makespan = sol.makespan
+      for attr in ('job', 'group', 'machine', 'start', 'end'):
+        getattr(message, attr).extend(getattr(sol, attr).tolist())
+      return message
+    sol = self.as_sol_dict(sol)
+    keys = [k for k, v in sol['task_opt_on_m'].items() if v]
+    message.makespan = int(sol['makespan'])
+    message.job.extend(k[0] for k in keys)
+    message.group.extend(k[1] for k in keys)
+    message.machine.extend(k[2] for k in keys)
+    message.start.extend(int(sol['task_start_on_m'][k]) for k in keys)
+    message.end.extend(int(sol['task_end_on_m'][k]) for k in keys)
+    return message
+
+  def dump_solution(self, path, sol=None, protocol='pickle'):
+    """
+      dump a schedule to a data file, default to `self.cp_solution`
+      :param protocol: pickle or protobuf (`sched.Schedule`)
+      :return: the file path
+      """
+    sol = self.cp_solution if sol is None else sol
+    if sol is None:
+      raise ValueError('no solution to dump')
+    current_time = time.time()
+    if protocol == 'pickle':
+      fp = f'{path}/%d-solution.pickle' % current_time
+      with open(fp, 'wb') as f:
+        pickle.dump(self.as_sol_dict(sol), f)
+    elif protocol == 'protobuf':
+      fp = f'{path}/%d-solution.pb' % current_time
+      with open(fp, 'wb') as f:
+        f.write(self.sol_to_proto(sol).SerializeToString())
+    else:
+      raise ValueError(f"protocol: {protocol} not implemented yet")
+    return fp
+
+  @staticmethod
+  def load_solution(fp):
+    """
+      load a schedule saved by `dump_solution`,
+        a dict for pickle, a `sched.Schedule` message for protobuf
+      """
+    with open(fp, 'rb') as f:
+      if fp.endswith('.pb'):
+        return schema_pb2.Schedule.FromString(f.read())
+      return pickle.load(f)
+
   def dump_instance(self, path, protocol='pickle'):
     """
       dump jobs and machines to data files
+      :param protocol: pickle, or protobuf (`sched.JSPInstance`)
+      :return: the file paths
       """
     current_time = time.time()
     if protocol == 'pickle':
-      with open(f'{path}/%d-jobs.pickle' % current_time, 'wb') as f:
+      fps = [f'{path}/%d-jobs.pickle' % current_time,
+             f'{path}/%d-machines.pickle' % current_time]
+      with open(fps[0], 'wb') as f:
         pickle.dump(self.jobs, f)
-      with open(f'{path}/%d-machines.pickle' % current_time, 'wb') as f:
+      with open(fps[1], 'wb') as f:
         pickle.dump(self.groups, f)
+    elif protocol == 'protobuf':
+      fps = [f'{path}/%d-jsp.pb' % current_time]
+      with open(fps[0], 'wb') as f:
+        f.write(self.instance.to_proto().SerializeToString())
     else:
       raise ValueError(f"protocol: {protocol} not implemented yet")
+    return fps
+
+  @staticmethod
+  def load_instance(fp, k=None):
+    """
+      load an instance saved by `dump_instance`,
+        for pickle, `fp` is the file of jobs (*-jobs.pickle);
+        or the k-th instance of a `JSPStore` directory
+      :return: a `JSPInstance`, for `JSP(...)`
+      """
+    if os.path.isdir(fp):
+      return JSPStore(fp)[0 if k is None else k]
+    if fp.endswith('.pb'):
+      with open(fp, 'rb') as f:
+        return JSPInstance.from_proto(f.read())
+    with open(fp, 'rb') as f:
+      jobs = pickle.load(f)
+    with open(fp.replace('-jobs.pickle', '-machines.pickle'), 'rb') as f:
+      machines = pickle.load(f)
+    return JSPInstance.from_objects(jobs, machines)
 
 
 def sol_to_series(jsp: JSP):
+  import pandas as pd
   sol = jsp.cp_solution
   start = pd.Series(sol['task_start_on_m'])
   end = pd.Series(sol['task_end_on_m'])
@@ -364,8 +1850,10 @@ def sol_to_series(jsp: JSP):
 
 # aliases
 jsp_random_instance = JSP.rd_instance
+jsp_random_arrays = JSPInstance.rd_instance
 
 if __name__ == '__main__':
+  setup_logging()
   # trial run
   m, n, p, d = 5, 10, 1, 0.8
   jobs, machines = jsp_random_instance(m, n, copy=p, density=d)
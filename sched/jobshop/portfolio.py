@@ -0,0 +1,233 @@
+# ....................
+# @license: %MIT License%:~ http://www.opensource.org/licenses/MIT
+# @project: jobshop
+# @file: /portfolio.py
+# @description:
+#
+# Portfolio of solves racing in processes (see `JSP.pf_solve`)
+#  - a strategy is a dict of a method ('cp', 'ln' or 'mp') and its kwargs,
+#     each runs in a process on a `JSP` of the same `JSPInstance`
+#  - the processes share the best makespan, its schedule (the start and
+#     the machine of each task, not for a parallel JSP) and the best
+#     lower bound; a strategy starts from the best schedule at the time
+#     it builds its model, a solve stops if it cannot improve the best
+#     makespan, and all stop once they meet (proved optimal)
+#  - a thread of each process checks the stop on a timer, and stops
+#     the running solve, also when it has found no solution yet
+#  - the schedules are sent to the parent as arrays, see `schedule_arrays`
+#  - the 'mp' strategies need COPT or GUROBI, they are skipped otherwise
+
+__package__ = 'sched.jobshop'
+
+import logging
+import math
+import threading
+import traceback
+from collections import namedtuple
+
+import numpy as np
+
+from sched.jobshop.gantt import schedule_arrays
+from sched.util.utils import has_backend
+
+logger = logging.getLogger(__package__)
+
+PORTFOLIO_STRATEGIES = {
+  'cp': dict(method='cp'),
+  'cp_core': dict(method='cp', parameters=dict(optimize_with_core=True)),
+  'cp_lns': dict(method='ln', iter_sec=1),
+  'mip': dict(method='mp', formulation='disjunctive'),
+}
+
+# backends of the 'mp' strategies, by preference
+PORTFOLIO_BACKENDS = ('COPT', 'GUROBI')
+
+# start, machine: arrays of the best schedule in task order, see `pf_tasks`
+pf_shared = namedtuple('pf_shared', ['stop', 'best', 'lb', 'start', 'machine'])
+
+# seconds between two checks of the stop
+PORTFOLIO_POLL = 0.1
+
+
+def pf_strategies(names=None, parallel=False):
+  """
+    the strategies that can run here
+    :param names: keys of `PORTFOLIO_STRATEGIES`, default to all
+    :param parallel: if the JSP is parallel, no mip model
+    :return: dict of name -> strategy
+    """
+  names = list(PORTFOLIO_STRATEGIES) if names is None else names
+  backend = next((b for b in PORTFOLIO_BACKENDS if has_backend(b)), None)
+  strategies = {}
+  for name in names:
+    if name not in PORTFOLIO_STRATEGIES:
+      raise ValueError(f"strategy: {name} "
+                       f"not in {list(PORTFOLIO_STRATEGIES)}")
+    strategy = dict(PORTFOLIO_STRATEGIES[name])
+    if strategy['method'] == 'mp':
+      if backend is None or parallel:
+        logger.info(f'portfolio: skip {name}, no mip solver')
+        continue
+      strategy.setdefault('solver', backend.lower())
+    strategies[name] = strategy
+  return strategies
+
+
+def pf_tasks(instance):
+  """
+    :param instance: `JSPInstance`
+    :return: a function of the arrays of `schedule_arrays` to
+            the start and the machine (position) of each task
+    """
+  task_pos = dict(zip(zip(instance.job_id[instance.task_job].tolist(),
+                          instance.group_id[instance.task_group].tolist()),
+                      range(instance.n_tasks)))
+  machine_group = instance.group_id[instance.machine_group]
+  machine_pos = dict(zip(zip(machine_group.tolist(),
+                             instance.machine_id.tolist()),
+                         range(instance.machine_id.size)))
+
+  def tasks(arrays):
+    job, group, machine, start, _ = (np.asarray(v).tolist() for v in arrays)
+    pos = [task_pos[k] for k in zip(job, group)]
+    task_start = np.zeros(instance.n_tasks, dtype=np.int64)
+    task_machine = np.zeros(instance.n_tasks, dtype=np.int64)
+    task_start[pos] = start
+    task_machine[pos] = [machine_pos[k] for k in zip(group, machine)]
+    return task_start, task_machine
+
+  return tasks
+
+
+def pf_best(shared, instance):
+  """
+    the best schedule so far
+    :return: arrays of `schedule_arrays`, None if not shared
+    """
+  if shared.start is None:
+    return None
+  with shared.best.get_lock():
+    task_start = np.frombuffer(shared.start, dtype=np.int64).copy()
+    task_machine = np.frombuffer(shared.machine, dtype=np.int64).copy()
+  return (instance.job_id[instance.task_job],
+          instance.group_id[instance.task_group],
+          instance.machine_id[task_machine],
+          task_start, task_start + instance.task_duration)
+
+
+def _publish(shared, queue, name, sol, tasks=None):
+  """
+    send the schedule to the parent if it improves the best makespan
+    :param tasks: see `pf_tasks`, to share the schedule
+    """
+  if sol.makespan >= shared.best.value:
+    return False
+  arrays = schedule_arrays(sol)
+  task_start, task_machine = tasks(arrays) \
+    if tasks is not None and shared.start is not None else (None, None)
+  with shared.best.get_lock():
+    if sol.makespan >= shared.best.value:
+      return False
+    shared.best.value = sol.makespan
+    if task_start is not None:
+      shared.start[:] = task_start.tolist()
+      shared.machine[:] = task_machine.tolist()
+  queue.put(('solution', name, sol.makespan, arrays))
+  return True
+
+
+def _bound(shared, queue, name, lb):
+  with shared.lb.get_lock():
+    if lb <= shared.lb.value:
+      return False
+    shared.lb.value = lb
+  queue.put(('bound', name, lb))
+  return True
+
+
+def _done(shared):
+  return shared.stop.is_set() or shared.lb.value >= shared.best.value
+
+
+def _watch(shared, problem, finished):
+  """stop the running solve of the problem once done, on a timer"""
+  while not finished.wait(PORTFOLIO_POLL):
+    if not _done(shared):
+      continue
+    if problem.cp_solver is not None:
+      problem.cp_solver.StopSearch()
+    if problem._mp_model is not None:
+      problem._mp_model.terminate()
+
+
+def pf_run(name, strategy, instance, para, warm_start, max_sec, shared,
+           queue):
+  """
+    run a strategy, the target of a process
+    :param instance: `JSPInstance`
+    :param para: see `JSP`
+    :param warm_start: arrays of `schedule_arrays`,
+            the best schedule shared at the start is used if any
+    :param max_sec: time limit of the solve
+    :param shared: `pf_shared`
+    :param queue: messages to the parent, tuples of
+            ('solution', name, makespan, arrays), ('bound', name, lb),
+            ('done', name, status)
+    """
+  from sched.jobshop.model import JSP
+  strategy = dict(strategy)
+  method = strategy.pop('method')
+  status = 'UNKNOWN'
+  finished = threading.Event()
+  try:
+    problem = JSP(instance, para=para)
+    tasks = pf_tasks(instance) if shared.start is not None else None
+    _warm_start = problem.sol_from_arrays(
+      *(pf_best(shared, instance) or warm_start))
+    threading.Thread(target=_watch, args=(shared, problem, finished),
+                     daemon=True).start()
+    if method == 'cp':
+
+      def on_solution(callback):
+        if _done(shared):
+          callback.StopSearch()
+          return
+        _publish(shared, queue, name, problem.cp_extract_sol(callback),
+                 tasks)
+        _bound(shared, queue, name,
+               math.ceil(callback.BestObjectiveBound() - 1e-6))
+        if _done(shared):
+          callback.StopSearch()
+
+      strategy.setdefault('num_workers', 1)
+      problem.cp_create_model(warm_start=_warm_start, max_sec=max_sec,
+                              max_sol=1 << 30, on_solution=on_solution,
+                              log_search_progress=False, **strategy)
+      status = problem.cp_solver.StatusName(problem.cp_status)
+      if problem.cp_solution is not None and status == 'OPTIMAL':
+        _bound(shared, queue, name, problem.cp_solution.makespan)
+    elif method == 'ln':
+
+      def on_iteration(sol):
+        _publish(shared, queue, name, sol, tasks)
+        return _done(shared)
+
+      strategy.setdefault('num_workers', 1)
+      sol = problem.ln_solve(max_sec=max_sec, warm_start=_warm_start,
+                             on_iteration=on_iteration, **strategy)
+      status = 'FEASIBLE' if sol is not None else 'UNKNOWN'
+    elif method == 'mp':
+      sol = problem.mp_create_model(max_sec=max_sec, **strategy)
+      if sol is not None:
+        _publish(shared, queue, name, sol, tasks)
+        _bound(shared, queue, name,
+               math.ceil(problem.mp_model.objective_bound - 1e-6))
+      status = 'FEASIBLE' if sol is not None else 'UNKNOWN'
+    else:
+      raise ValueError(f"method: {method} not in ['cp', 'ln', 'mp']")
+  except Exception as e:
+    logger.warning(f'portfolio: {name} failed\n{traceback.format_exc()}')
+    status = f'ERROR: {e!r}'
+  finally:
+    finished.set()
+  queue.put(('done', name, status))
@@ -0,0 +1,167 @@
+# ....................
+# @license: %MIT License%:~ http://www.opensource.org/licenses/MIT
+# @project: jobshop
+# @file: /solution.py
+# @description:
+#
+# Bulk extraction of a schedule from the solution vector of a cp model
+#  - `cp_index` maps the variables of `JSP.cp_vars` to index arrays,
+#     once per model; each entry is a linear term (var index, coef, const),
+#     var index -1 for a constant (e.g., the option of a single machine)
+#  - `JSPSchedule` evaluates the index arrays on the solution vector
+#     with a few NumPy operations
+
+__package__ = 'sched.jobshop'
+
+from collections import namedtuple
+
+import numpy as np
+from ortools.sat.python import cp_model
+
+cp_index_container = \
+  namedtuple('cp_index_container',
+             ['task_job',
+              'task_group',
+              'task_start',
+              'task_end',
+              'row_job',
+              'row_group',
+              'row_machine',
+              'row_start',
+              'row_end',
+              'row_dur',
+              'row_opt',
+              'makespan'])
+
+
+def _term(expr):
+  """a variable, a constant, or a constant times a variable"""
+  if isinstance(expr, cp_model.IntVar):
+    return expr.Index(), 1, 0
+  if isinstance(expr, (int, np.integer)):
+    return -1, 0, int(expr)
+  if isinstance(expr, cp_model.LinearExpr):
+    coeffs, const = expr.GetIntegerVarValueMap()
+    coeffs = [(v, c) for v, c in coeffs.items() if c != 0]
+    if len(coeffs) == 0:
+      return -1, 0, int(const)
+    if len(coeffs) == 1:
+      (var, coef), = coeffs
+      return var.Index(), int(coef), int(const)
+  raise ValueError(f"cannot index {expr}")
+
+
+def _terms(exprs):
+  return np.array([_term(e) for e in exprs], dtype=np.int64).reshape(-1, 3)
+
+
+def _ids(ids):
+  # keep python ids (e.g., str) as objects
+  _array = np.asarray(ids)
+  return _array if _array.dtype.kind in 'iub' \
+    else np.array(ids, dtype=object)
+
+
+def cp_index(cp_vars):
+  """
+    the index arrays of the variables of a cp model
+    :param cp_vars: `JSP.cp_var_container`
+    :return: `cp_index_container`
+    """
+  task_keys = list(cp_vars.task_start.keys())
+  row_keys = list(cp_vars.task_start_on_m.keys())
+  return cp_index_container(
+    task_job=_ids([k[0] for k in task_keys]),
+    task_group=_ids([k[1] for k in task_keys]),
+    task_start=_terms(cp_vars.task_start[k] for k in task_keys),
+    task_end=_terms(cp_vars.task_end[k] for k in task_keys),
+    row_job=_ids([k[0] for k in row_keys]),
+    row_group=_ids([k[1] for k in row_keys]),
+    row_machine=_ids([k[2] for k in row_keys]),
+    row_start=_terms(cp_vars.task_start_on_m[k] for k in row_keys),
+    row_end=_terms(cp_vars.task_end_on_m[k] for k in row_keys),
+    row_dur=_terms(cp_vars.task_dur_on_m[k] for k in row_keys),
+    row_opt=_terms(cp_vars.task_opt_on_m[k] for k in row_keys),
+    makespan=_terms([cp_vars.makespan]))
+
+
+def evaluate(values, terms):
+  """
+    :param values: the solution vector, with a trailing 0 (for index -1)
+    :param terms: (n, 3) array of linear terms
+    :return:
+    """
+  return terms[:, 1] * values[terms[:, 0]] + terms[:, 2]
+
+
+class JSPSchedule(object):
+  """
+   A schedule from the solution vector of a cp model
+    - arrays, one row per task and machine used:
+        job, group, machine, start, end
+    - the fields of `JSP.cp_sol_container`, dicts by tuple keys,
+        built on first access
+  """
+  _fields = ('task_start', 'task_end',
+             'task_start_on_m', 'task_end_on_m',
+             'task_dur_on_m', 'task_opt_on_m',
+             'makespan')
+
+  def __init__(self, index: cp_index_container, values):
+    self.index = index
+    self.values = np.append(np.asarray(values, dtype=np.int64), 0)
+    self.makespan = int(evaluate(self.values, index.makespan)[0])
+    self.opt = evaluate(self.values, index.row_opt)
+    used = self.opt > 0
+    self.job = index.row_job[used]
+    self.group = index.row_group[used]
+    self.machine = index.row_machine[used]
+    self.start = evaluate(self.values, index.row_start)[used]
+    self.end = evaluate(self.values, index.row_end)[used]
+
+  @staticmethod
+  def from_solver(index, solver):
+    """
+      :param solver: a `CpSolver` after the solve,
+              or a `CpSolverSolutionCallback` in the search
+      """
+    response = solver.Response() if hasattr(solver, 'Response') \
+      else solver.ResponseProto()
+    solution = response.solution
+    return JSPSchedule(
+      index, np.fromiter(solution, dtype=np.int64, count=len(solution)))
+
+  def __len__(self):
+    return self.start.size
+
+  def __getattr__(self, name):
+    # the dict view, once
+    if name not in self._fields:
+      raise AttributeError(name)
+    index = self.index
+    if name in ('task_start', 'task_end'):
+      keys = zip(index.task_job.tolist(), index.task_group.tolist())
+    else:
+      keys = zip(index.row_job.tolist(), index.row_group.tolist(),
+                 index.row_machine.tolist())
+    terms = {'task_start': index.task_start,
+             'task_end': index.task_end,
+             'task_start_on_m': index.row_start,
+             'task_end_on_m': index.row_end,
+             'task_dur_on_m': index.row_dur,
+             'task_opt_on_m': index.row_opt}[name]
+    view = dict(zip(keys, evaluate(self.values, terms).tolist()))
+    setattr(self, name, view)
+    return view
+
+  def __getitem__(self, name):
+    return getattr(self, name)
+
+  def __getstate__(self):
+    return self.__dict__
+
+  def __setstate__(self, state):
+    self.__dict__.update(state)
+
+  def _asdict(self):
+    return {k: getattr(self, k) for k in self._fields}
@@ -0,0 +1,128 @@
+# ....................
+# @license: %MIT License%:~ http://www.opensource.org/licenses/MIT
+# @project: jobshop
+# @file: /store.py
+# @description:
+#
+# A library of many (F)JSP instances in one directory of .npy columns,
+#   opened with memory mapping.
+#  - the arrays of `JSPInstance` are concatenated over the instances,
+#     `job_ptr` and `group_ptr` are kept as the local end offsets
+#     (`job_end`, `group_end`)
+#  - index.npy, of shape (K + 1, 4), has the offsets of instance k
+#     in the job, task, group and machine columns
+#  so instance k is read by slicing, without reading the others.
+#
+# usage:
+#   JSPStore.write('data/lib', (JSPInstance.rd_instance(...) for ...))
+#   store = JSPStore('data/lib')
+#   jsp = JSP(store[k])
+
+__package__ = 'sched.jobshop'
+
+import os
+from typing import Iterable
+
+import numpy as np
+
+from sched.jobshop.instance import JSPInstance
+
+
+class JSPStore(object):
+  """
+   A memory-mapped library of `JSPInstance`
+  """
+  # column -> level (position in the index)
+  columns = {
+    'job_id': 0, 'job_release': 0, 'job_due': 0, 'job_end': 0,
+    'task_seq': 1, 'task_group': 1, 'task_duration': 1,
+    'group_id': 2, 'group_end': 2,
+    'machine_id': 3,
+  }
+
+  def __init__(self, path: str):
+    self.path = path
+    self.index = np.load(os.path.join(path, 'index.npy'))
+    self.data = {
+      c: np.load(os.path.join(path, f'{c}.npy'), mmap_mode='r')
+      for c in self.columns
+    }
+
+  def __len__(self):
+    return self.index.shape[0] - 1
+
+  def __iter__(self):
+    for k in range(len(self)):
+      yield self[k]
+
+  def __getitem__(self, k: int) -> JSPInstance:
+    if not -len(self) <= k < len(self):
+      raise IndexError(f"instance {k} not in the store of {len(self)}")
+    k = k % len(self)
+    lo, hi = self.index[k], self.index[k + 1]
+    col = {c: self.data[c][lo[level]:hi[level]]
+           for c, level in self.columns.items()}
+    return JSPInstance(
+      job_id=col['job_id'],
+      job_release=col['job_release'],
+      job_due=col['job_due'],
+      job_ptr=np.concatenate(([0], col['job_end'])),
+      task_seq=col['task_seq'],
+      task_group=col['task_group'],
+      task_duration=col['task_duration'],
+      group_id=col['group_id'],
+      group_ptr=np.concatenate(([0], col['group_end'])),
+      machine_id=col['machine_id'])
+
+  @staticmethod
+  def write(path: str, instances: Iterable[JSPInstance],
+            chunk: int = 1 << 22):
+    """
+      pack the instances into a store,
+        the columns are streamed to raw files first,
+        so the instances can come from a generator.
+      :param path: a directory, created if needed
+      :param instances:
+      :param chunk: num of entries copied at a time into the .npy columns
+      :return: the `JSPStore`
+      """
+    os.makedirs(path, exist_ok=True)
+    raw = {c: open(os.path.join(path, f'{c}.raw'), 'wb')
+           for c in JSPStore.columns}
+    offsets = [np.zeros(4, dtype=np.int64)]
+    try:
+      for ins in instances:
+        col = dict(job_id=ins.job_id,
+                   job_release=ins.job_release,
+                   job_due=ins.job_due,
+                   job_end=ins.job_ptr[1:],
+                   task_seq=ins.task_seq,
+                   task_group=ins.task_group,
+                   task_duration=ins.task_duration,
+                   group_id=ins.group_id,
+                   group_end=ins.group_ptr[1:],
+                   machine_id=ins.machine_id)
+        for c, f in raw.items():
+          f.write(np.ascontiguousarray(col[c], dtype=np.int64).tobytes())
+        offsets.append(offsets[-1] + [ins.n_jobs, ins.n_tasks,
+                                      ins.n_groups, ins.machine_id.size])
+    finally:
+      for f in raw.values():
+        f.close()
+
+    index = np.stack(offsets)
+    for c, level in JSPStore.columns.items():
+      _raw = os.path.join(path, f'{c}.raw')
+      n = int(index[-1, level])
+      out = np.lib.format.open_memmap(os.path.join(path, f'{c}.npy'),
+                                      mode='w+', dtype=np.int64, shape=(n,))
+      if n:
+        src = np.memmap(_raw, dtype=np.int64, mode='r', shape=(n,))
+        for i in range(0, n, chunk):
+          out[i:i + chunk] = src[i:i + chunk]
+        del src
+      out.flush()
+      del out
+      os.remove(_raw)
+    np.save(os.path.join(path, 'index.npy'), index)
+    return JSPStore(path)
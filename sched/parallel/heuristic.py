@@ -0,0 +1,84 @@
+# ....................
+# @license: %MIT License%:~ http://www.opensource.org/licenses/MIT
+# @project: parallel
+# @file: /heuristic.py
+# @description:
+#
+# List scheduling heuristics for the parallel machines (P||Cmax, Q||Cmax)
+#  - the jobs are taken in the order of a rule, and each is put on
+#     the machine that completes it first
+#  - the loads of the machines of a speed are kept in a heap,
+#     so a job costs O(k + log m) for k distinct speeds,
+#     and O(log m) on identical machines
+
+__package__ = 'sched.parallel'
+
+import heapq
+
+import numpy as np
+
+LIST_RULES = ('lpt', 'spt', 'list')
+
+
+def processing_time(duration, speed):
+  """the time of a job on a machine, ceil(duration / speed)"""
+  return -(-np.asarray(duration, dtype=np.int64) // speed)
+
+
+def list_schedule(duration: np.ndarray,
+                  speed: np.ndarray,
+                  rule: str = 'lpt'):
+  """
+    list scheduling, each job (in the order of the rule) is put on the
+      machine it ends first on, ties go to the faster machines,
+      then to the first one.
+    :param duration: duration of each job (on a machine of speed 1)
+    :param speed: speed of each machine
+    :param rule: one of `LIST_RULES`
+            - lpt, longest processing time first
+            - spt, shortest processing time first
+            - list, the order of the jobs
+    :return: machine (position) and start time of each job
+    """
+  if rule not in LIST_RULES:
+    raise ValueError(f"rule: {rule} not in {LIST_RULES}")
+  duration = np.asarray(duration, dtype=np.int64)
+  speed = np.asarray(speed, dtype=np.int64)
+  if rule == 'lpt':
+    order = np.argsort(-duration, kind='stable')
+  elif rule == 'spt':
+    order = np.argsort(duration, kind='stable')
+  else:
+    order = np.arange(duration.size)
+  job_machine = np.zeros(duration.size, dtype=np.int64)
+  job_start = np.zeros(duration.size, dtype=np.int64)
+
+  # a heap of (load, machine) per speed, the fastest first
+  speeds, machine_class = np.unique(-speed, return_inverse=True)
+  speeds = (-speeds).tolist()
+  heaps = [[(0, i) for i in np.flatnonzero(machine_class == c).tolist()]
+           for c in range(len(speeds))]
+  _machine, _start = [], []
+  if len(heaps) == 1:
+    heap = heaps[0]
+    s = speeds[0]
+    for p in duration[order].tolist():
+      load, i = heap[0]
+      _machine.append(i)
+      _start.append(load)
+      heapq.heapreplace(heap, (load - (-p // s), i))
+  else:
+    classes = list(zip(heaps, speeds))
+    for p in duration[order].tolist():
+      best, end = None, None
+      for heap, s in classes:
+        _end = heap[0][0] - (-p // s)
+        if end is None or _end < end:
+          best, end = heap, _end
+      load, i = best[0]
+      _machine.append(i)
+      _start.append(load)
+      heapq.heapreplace(best, (end, i))
+  job_machine[order] = _machine
+  job_start[order] = _start
+  return job_machine, job_start
@@ -1,13 +1,25 @@
 #
-import functools
-import random
+# Parallel machine scheduling, minimize the makespan
+#  - identical machines (P||Cmax), or uniform machines of integer
+#     speeds (Q||Cmax), the time of a job j on a machine i is
+#     ceil(duration_j / speed_i)
+#  - the instance is two arrays, the durations of the jobs
+#     and the speeds of the machines
+#  - the cp model counts the jobs of each distinct duration on each
+#     machine, so its size does not grow with the num of jobs
+import logging
 import pickle
 import time
 from collections import namedtuple
 
+import numpy as np
+from ortools.sat.python import cp_model
+
+from sched.jobshop.helper import SatCallBack
+from sched.parallel.heuristic import *
 from sched.util import *
 
-__package__ = 'sched.para'
+__package__ = 'sched.parallel'
 
 
 class Parallel(Problem):
@@ -15,11 +27,254 @@ class Parallel(Problem):
    An instance of Parallel Machine Scheduling Problem
   """
 
-  def cp_create_model(self, *args, **kwargs):
-    pass
+  __name__ = f"{__package__}.Parallel"
+  logger = logging.getLogger(__name__)
 
-  def cp_extract_sol(self, *args, **kwargs):
-    pass
+  cp_var_container = \
+    namedtuple('cp_vars',
+               ['count',
+                'load',
+                'makespan'])
+
+  # by job: machine (position), start, end
+  cp_sol_container = \
+    namedtuple('cp_sol',
+               ['machine',
+                'start',
+                'end',
+                'makespan'])
+
+  def __init__(self, duration, speed, **kwargs):
+    """
+      :param duration: duration of each job (on a machine of speed 1)
+      :param speed: num of identical machines, or the speed of each machine
+      """
+    self.duration = np.asarray(duration, dtype=np.int64)
+    if np.isscalar(speed):
+      speed = np.ones(int(speed), dtype=np.int64)
+    self.speed = np.asarray(speed, dtype=np.int64)
+    if self.speed.size == 0 or (self.speed <= 0).any():
+      raise ValueError('Cannot initialize the problem, '
+                       'the speeds must be positive')
+    if (self.duration < 0).any():
+      raise ValueError('Cannot initialize the problem, '
+                       'the durations must be non-negative')
+    self.is_uniform = bool((self.speed != self.speed[0]).any())
+
+    # attrs for constraint programming
+    self.cp_vars = None
+    self.cp_model = None
+    self.cp_solver = None
+    self.cp_solution_printer = None
+    self.cp_status = None
+    self.cp_solution = None
+    self.cp_stats = PhaseStats('cp')
+    # the distinct durations, and the duration (position) of each job
+    self.cp_durations = None
+
+    # attrs for list scheduling
+    self.hr_solution = None
+
+  def __str__(self):
+    return f"Parallel(jobs={self.n_jobs}, machines={self.n_machines}, " \
+           f"uniform={self.is_uniform})"
+
+  @property
+  def n_jobs(self):
+    return self.duration.size
+
+  @property
+  def n_machines(self):
+    return self.speed.size
+
+  def makespan_lb(self):
+    """
+      lower bound of the makespan, max of the longest job on the fastest
+        machine and of the total work on the total speed
+      """
+    if self.n_jobs == 0:
+      return 0
+    return int(max(processing_time(self.duration.max(), self.speed.max()),
+                   -(-self.duration.sum() // self.speed.sum())))
+
+  def sol_from_arrays(self, machine, start):
+    machine = np.asarray(machine, dtype=np.int64)
+    start = np.asarray(start, dtype=np.int64)
+    end = start + processing_time(self.duration, self.speed[machine])
+    return self.cp_sol_container(machine=machine,
+                                 start=start,
+                                 end=end,
+                                 makespan=int(end.max(initial=0)))
+
+  def sol_from_counts(self, counts):
+    """
+      a schedule of the num of jobs of each distinct duration
+        on each machine, the jobs of a machine one after another
+      :param counts: array of (distinct durations, machines)
+      :return: `cp_sol_container`
+      """
+    values, job_value = self.cp_durations
+    m = self.n_machines
+    # the jobs by duration, each duration by machine
+    order = np.argsort(job_value, kind='stable')
+    machine = np.empty(self.n_jobs, dtype=np.int64)
+    machine[order] = np.repeat(np.tile(np.arange(m), values.size),
+                               counts.ravel())
+    # the jobs by machine, one after another
+    order = np.argsort(machine, kind='stable')
+    _time = processing_time(self.duration, self.speed[machine])[order]
+    _end = np.cumsum(_time)
+    _first = np.searchsorted(machine[order], np.arange(m))
+    _offset = np.concatenate([[0], _end])[_first]
+    start = np.empty(self.n_jobs, dtype=np.int64)
+    start[order] = _end - _time - np.repeat(
+      _offset, np.bincount(machine, minlength=m))
+    return self.sol_from_arrays(machine, start)
+
+  def hr_create_sol(self, rule='lpt'):
+    """
+      create a schedule by list scheduling,
+        see `sched.parallel.heuristic.list_schedule`
+      :param rule: one of `LIST_RULES`, or 'best' to keep the best of them
+      :return: `cp_sol_container`, also `self.hr_solution`
+      """
+    rules = LIST_RULES if rule == 'best' else (rule,)
+    best = None
+    for _rule in rules:
+      sol = self.sol_from_arrays(
+        *list_schedule(self.duration, self.speed, rule=_rule))
+      if best is None or sol.makespan < best.makespan:
+        best, rule = sol, _rule
+    self.logger.info(f'list scheduling {rule}: makespan := {best.makespan}')
+    self.hr_solution = best
+    return best
+
+  def cp_create_model(self, **kwargs):
+    """
+      create and solve a constraint programming model,
+        an integer num of jobs of each distinct duration on each machine;
+        the schedule of list scheduling is the upper bound and the hint
+      :param kwargs:
+         - warm_start, a `cp_sol_container`,
+            default to `hr_create_sol('best')`
+         - symmetry, bool, default True, the loads of the machines
+            of a speed are non-increasing
+         - solve, bool, default True
+         - see `cp_solve`
+      :return:
+      """
+    model = cp_model.CpModel()
+    self.cp_stats = stats = PhaseStats('cp')
+    speed = self.speed
+    with stats.phase('bounds'):
+      warm_start = kwargs.get('warm_start')
+      if warm_start is None:
+        warm_start = self.hr_create_sol('best')
+      lb, ub = self.makespan_lb(), max(warm_start.makespan, 0)
+      values, job_value = np.unique(self.duration, return_inverse=True)
+      self.cp_durations = values, job_value
+      job_count = np.bincount(job_value, minlength=values.size)
+      # the time of each duration on each machine
+      times = processing_time(values[:, None], speed[None, :])
+      # a machine fits ub // time jobs of a duration, any num if 0
+      n_max = np.minimum(job_count[:, None],
+                         np.where(times > 0, ub // np.maximum(times, 1),
+                                  job_count[:, None])).tolist()
+    self.logger.info(f'makespan in [{lb}, {ub}]')
+
+    with stats.phase('variables'):
+      makespan = model.NewIntVar(lb, ub, name='C_max')
+      count = [[model.NewIntVar(0, n_max[k][i], f'count-{k}_{i}')
+                for i in range(speed.size)]
+               for k in range(values.size)]
+      load = [model.NewIntVar(0, ub, f'load-{i}') for i in range(speed.size)]
+      self.cp_vars = self.cp_var_container(count=count,
+                                           load=load,
+                                           makespan=makespan)
+
+    with stats.phase('constraints'):
+      for k, n in enumerate(job_count.tolist()):
+        model.Add(sum(count[k]) == n)
+      _times = times.tolist()
+      for i, _load in enumerate(load):
+        model.Add(_load == cp_model.LinearExpr.WeightedSum(
+          [count[k][i] for k in range(values.size)],
+          [_times[k][i] for k in range(values.size)]))
+        model.Add(_load <= makespan)
+      if kwargs.get('symmetry', True):
+        # the machines of a speed are identical
+        order = np.lexsort((np.arange(speed.size), speed)).tolist()
+        for a, b in zip(order[:-1], order[1:]):
+          if speed[a] == speed[b]:
+            model.Add(load[a] >= load[b])
+      model.Minimize(makespan)
+
+    with stats.phase('hints'):
+      counts = np.zeros((values.size, speed.size), dtype=np.int64)
+      np.add.at(counts, (job_value, warm_start.machine), 1)
+      _load = (counts * times).sum(axis=0)
+      if kwargs.get('symmetry', True):
+        # relabel the machines of a speed by non-increasing load
+        order = np.lexsort((-_load, speed))
+        _sorted = np.lexsort((np.arange(speed.size), speed))
+        counts[:, _sorted] = counts[:, order]
+        _load[_sorted] = _load[order]
+      for k in range(values.size):
+        for i in range(speed.size):
+          model.AddHint(count[k][i], int(counts[k, i]))
+      for i in range(speed.size):
+        model.AddHint(load[i], int(_load[i]))
+      model.AddHint(makespan, int(_load.max(initial=0)))
+    stats.count(variables=len(model.Proto().variables),
+                constraints=len(model.Proto().constraints),
+                durations=int(values.size), lb=lb, ub=ub)
+    self.cp_model = model
+    if kwargs.get('solve', True):
+      self.cp_solve(**kwargs)
+
+  def cp_solve(self, **kwargs):
+    """
+      solve `self.cp_model`
+      :param kwargs:
+         - max_sec, default to 20
+         - max_sol, default to 20
+         - num_workers, default to 2
+         - log_search_progress, default to True
+         - on_solution, a function called with the `SatCallBack`
+      :return:
+      """
+    max_sec = kwargs.get('max_sec', 20)
+    max_sol = kwargs.get('max_sol', 20)
+    model, stats = self.cp_model, self.cp_stats
+    self.cp_solver = solver = cp_model.CpSolver()
+    solver.parameters.max_time_in_seconds = max_sec
+    solver.parameters.log_search_progress = \
+      kwargs.get('log_search_progress', True)
+    solver.parameters.num_search_workers = kwargs.get('num_workers', 2)
+    self.cp_solution_printer = solution_printer = SatCallBack(
+      self.cp_vars.makespan, max_sol, max_sec,
+      on_solution=kwargs.get('on_solution'))
+    with stats.phase('solve'):
+      self.cp_status = status = solver.SolveWithSolutionCallback(
+        model, solution_printer)
+    stats.count(solutions=solution_printer.solution_count(),
+                status=solver.StatusName(status))
+    self.logger.info('Status = %s' % solver.StatusName(status))
+    if solution_printer.solution_count() > 0:
+      with stats.phase('extract'):
+        self.cp_solution = self.cp_extract_sol()
+    self.logger.info(f'stats: {stats}')
+
+  def cp_extract_sol(self, solver=None):
+    """
+      :param solver: default to `self.cp_solver`,
+              or a `CpSolverSolutionCallback` in the search
+      :return: `cp_sol_container`
+      """
+    solver = solver or self.cp_solver
+    counts = np.array([[solver.Value(v) for v in row]
+                       for row in self.cp_vars.count], dtype=np.int64)
+    return self.sol_from_counts(counts)
 
   def mp_create_model(self, *args, **kwargs):
     pass
@@ -27,9 +282,50 @@ class Parallel(Problem):
   def mp_extract_sol(self, *args, **kwargs):
     pass
 
-  def dump_instance(self, path, protocol):
-    pass
+  def dump_instance(self, path, protocol='pickle'):
+    """
+      dump the durations and the speeds to a data file
+      :param protocol: pickle, or numpy (.npz)
+      :return: the file paths
+      """
+    current_time = time.time()
+    if protocol == 'pickle':
+      fps = [f'{path}/%d-parallel.pickle' % current_time]
+      with open(fps[0], 'wb') as f:
+        pickle.dump(dict(duration=self.duration, speed=self.speed), f)
+    elif protocol == 'numpy':
+      fps = [f'{path}/%d-parallel.npz' % current_time]
+      with open(fps[0], 'wb') as f:
+        np.savez(f, duration=self.duration, speed=self.speed)
+    else:
+      raise ValueError(f"protocol: {protocol} not implemented yet")
+    return fps
 
   @staticmethod
-  def rd_instance(*args):
-    pass
+  def load_instance(fp):
+    """
+      load an instance saved by `dump_instance`
+      :return: duration, speed, for `Parallel(...)`
+      """
+    if fp.endswith('.npz'):
+      with np.load(fp) as f:
+        return f['duration'], f['speed']
+    with open(fp, 'rb') as f:
+      data = pickle.load(f)
+    return data['duration'], data['speed']
+
+  @staticmethod
+  def rd_instance(n: int, m: int, speeds: int = 1, seed=None):
+    """
+      Randomly generate a parallel machine instance
+      :param n: num of jobs, durations in [1, 100]
+      :param m: num of machines
+      :param speeds: the speeds are in [1, speeds],
+              the machines are identical if 1
+      :param seed: seed of `numpy.random.default_rng`
+      :return: duration, speed, for `Parallel(...)`
+      """
+    rng = np.random.default_rng(seed)
+    duration = rng.integers(1, 101, size=n)
+    speed = rng.integers(1, speeds + 1, size=m)
+    return duration, speed
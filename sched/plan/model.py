@@ -21,11 +21,19 @@ import pickle
 import time
 from collections import namedtuple
 
+import numpy as np
+
+from sched.protobuf import schema_pb2
 from sched.util import *
 
 __package__ = 'sched.plan'
 
 
+def _integral(value):
+  # ints (not bools) of python or numpy, stored as doubles in the proto
+  return isinstance(value, (int, np.integer)) and not isinstance(value, bool)
+
+
 class Plan(Problem):
   """
    An instance of Production Planning Problem
@@ -78,14 +86,99 @@ class Plan(Problem):
     pass
 
   def dump_instance(self, path, protocol='pickle'):
+    """
+      :param protocol: pickle (of the dict of fields),
+              or protobuf (`sched.PlanInstance`)
+      :return: the file path
+      """
     current_time = time.time()
     if protocol == 'pickle':
-      with open(f'{path}/%d-{Plan.__name__}.pickle' % current_time, 'wb') as f:
-        # todo fix this. unable to pickle an inclass namedtuple
-        # switch to protobuf
+      fp = f'{path}/%d-{Plan.__name__}.pickle' % current_time
+      with open(fp, 'wb') as f:
+        # unable to pickle an inclass namedtuple
         pickle.dump(self.instance_data._asdict(), f)
+    elif protocol == 'protobuf':
+      fp = f'{path}/%d-{Plan.__name__}.pb' % current_time
+      with open(fp, 'wb') as f:
+        f.write(self.instance_to_proto(self.instance_data).SerializeToString())
     else:
       raise ValueError(f"protocol: {protocol} not implemented yet")
+    return fp
+
+  @staticmethod
+  def load_instance(fp):
+    """
+      load an instance saved by `dump_instance`
+      :return: an `instance_container`
+      """
+    with open(fp, 'rb') as f:
+      if fp.endswith('.pb'):
+        return Plan.instance_from_proto(f.read())
+      return Plan.instance_container(**pickle.load(f))
+
+  @staticmethod
+  def instance_to_proto(instance):
+    """
+      to the protobuf message `sched.PlanInstance`,
+        items are referred to by position in `items` (sorted);
+        the values are doubles, the integral ones are flagged
+        and read back as ints by `instance_from_proto`
+      """
+    items = sorted(instance.items)
+    pos = {i: k for k, i in enumerate(items)}
+
+    def item_period_values(values, message):
+      keys = list(values.keys())
+      message.item.extend(pos[i] for i, _ in keys)
+      message.period.extend(t for _, t in keys)
+      message.value.extend(values[k] for k in keys)
+      message.integral.extend(_integral(values[k]) for k in keys)
+
+    message = schema_pb2.PlanInstance(items=items,
+                                      horizon=len(instance.horizon))
+    edges = list(instance.bom.keys())
+    message.bom_parent.extend(pos[pa] for pa, _ in edges)
+    message.bom_child.extend(pos[child] for _, child in edges)
+    message.bom_weight.extend(instance.bom[k] for k in edges)
+    message.bom_integral.extend(_integral(instance.bom[k]) for k in edges)
+    message.raws.extend(sorted(pos[i] for i in instance.raws))
+    message.products.extend(sorted(pos[i] for i in instance.products))
+    item_period_values(instance.lead_time, message.lead_time)
+    item_period_values(instance.demand, message.demand)
+    item_period_values(instance.inventory, message.inventory)
+    return message
+
+  @staticmethod
+  def instance_from_proto(message):
+    """
+      from the protobuf message `sched.PlanInstance`, or its bytes
+      """
+    if isinstance(message, bytes):
+      message = schema_pb2.PlanInstance.FromString(message)
+    items = list(message.items)
+
+    def _values(values, integral):
+      # no flags in the messages written before, all doubles
+      integral = list(integral) or [False] * len(values)
+      return [int(v) if _int else v for v, _int in zip(values, integral)]
+
+    def item_period_values(values):
+      return {(items[i], t): v
+              for i, t, v in zip(values.item, values.period,
+                                 _values(values.value, values.integral))}
+
+    return Plan.instance_container(
+      bom={(items[pa], items[child]): w
+           for pa, child, w in zip(message.bom_parent, message.bom_child,
+                                   _values(message.bom_weight,
+                                           message.bom_integral))},
+      horizon=range(message.horizon),
+      items=set(items),
+      raws={items[i] for i in message.raws},
+      products={items[i] for i in message.products},
+      lead_time=item_period_values(message.lead_time),
+      demand=item_period_values(message.demand),
+      inventory=item_period_values(message.inventory))
 
   def cp_create_model(self, *args, **kwargs):
     pass
@@ -0,0 +1,31 @@
+# -*- coding: utf-8 -*-
+# Generated by the protocol buffer compiler.  DO NOT EDIT!
+# source: sched/protobuf/schema.proto
+"""Generated protocol buffer code."""
+from google.protobuf.internal import builder as _builder
+from google.protobuf import descriptor as _descriptor
+from google.protobuf import descriptor_pool as _descriptor_pool
+from google.protobuf import symbol_database as _symbol_database
+# @@protoc_insertion_point(imports)
+
+_sym_db = _symbol_database.Default()
+
+
+
+
+DESCRIPTOR = _descriptor_pool.Default().AddSerializedFile(b'\n\x1bsched/protobuf/schema.proto\x12\x05sched\"\xca\x01\n\x0bJSPInstance\x12\x0e\n\x06job_id\x18\x01 \x03(\x03\x12\x13\n\x0bjob_release\x18\x02 \x03(\x03\x12\x0f\n\x07job_due\x18\x03 \x03(\x03\x12\x0f\n\x07job_ptr\x18\x04 \x03(\x03\x12\x10\n\x08task_seq\x18\x05 \x03(\x03\x12\x12\n\ntask_group\x18\x06 \x03(\x03\x12\x15\n\rtask_duration\x18\x07 \x03(\x03\x12\x10\n\x08group_id\x18\x08 \x03(\x03\x12\x11\n\tgroup_ptr\x18\t \x03(\x03\x12\x12\n\nmachine_id\x18\n \x03(\x03\"Q\n\x10ItemPeriodValues\x12\x0c\n\x04item\x18\x01 \x03(\x05\x12\x0e\n\x06period\x18\x02 \x03(\x05\x12\r\n\x05value\x18\x03 \x03(\x01\x12\x10\n\x08integral\x18\x04 \x03(\x08\"\xa0\x02\n\x0cPlanInstance\x12\r\n\x05items\x18\x01 \x03(\t\x12\x12\n\nbom_parent\x18\x02 \x03(\x05\x12\x11\n\tbom_child\x18\x03 \x03(\x05\x12\x12\n\nbom_weight\x18\x04 \x03(\x01\x12\x0f\n\x07horizon\x18\x05 \x01(\x05\x12\x0c\n\x04raws\x18\x06 \x03(\x05\x12\x10\n\x08products\x18\x07 \x03(\x05\x12*\n\tlead_time\x18\x08 \x01(\x0b\x32\x17.sched.ItemPeriodValues\x12\'\n\x06\x64\x65mand\x18\t \x01(\x0b\x32\x17.sched.ItemPeriodValues\x12*\n\tinventory\x18\n \x01(\x0b\x32\x17.sched.ItemPeriodValues\x12\x14\n\x0c\x62om_integral\x18\x0b \x03(\x08\"u\n\x08Schedule\x12\x0b\n\x03job\x18\x01 \x03(\x03\x12\r\n\x05group\x18\x02 \x03(\x03\x12\x0f\n\x07machine\x18\x03 \x03(\x03\x12\r\n\x05start\x18\x04 \x03(\x03\x12\x0b\n\x03\x65nd\x18\x05 \x03(\x03\x12\x10\n\x08makespan\x18\x06 \x01(\x03\x12\x0e\n\x06status\x18\x07 \x01(\tb\x06proto3')
+
+_builder.BuildMessageAndEnumDescriptors(DESCRIPTOR, globals())
+_builder.BuildTopDescriptorsAndMessages(DESCRIPTOR, 'sched.protobuf.schema_pb2', globals())
+if _descriptor._USE_C_DESCRIPTORS == False:
+
+  DESCRIPTOR._options = None
+  _JSPINSTANCE._serialized_start=39
+  _JSPINSTANCE._serialized_end=241
+  _ITEMPERIODVALUES._serialized_start=243
+  _ITEMPERIODVALUES._serialized_end=324
+  _PLANINSTANCE._serialized_start=327
+  _PLANINSTANCE._serialized_end=615
+  _SCHEDULE._serialized_start=617
+  _SCHEDULE._serialized_end=734
+# @@protoc_insertion_point(module_scope)
@@ -1,4 +1,9 @@
 from .io import *
 from .mermaid import *
+from .stats import *
 from .utils import *
 
+
+def __getattr__(name):
+  # lazy flags of the solver backends, e.g., BOOL_HAS_COPT
+  return getattr(utils, name)
@@ -43,13 +43,24 @@ class Problem(abc.ABC):
 
 class Instance(object):
   """
-  skeleton object
+  skeleton object,
+    the attributes are declared by `__slots__` of the subclasses
   """
+  __slots__ = ()
+  # renamed attributes, old name -> new name,
+  #   to load the objects pickled before the renaming
+  _aliases = {}
 
   def __init__(self, **kwargs):
     for k, v in kwargs.items():
       setattr(self, k, v)
 
+  def __setstate__(self, state):
+    # (dict state, slot state) of a pickle
+    for _state in (state if isinstance(state, tuple) else (state,)):
+      for k, v in (_state or {}).items():
+        setattr(self, self._aliases.get(k, k), v)
+
   def __hash__(self):
     return self.__str__().__hash__()
 
@@ -1,9 +1,20 @@
+import functools
 from typing import *
 
 import jinja2 as jin
 
 from .io import UTIL_ASSET_PATH
 
+# one environment, it keeps the compiled templates
+_ENV = jin.Environment(loader=jin.FileSystemLoader(['/', './']),
+                       auto_reload=False)
+
+# the html of a record, the template gets the whole record as `record`
+MERMAID_TEMPLATE = f'{UTIL_ASSET_PATH}/mermaid.template'
+# the html of the lines of a record, streamed,
+#  the template iterates over `records`
+MERMAID_STREAM_TEMPLATE = f'{UTIL_ASSET_PATH}/mermaid_stream.template'
+
 MERMAID_GANTT_HEADER = [
   "gantt",
   "dateFormat YYYY-MM-DD HH:mm:ss",
@@ -11,21 +22,69 @@ MERMAID_GANTT_HEADER = [
 ]
 
 
+@functools.lru_cache(maxsize=None)
+def get_template(template_path: str):
+  """
+  the compiled template, cached across calls
+  :param template_path: absolute, or relative to the working directory
+  :return:
+  """
+  return _ENV.get_template(template_path)
+
+
+def render_mermaid_stream(
+    records: Iterable[str],
+    template_path: str = MERMAID_STREAM_TEMPLATE,
+    fp: str = 'result.html',
+    buffer: int = 1024,
+    **context):
+  """
+  render the records (the lines of a mermaid graph) to a file,
+    the output is streamed as the records are consumed,
+    so the records can come from a generator,
+    e.g., `bom_to_graph_mermaid` or `sched.jobshop.gantt_mermaid_lines`
+  :param records:
+  :param template_path: a template iterating over `records`
+  :param fp:
+  :param buffer: num of template events written at a time
+  :param context: other variables of the template
+  :return: fp
+  """
+  template = get_template(template_path)
+  stream = template.stream(records=records, **context)
+  # write in chunks of lines
+  stream.enable_buffering(size=buffer)
+  stream.dump(fp, encoding='utf-8')
+  return fp
+
+
 def render_meimaid_html(
     record_path: str,
-    record_ls: Optional[List] = None,
-    template_path: str = f'{UTIL_ASSET_PATH}/mermaid.template',
-    fp: str = 'result.html'):
+    record_ls: Optional[Iterable[str]] = None,
+    template_path: str = None,
+    fp: str = 'result.html',
+    stream: bool = False):
   """
   :param record_path:
   :param record_ls:
-  :param template_path:
+  :param template_path: default to `MERMAID_TEMPLATE`,
+    or `MERMAID_STREAM_TEMPLATE` if stream
   :param fp:
-  :return:
+  :param stream: render the lines one by one, see `render_mermaid_stream`,
+    the template iterates over `records` instead of `record`
+  :return: the content, or fp if stream
   """
-  env = jin.Environment(loader=jin.FileSystemLoader(['/', './']))
-  template = env.get_template(template_path)
+  if stream:
+    template_path = template_path or MERMAID_STREAM_TEMPLATE
+    if record_ls is not None:
+      return render_mermaid_stream(record_ls, template_path, fp,
+                                   record_path=record_path)
+    with open(record_path, 'r') as f:
+      return render_mermaid_stream((line.rstrip('\n') for line in f),
+                                   template_path, fp,
+                                   record_path=record_path)
 
+  template = get_template(template_path or MERMAID_TEMPLATE)
   if record_ls is not None:
     record = "\n".join(record_ls)
   else:
@@ -0,0 +1,100 @@
+# ....................
+# @license: %MIT License%:~ http://www.opensource.org/licenses/MIT
+# @project: sched
+# @file: /stats.py
+# @description:
+#
+# Instrumentation by phase, wall time and memory of each phase,
+#   and counters (e.g., size of a model)
+#
+# usage:
+#   stats = PhaseStats('cp')
+#   with stats.phase('variables'):
+#     ...
+#   stats.count(variables=n)
+#   stats.to_json()
+
+import contextlib
+import json
+import os
+import resource
+import sys
+import time
+
+_PAGE_SIZE = os.sysconf('SC_PAGE_SIZE') if hasattr(os, 'sysconf') else 4096
+
+
+def peak_rss_mb():
+  """peak resident memory of the process (MB)"""
+  rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+  # in KB on linux, in bytes on macOS
+  return rss / (1 << 20) if sys.platform == 'darwin' else rss / (1 << 10)
+
+
+def rss_mb():
+  """resident memory of the process (MB), the peak if not on linux"""
+  try:
+    with open('/proc/self/statm') as f:
+      return int(f.read().split()[1]) * _PAGE_SIZE / (1 << 20)
+  except (OSError, IndexError, ValueError):
+    return peak_rss_mb()
+
+
+class PhaseStats(object):
+  """
+   Wall time and memory by phase, and counters
+    - phases, name -> wall (s), calls, rss_delta, rss and peak_rss (MB),
+        a phase entered again is accumulated
+    - counters, name -> value
+  """
+
+  def __init__(self, name=''):
+    self.name = name
+    self.phases = {}
+    self.counters = {}
+
+  @contextlib.contextmanager
+  def phase(self, name):
+    _rss = rss_mb()
+    _start = time.perf_counter()
+    try:
+      yield self
+    finally:
+      wall = time.perf_counter() - _start
+      rss = rss_mb()
+      record = self.phases.setdefault(
+        name, dict(wall=0.0, calls=0, rss_delta=0.0))
+      record['wall'] += wall
+      record['calls'] += 1
+      record['rss_delta'] += rss - _rss
+      record['rss'] = rss
+      record['peak_rss'] = peak_rss_mb()
+
+  def count(self, **counters):
+    self.counters.update(counters)
+
+  def wall(self, *names):
+    """total wall time of the phases, default to all"""
+    names = names or self.phases.keys()
+    return sum(self.phases[k]['wall'] for k in names if k in self.phases)
+
+  def as_dict(self):
+    return dict(name=self.name,
+                phases={k: dict(v) for k, v in self.phases.items()},
+                counters=dict(self.counters))
+
+  def to_json(self):
+    """a JSON line"""
+    return json.dumps(self.as_dict())
+
+  def dump(self, fp):
+    """append the JSON line to a file"""
+    with open(fp, 'a') as f:
+      f.write(self.to_json())
+      f.write('\n')
+
+  def __str__(self):
+    phases = ', '.join(f"{k}: {v['wall']:.3f}s {v['rss_delta']:+.1f}MB"
+                       for k, v in self.phases.items())
+    counters = ', '.join(f"{k}: {v}" for k, v in self.counters.items())
+    return f"{self.name} [{phases}] [{counters}]"
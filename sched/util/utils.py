@@ -4,55 +4,95 @@ Solver of Union[copt, gurobi]
 
 @author: chuwen <chuwzhang@gmail.com>
 """
+import importlib
 import logging
 import os
 from logging.handlers import TimedRotatingFileHandler as TRFH
 
-import pandas as pd
-
 LOG_PATH = 'log'
 FORMAT = '[%(name)s:%(levelname)s] [%(asctime)s] %(message)s'
-logging.basicConfig(format=FORMAT)
-if LOG_PATH is not None:
-    if not os.path.exists(LOG_PATH):
-        os.makedirs(LOG_PATH)
-handler = TRFH(f'{LOG_PATH}/sched.log',
-               when='H',
-               interval=1,
-               backupCount=7,
-               encoding='utf8')
-handler.setFormatter(logging.Formatter(FORMAT))
-log = logging.getLogger()
-log.addHandler(handler)
-log.setLevel(logging.INFO)
-# options
-pd.set_option('display.max_columns', None)
-
-# solver sanity check
-BOOL_HAS_COPT = True
-BOOL_HAS_GRB = True
 
 logger = logging.getLogger("sched.util")
-try:
-    import coptpy
-except ImportError as e:
-    logger.warning("Cannot find COPT & coptpy")
-    # logger.exception(e)
-    BOOL_HAS_COPT = False
-try:
-    import gurobipy
-except ImportError as e:
-    logger.warning("Cannot find GUROBI & gurobipy")
-    BOOL_HAS_GRB = False
-
-try:
-    import mosek.fusion as mf
-
-    expr = mf.Expr
-    dom = mf.Domain
-    mat = mf.Matrix
-except ImportError as e:
-    logger.warning('no mosek detected')
+_logging_handler = None
+
+
+def setup_logging(log_path=LOG_PATH, level=logging.INFO, **kwargs):
+    """
+    opt-in logging of sched: the root logger prints to stderr,
+        and to a rotating file in `log_path` (if not None);
+        calling it again does nothing
+    :param log_path: directory of sched.log, created if needed
+    :param level:
+    :param kwargs: of the TimedRotatingFileHandler,
+        default to rotate every hour and keep 7 files
+    :return: the file handler
+    """
+    global _logging_handler
+    if _logging_handler is not None:
+        return _logging_handler
+    logging.basicConfig(format=FORMAT)
+    log = logging.getLogger()
+    log.setLevel(level)
+    if log_path is None:
+        _logging_handler = logging.NullHandler()
+        return _logging_handler
+    if not os.path.exists(log_path):
+        os.makedirs(log_path)
+    handler = TRFH(f'{log_path}/sched.log',
+                   when=kwargs.get('when', 'H'),
+                   interval=kwargs.get('interval', 1),
+                   backupCount=kwargs.get('backupCount', 7),
+                   encoding='utf8')
+    handler.setFormatter(logging.Formatter(FORMAT))
+    log.addHandler(handler)
+    _logging_handler = handler
+    return handler
+
+
+# solver backends, name -> module,
+#   imported on the first request, see `get_backend`
+BACKENDS = {
+    'COPT': 'coptpy',
+    'GUROBI': 'gurobipy',
+    'MOSEK': 'mosek.fusion',
+}
+_backends = {}
+
+# flags of the backends, evaluated on access, see `__getattr__`
+_BACKEND_FLAGS = {
+    'BOOL_HAS_COPT': 'COPT',
+    'BOOL_HAS_GRB': 'GUROBI',
+    'BOOL_HAS_MOSEK': 'MOSEK',
+}
+
+
+def get_backend(name):
+    """
+    the module of a solver backend, imported once
+    :param name: a key of `BACKENDS` (case insensitive)
+    :return: the module, None if it cannot be imported
+    """
+    _name = name.upper()
+    if _name not in BACKENDS:
+        raise ValueError(f"backend: {name} not in {list(BACKENDS)}")
+    if _name not in _backends:
+        try:
+            _backends[_name] = importlib.import_module(BACKENDS[_name])
+        except ImportError:
+            logger.warning(f"Cannot find {_name} & {BACKENDS[_name]}")
+            _backends[_name] = None
+    return _backends[_name]
+
+
+def has_backend(name):
+    return get_backend(name) is not None
+
+
+def __getattr__(name):
+    # BOOL_HAS_COPT, BOOL_HAS_GRB, BOOL_HAS_MOSEK
+    if name in _BACKEND_FLAGS:
+        return has_backend(_BACKEND_FLAGS[name])
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
 
 
 def cls_deprecated(cls):
@@ -67,20 +107,27 @@ class ModelWrapper(object):
 
     def __init__(self, model=None, object_map=None, solver_name="", name="model", *args, **kwargs):
         _solver_name = solver_name.upper()
+        if model:
+            _solver_name = 'GUROBI' \
+                if type(model).__module__.startswith('gurobipy') else 'COPT'
+        # only the backend in use is imported
+        coptpy = get_backend('COPT') if _solver_name != 'GUROBI' else None
+        gurobipy = get_backend('GUROBI') if _solver_name == 'GUROBI' else None
         if model:
             self.model = model
         else:
             if _solver_name == 'COPT':
-                if BOOL_HAS_COPT:
+                if coptpy is not None:
                     envr = coptpy.Envr()
                     self.model = envr.createModel(name=name)
                 else:
                     raise ValueError("Cannot find COPT!")
             elif _solver_name == 'GUROBI':
-                if BOOL_HAS_GRB:
+                if gurobipy is not None:
                     self.model = gurobipy.Model(name)
                 else:
                     logger.warning('Cannot find GUROBI, pls install the API properly')
+                    raise ValueError("Cannot find GUROBI!")
             else:
                 logger.info('Unknown solver, fallback to COPT')
                 try:
@@ -92,10 +139,11 @@ class ModelWrapper(object):
         self.obj_map = object_map
         self._objective_value = None
         self.is_copt, self.is_grb = False, False
-        if BOOL_HAS_COPT:
+        if coptpy is not None:
             self.is_copt = self.model.__class__ == coptpy.Model
-        if BOOL_HAS_GRB:
+        if gurobipy is not None:
             self.is_grb = self.model.__class__ == gurobipy.Model
+        self.backend = coptpy if self.is_copt else gurobipy
 
         if not (self.is_grb or self.is_copt):
             raise ValueError("unsupported, neither COPT nor GUROBI")
@@ -120,9 +168,76 @@ class ModelWrapper(object):
 
         self.set_properties(**kwargs)
 
+    def add_mvar(self, lb, ub, vtype, obj=None, name="x"):
+        """
+        add the columns in a single call
+        :param lb: array of the lower bounds
+        :param ub: array of the upper bounds
+        :param vtype: array of 'C', 'B' or 'I'
+        :param obj: array of the objective coefficients
+        :param name:
+        :return: the matrix variable
+        """
+        vtype = [{'C': self.CONTINUOUS, 'B': self.BINARY,
+                  'I': self.INTEGER}[v] for v in vtype]
+        if self.is_copt:
+            return self.model.addMVar(len(vtype), lb=lb, ub=ub, obj=obj,
+                                      vtype=vtype, nameprefix=name)
+        return self.model.addMVar(len(vtype), lb=lb, ub=ub, obj=obj,
+                                  vtype=vtype, name=name)
+
+    def add_mconstr(self, x, rows, cols, vals, sense, rhs, name="c"):
+        """
+        add the rows A x (sense) rhs in a single call per sense,
+            A is given by the (row, col, value) triplets
+        :param x: the matrix variable of `add_mvar`
+        :param sense: array of '<', '>' or '=', of each row
+        :param rhs: array, of each row
+        :param name:
+        :return: the constraints, by sense
+        """
+        import numpy as np
+        import scipy.sparse as sp
+        A = sp.csr_matrix((vals, (rows, cols)), shape=(len(rhs), x.shape[0]))
+        if self.is_copt:
+            senses = {'<': self.backend.COPT.LESS_EQUAL,
+                      '>': self.backend.COPT.GREATER_EQUAL,
+                      '=': self.backend.COPT.EQUAL}
+        else:
+            senses = {'<': self.backend.GRB.LESS_EQUAL,
+                      '>': self.backend.GRB.GREATER_EQUAL,
+                      '=': self.backend.GRB.EQUAL}
+        sense, rhs = np.asarray(sense), np.asarray(rhs, dtype=float)
+        constrs = {}
+        for s, _sense in senses.items():
+            mask = sense == s
+            if not mask.any():
+                continue
+            if self.is_copt:
+                constrs[s] = self.model.addMConstr(
+                    A[mask], x, _sense, rhs[mask], nameprefix=f"{name}{s}")
+            else:
+                constrs[s] = self.model.addMConstr(
+                    A[mask], x, _sense, rhs[mask], name=f"{name}{s}")
+        return constrs
+
+    @property
+    def values(self):
+        """the values of all the columns, in order"""
+        if self.is_copt:
+            return self.model.getValues()
+        return self.model.getAttr('X', self.model.getVars())
+
+    def has_solution(self):
+        """if a (feasible) solution is found, after optimize"""
+        if self.is_copt:
+            return bool(self.model.hasmipsol) or bool(self.model.haslpsol)
+        return self.model.SolCount > 0
+
     def optimize(self, **kwargs):
-        time_limit = kwargs.get("max_seconds", 1000)
-        max_solutions = kwargs.get("max_solutions", 1000)
+        time_limit = kwargs.get("max_seconds", None)
+        if time_limit is not None:
+            self.model.setParam('TimeLimit', time_limit)
         if self.is_copt:
             return self.model.solve()
         elif self.is_grb:
@@ -140,15 +255,29 @@ class ModelWrapper(object):
         self._objective_value = value
         return self._objective_value
 
+    @property
+    def objective_bound(self):
+        """the best bound of the objective, after optimize"""
+        if self.is_copt:
+            return self.model.bestbnd
+        return self.model.ObjBound
+
+    def terminate(self):
+        """stop a running optimize (e.g., from another thread)"""
+        if self.is_copt:
+            self.model.interrupt()
+        elif self.is_grb:
+            self.model.terminate()
+
     def isfeasible(self):
         """
         Not safe, only after optimize call!
         :return:
         """
         if self.is_copt:
-            return self.model.status != coptpy.COPT.INFEASIBLE
+            return self.model.status != self.backend.COPT.INFEASIBLE
         if self.is_grb:
-            return self.model.status != gurobipy.GRB.INFEASIBLE
+            return self.model.status != self.backend.GRB.INFEASIBLE
         return False
 
     def set_properties(self, **kwargs):
@@ -3,7 +3,11 @@ from setuptools import setup
 setup(
    name='sched',
    version='0.0.1',
-   packages=['sched', 'sched.cp', 'sched.util', 'sched.jobshop', 'sched.jobshop.deprecated'],
+   packages=['sched', 'sched.util', 'sched.jobshop', 'sched.jobshop.deprecated',
+             'sched.parallel', 'sched.plan', 'sched.cascade', 'sched.protobuf'],
+   package_data={'sched.protobuf': ['*.proto'], 'sched.util': ['assets/*']},
+   install_requires=['ortools~=9.7.2996', 'numpy>=1.20.0', 'scipy>=1.9.0',
+                     'protobuf>=4.23.3', 'jinja2>=3.0.0'],
    url='',
    license='MIT',
    author='chuwen',
@@ -0,0 +1,72 @@
+import os
+
+import numpy as np
+import pytest
+
+from sched.jobshop.gantt import schedule_arrays
+from sched.jobshop.instance import JSPInstance
+from sched.jobshop.loader import load_orlib
+
+DATA = os.path.join(os.path.dirname(os.path.dirname(__file__)), 'data')
+
+# the optimal makespan of ft06
+FT06_OPTIMUM = 55
+
+# kwargs of the small cp solves
+CP_KWARGS = dict(max_sec=10, num_workers=1, log_search_progress=False)
+
+
+@pytest.fixture
+def ft06():
+  return load_orlib(os.path.join(DATA, 'ft06.txt'))
+
+
+@pytest.fixture
+def fjsp():
+  """a small flexible instance, groups of 1-3 machines"""
+  return JSPInstance.rd_instance(6, 4, copy=3, seed=3)
+
+
+def check_schedule(instance, sol):
+  """
+    assert that a schedule is feasible for the instance:
+      each task once on a machine of its group, for its duration,
+      after its release and its predecessor, and no overlap on a machine
+    :return: the makespan
+    """
+  job, group, machine, start, end = (np.asarray(v).tolist()
+                                     for v in schedule_arrays(sol))
+  tasks = {}
+  for j, g, m, s, e in zip(job, group, machine, start, end):
+    assert (j, g) not in tasks, f'task {(j, g)} is scheduled twice'
+    tasks[j, g] = (m, s, e)
+  task_job = instance.job_id[instance.task_job].tolist()
+  task_group = instance.group_id[instance.task_group].tolist()
+  assert len(tasks) == instance.n_tasks
+  machines = {}
+  for g, lo, hi in zip(instance.group_id.tolist(),
+                       instance.group_ptr[:-1].tolist(),
+                       instance.group_ptr[1:].tolist()):
+    machines[g] = set(instance.machine_id[lo:hi].tolist())
+  release = dict(zip(instance.job_id.tolist(),
+                     instance.job_release.tolist()))
+  prev = None
+  for k, (j, g, d) in enumerate(zip(task_job, task_group,
+                                    instance.task_duration.tolist())):
+    m, s, e = tasks[j, g]
+    assert m in machines[g]
+    assert e - s == d
+    assert s >= release[j]
+    if prev is not None and prev[0] == j:
+      assert s >= tasks[prev][2], f'task {(j, g)} starts before its predecessor'
+    prev = (j, g)
+  by_machine = {}
+  for (j, g), (m, s, e) in tasks.items():
+    by_machine.setdefault((g, m), []).append((s, e))
+  for v in by_machine.values():
+    v.sort()
+    for (_, e), (s, _) in zip(v[:-1], v[1:]):
+      assert s >= e, 'tasks overlap on a machine'
+  makespan = max((e for *_, e in tasks.values()), default=0)
+  assert makespan == sol.makespan
+  return makespan
@@ -0,0 +1,30 @@
+import asyncio
+
+from sched.jobshop.model import JSP
+from conftest import CP_KWARGS, FT06_OPTIMUM, check_schedule
+
+
+def test_cp_solve_async(ft06):
+  async def run():
+    jsp = JSP(ft06)
+    handle = jsp.cp_solve_async(**CP_KWARGS)
+    incumbents = [inc async for inc in handle]
+    return jsp, incumbents, await handle
+
+  jsp, incumbents, sol = asyncio.run(run())
+  # the dispatching rule first
+  assert incumbents[0].makespan == jsp.hr_solution.makespan
+  makespans = [inc.makespan for inc in incumbents]
+  assert makespans == sorted(makespans, reverse=True)
+  assert check_schedule(ft06, sol) == FT06_OPTIMUM
+
+
+def test_cp_solve_async_cancel(ft06):
+  async def run():
+    jsp = JSP(ft06)
+    handle = jsp.cp_solve_async(**CP_KWARGS)
+    handle.cancel()
+    return await handle
+
+  sol = asyncio.run(run())
+  assert check_schedule(ft06, sol) >= FT06_OPTIMUM
@@ -0,0 +1,50 @@
+import os
+import subprocess
+import sys
+
+import pytest
+
+from sched.util import utils
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def _run(code, cwd=ROOT):
+  out = subprocess.run([sys.executable, '-c', code], cwd=cwd,
+                       env=dict(os.environ, PYTHONPATH=ROOT),
+                       capture_output=True, text=True, check=True)
+  return out.stdout.strip()
+
+
+def test_lazy_backends():
+  # no solver backend is imported with the models, nor a log file made
+  out = _run("import sys, logging\n"
+             "import sched.jobshop.model, sched.parallel.model\n"
+             "from sched.util import BACKENDS\n"
+             "print(sorted(m for m in BACKENDS.values()"
+             " if m.split('.')[0] in sys.modules),"
+             " logging.getLogger().handlers)")
+  assert out == '[] []'
+
+
+def test_backend_flags():
+  out = _run("import sys\n"
+             "from sched.util import utils\n"
+             "flag = utils.BOOL_HAS_GRB\n"
+             "print(flag == ('gurobipy' in sys.modules),"
+             " 'coptpy' in sys.modules)")
+  assert out == 'True False'
+
+
+def test_get_backend():
+  assert utils.get_backend('gurobi') is utils.get_backend('GUROBI')
+  with pytest.raises(ValueError):
+    utils.get_backend('cplex')
+
+
+def test_setup_logging(tmp_path):
+  out = _run("from sched.util import setup_logging\n"
+             "a = setup_logging('log', backupCount=1)\n"
+             "print(a is setup_logging(), a.baseFilename)",
+             cwd=str(tmp_path))
+  assert out == f"True {tmp_path / 'log' / 'sched.log'}"
@@ -0,0 +1,23 @@
+from sched.jobshop.batch import solve_many
+from conftest import CP_KWARGS, FT06_OPTIMUM
+
+
+def test_solve_many(ft06, fjsp):
+  results = list(solve_many([ft06, fjsp], max_workers=2, **CP_KWARGS))
+  assert [r.index for r in results] == [0, 1]
+  assert all(r.status == 'OPTIMAL' for r in results)
+  assert results[0].makespan == FT06_OPTIMUM
+  assert results[0].schedule.makespan == FT06_OPTIMUM
+  assert set(results[1].timings) == {'solve', 'build', 'wall'}
+
+
+def test_solve_many_failure(ft06, fjsp):
+  # not a (jobs, machines) pair
+  results = list(solve_many([ft06, (None, None), fjsp], max_workers=1,
+                            ordered=False, **CP_KWARGS))
+  by_index = {r.index: r for r in results}
+  assert sorted(by_index) == [0, 1, 2]
+  assert by_index[1].status.startswith('ERROR')
+  assert by_index[1].makespan is None and by_index[1].schedule is None
+  assert by_index[0].makespan == FT06_OPTIMUM
+  assert by_index[2].status == 'OPTIMAL'
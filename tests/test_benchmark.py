@@ -0,0 +1,31 @@
+import json
+
+import benchmark
+
+
+def test_benchmark_run(tmp_path):
+  fp = str(tmp_path / 'bench.json')
+  records = benchmark.main('jsp', sizes=[(4, 3, 2, 0.8)], seeds=(1, 2),
+                           max_sec=5, out=fp, isolate=False)
+  assert [(r['problem'], r['size'], r['seed']) for r in records] \
+         == [('jsp', [4, 3, 2, 0.8], 1), ('jsp', [4, 3, 2, 0.8], 2)]
+  for r in records:
+    assert r['status'] == 'OPTIMAL'
+    assert r['makespan'] == r['bound'] and r['gap'] == 0
+    assert r['variables'] > 0 and r['solve_time'] >= 0
+  with open(fp) as f:
+    assert json.load(f)['records'] == json.loads(json.dumps(records))
+  # no regression against itself, a slower baseline is not one
+  assert benchmark.compare(fp, fp) == []
+  slower = [dict(r, solve_time=r['solve_time'] + 10) for r in records]
+  assert benchmark.compare(records, slower) == []
+  regressions = benchmark.compare(slower, records)
+  assert {r['metric'] for r in regressions} == {'solve_time'}
+
+
+def test_benchmark_parallel():
+  # in a spawned process
+  record, = benchmark.main('parallel', sizes=[(20, 3, 2)], max_sec=5)
+  assert record['peak_rss_mb'] > 0
+  assert record['makespan'] <= record['heuristic']
+  assert record['bound'] <= record['makespan']
@@ -0,0 +1,57 @@
+import numpy as np
+
+from sched.jobshop.bounds import heads_tails, makespan_lb
+from sched.jobshop.model import JSP
+from conftest import CP_KWARGS, FT06_OPTIMUM, check_schedule
+
+
+def test_heads_tails():
+  job_ptr = np.array([0, 3, 5])
+  duration = np.array([2, 3, 4, 5, 1])
+  head, tail = heads_tails(job_ptr, duration, release=np.array([0, 10]))
+  np.testing.assert_array_equal(head, [0, 2, 5, 10, 15])
+  np.testing.assert_array_equal(tail, [7, 4, 0, 1, 0])
+
+
+def test_makespan_lb():
+  job_ptr = np.array([0, 2, 4])
+  duration = np.array([3, 1, 2, 2])
+  head, tail = heads_tails(job_ptr, duration)
+  # by the jobs: 4, by group 0: head 0 + load 5 + tail 1,
+  #  by group 1: head 2 + load 3 + tail 0
+  group = np.array([0, 1, 0, 1])
+  assert makespan_lb(head, tail, group, duration, np.array([1, 1])) == 6
+  # two machines in group 0, 0 + 3 + 1
+  assert makespan_lb(head, tail, group, duration, np.array([2, 1])) == 5
+
+
+def test_bounds_ft06(ft06):
+  jsp = JSP(ft06)
+  bounds = jsp.cp_preprocess()
+  assert bounds.lb <= FT06_OPTIMUM <= bounds.ub
+  assert bounds.ub == jsp.hr_solution.makespan
+  # the warm start sets the upper bound, no dispatching
+  jsp = JSP(ft06)
+  sol = JSP(ft06).hr_create_sol('spt')
+  bounds = jsp.cp_preprocess(warm_start=sol._asdict())
+  assert bounds.ub == max(sol.makespan, bounds.lb)
+  assert jsp.hr_solution is None
+
+
+def test_cp_ft06(ft06):
+  jsp = JSP(ft06)
+  jsp.cp_create_model(**CP_KWARGS)
+  assert jsp.cp_solver.StatusName(jsp.cp_status) == 'OPTIMAL'
+  assert check_schedule(ft06, jsp.cp_solution) == FT06_OPTIMUM
+  bounds = jsp.cp_bounds
+  for k, s in jsp.cp_solution.task_start.items():
+    assert bounds.head[k] <= s <= bounds.ub - bounds.tail[k] \
+           - bounds.duration[k]
+
+
+def test_cp_fjsp(fjsp):
+  jsp = JSP(fjsp)
+  jsp.cp_create_model(**CP_KWARGS)
+  assert jsp.cp_solver.StatusName(jsp.cp_status) == 'OPTIMAL'
+  makespan = check_schedule(fjsp, jsp.cp_solution)
+  assert jsp.cp_bounds.lb <= makespan <= jsp.cp_bounds.ub
@@ -0,0 +1,51 @@
+from sched.jobshop.batch import solve_many
+from sched.jobshop.cache import JSPSolutionCache, cache_entry, cache_schedule
+from sched.jobshop.model import JSP
+from sched.jobshop.solution import JSPSchedule
+from conftest import CP_KWARGS, FT06_OPTIMUM, check_schedule
+
+
+def test_cache_round_trip(ft06, tmp_path):
+  jsp = JSP(ft06)
+  sol = jsp.hr_create_sol('best')
+  cache = JSPSolutionCache(str(tmp_path))
+  cache.put('key', **cache_entry(ft06, sol))
+  entry = cache.get('key')
+  assert entry is not None and not entry['optimal']
+  check_schedule(ft06, jsp.sol_from_arrays(*cache_schedule(ft06, entry)))
+
+
+def test_cache_twice(ft06, tmp_path):
+  jsp = JSP(ft06)
+  jsp.cp_create_model(cache=str(tmp_path), **CP_KWARGS)
+  assert jsp.cp_stats.counters['cache'] == 'miss'
+  assert jsp.cp_solution.makespan == FT06_OPTIMUM
+
+  # the optimal schedule is read back, the model is as after a solve
+  jsp = JSP(ft06)
+  jsp.cp_create_model(cache=str(tmp_path), **CP_KWARGS)
+  assert jsp.cp_stats.counters['cache'] == 'optimal'
+  assert isinstance(jsp.cp_solution, JSPSchedule)
+  assert jsp.cp_solver.StatusName(jsp.cp_status) == 'OPTIMAL'
+  assert check_schedule(ft06, jsp.cp_solution) == FT06_OPTIMUM
+  assert jsp.freeze_before(10) > 0
+  assert jsp.sol_to_proto().status == 'OPTIMAL'
+
+
+def test_solve_many_cache_twice(ft06, fjsp, tmp_path):
+  kwargs = dict(CP_KWARGS, cache=str(tmp_path), max_workers=1)
+  first = list(solve_many([ft06, fjsp], **kwargs))
+  second = list(solve_many([ft06, fjsp], **kwargs))
+  assert [r.makespan for r in first] == [r.makespan for r in second]
+  assert all(r.status == 'OPTIMAL' for r in second)
+
+
+def test_cache_reordered(ft06, tmp_path):
+  jsp = JSP(ft06)
+  jsp.cp_create_model(cache=str(tmp_path), **CP_KWARGS)
+  reordered = ft06.select_jobs(list(range(ft06.n_jobs))[::-1])
+  assert reordered.fingerprint() == ft06.fingerprint()
+  jsp = JSP(reordered)
+  jsp.cp_create_model(cache=str(tmp_path), **CP_KWARGS)
+  assert jsp.cp_stats.counters['cache'] == 'optimal'
+  assert check_schedule(reordered, jsp.cp_solution) == FT06_OPTIMUM
@@ -0,0 +1,30 @@
+from sched.jobshop.model import JSP
+from conftest import CP_KWARGS, check_schedule
+
+
+def _solve(instance, **kwargs):
+  jsp = JSP(instance)
+  jsp.cp_create_model(**kwargs, **CP_KWARGS)
+  assert jsp.cp_solver.StatusName(jsp.cp_status) == 'OPTIMAL'
+  return jsp, check_schedule(instance, jsp.cp_solution)
+
+
+def test_fixed_size(fjsp):
+  fixed, makespan = _solve(fjsp, fixed_size=True)
+  variable, _makespan = _solve(fjsp, fixed_size=False)
+  assert makespan == _makespan
+  # no duration variables nor links of the starts and ends
+  assert fixed.cp_stats.counters['variables'] \
+         < variable.cp_stats.counters['variables']
+  assert fixed.cp_stats.counters['constraints'] \
+         < variable.cp_stats.counters['constraints']
+
+
+def test_fixed_size_parallel(fjsp):
+  # a task split over the machines keeps variable-size intervals
+  sizes = set()
+  for fixed_size in (True, False):
+    jsp = JSP(fjsp, para=True)
+    jsp.cp_create_model(fixed_size=fixed_size, **CP_KWARGS)
+    sizes.add(len(jsp.cp_model.Proto().variables))
+  assert len(sizes) == 1
@@ -0,0 +1,86 @@
+import csv
+import datetime
+import json
+import re
+
+import pytest
+
+from sched.jobshop.gantt import GANTT_FIELDS, gantt_mermaid_lines, \
+  gantt_records
+from sched.jobshop.model import JSP
+
+START = datetime.datetime(2020, 5, 25, 8, 0, 0)
+
+
+@pytest.fixture
+def solved(fjsp):
+  jsp = JSP(fjsp)
+  jsp.hr_create_sol('mwkr')
+  return jsp, jsp.hr_solution
+
+
+def _assignments(sol):
+  return {(j, g): (m, s, e) for (j, g, m), s, e, opt in zip(
+    sol.task_start_on_m, sol.task_start_on_m.values(),
+    sol.task_end_on_m.values(), sol.task_opt_on_m.values()) if opt}
+
+
+def test_records(solved):
+  jsp, sol = solved
+  records = list(gantt_records(sol, machines=jsp.groups, start_date=START))
+  # all the machines, in the order of the groups, busy or not
+  assert [(g, m_id) for m_id, g, _ in records] \
+         == [(g, m.idx) for g, m_list in jsp.groups.items() for m in m_list]
+  assert sum(len(rec['job']) for *_, rec in records) \
+         == jsp.instance.n_tasks
+  for m_id, g, rec in records:
+    starts = rec['start'].tolist()
+    assert starts == sorted(starts)
+    assert (rec['machine'] == m_id).all() and (rec['group'] == g).all()
+
+
+def test_export_csv(solved, tmp_path):
+  jsp, sol = solved
+  fp = str(tmp_path / 'gantt.csv')
+  n = jsp.cp_export_gantt(fp, 'csv', start_date=START, sol=sol)
+  with open(fp) as f:
+    rows = list(csv.DictReader(f))
+  assert n == len(rows) == jsp.instance.n_tasks
+  assert tuple(rows[0]) == GANTT_FIELDS
+  expected = _assignments(sol)
+  for row in rows:
+    m, s, e = expected[int(row['job']), int(row['group'])]
+    assert (int(row['machine']), int(row['start']), int(row['end'])) \
+           == (m, s, e)
+    assert int(row['duration']) == e - s
+    assert row['start_time'] \
+           == str(START + datetime.timedelta(minutes=s))
+
+
+def test_export_json(solved, tmp_path):
+  jsp, sol = solved
+  fp = str(tmp_path / 'gantt.json')
+  n = jsp.cp_export_gantt(fp, 'json', start_date=START, sol=sol)
+  with open(fp) as f:
+    rows = [json.loads(line) for line in f]
+  assert n == len(rows) == jsp.instance.n_tasks
+  expected = _assignments(sol)
+  assert {(r['job'], r['group']): (r['machine'], r['start'], r['end'])
+          for r in rows} == expected
+  with pytest.raises(ValueError):
+    jsp.cp_export_gantt(fp, 'xlsx', sol=sol)
+
+
+@pytest.mark.parametrize('unit, suffix', [('m', 'm'), ('s', 's'),
+                                          ('h', 'h'), ('D', 'd')])
+def test_mermaid_unit(solved, unit, suffix):
+  jsp, sol = solved
+  lines = list(gantt_mermaid_lines(
+    gantt_records(sol, machines=jsp.groups, start_date=START, unit=unit),
+    unit=unit))
+  tasks = [line for line in lines if ':active' in line]
+  assert len(tasks) == jsp.instance.n_tasks
+  assert all(re.fullmatch(rf'\d+{suffix}', line.rsplit(', ', 1)[1])
+             for line in tasks)
+  with pytest.raises(ValueError):
+    list(gantt_mermaid_lines(iter(()), unit='Y'))
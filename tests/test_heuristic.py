@@ -0,0 +1,60 @@
+import numpy as np
+import pytest
+
+from sched.jobshop.heuristic import DISPATCHING_RULES, dispatch
+from sched.jobshop.instance import JSPInstance
+from sched.jobshop.model import JSP
+from conftest import FT06_OPTIMUM, check_schedule
+
+
+def _dispatch(instance, rule, machine_ready=None):
+  return dispatch(instance.job_ptr, instance.task_group,
+                  instance.task_duration, instance.group_ptr,
+                  release=instance.job_release,
+                  machine_ready=machine_ready, rule=rule)
+
+
+@pytest.mark.parametrize('rule', DISPATCHING_RULES)
+def test_dispatch_valid(ft06, fjsp, rule):
+  assert check_schedule(ft06, JSP(ft06).hr_create_sol(rule)) >= FT06_OPTIMUM
+  check_schedule(fjsp, JSP(fjsp).hr_create_sol(rule))
+
+
+@pytest.mark.parametrize('seed', range(5))
+def test_dispatch_release_and_ready(seed):
+  instance = JSPInstance.rd_instance(8, 5, copy=3, seed=seed)
+  rng = np.random.default_rng(seed)
+  instance.job_release = rng.integers(0, 30, size=instance.n_jobs)
+  machine_ready = rng.integers(0, 30, size=instance.machine_id.size)
+  for rule in DISPATCHING_RULES:
+    start, machine = _dispatch(instance, rule, machine_ready)
+    assert (start >= machine_ready[machine]).all()
+    assert (machine >= instance.group_ptr[instance.task_group]).all()
+    assert (machine < instance.group_ptr[instance.task_group + 1]).all()
+    jsp = JSP(instance)
+    check_schedule(instance, jsp.sol_from_arrays(
+      job=instance.job_id[instance.task_job].tolist(),
+      group=instance.group_id[instance.task_group].tolist(),
+      machine=instance.machine_id[machine].tolist(),
+      start=start,
+      end=start + instance.task_duration))
+
+
+def test_dispatch_deterministic(fjsp):
+  for rule in DISPATCHING_RULES:
+    a, b = _dispatch(fjsp, rule), _dispatch(fjsp, rule)
+    np.testing.assert_array_equal(a[0], b[0])
+    np.testing.assert_array_equal(a[1], b[1])
+
+
+def test_dispatch_best(ft06):
+  makespan, rule, start, _ = JSP(ft06).hr_dispatch('best')
+  assert rule in DISPATCHING_RULES
+  assert makespan == min(
+    int((_dispatch(ft06, r)[0] + ft06.task_duration).max())
+    for r in DISPATCHING_RULES)
+
+
+def test_dispatch_rule(ft06):
+  with pytest.raises(ValueError):
+    _dispatch(ft06, 'edd')
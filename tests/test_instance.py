@@ -0,0 +1,67 @@
+import random
+
+import numpy as np
+import pytest
+
+from sched.jobshop.instance import JSPInstance
+from sched.plan.model import Plan
+
+
+def _same(a, b):
+  for attr in JSPInstance.__slots__:
+    np.testing.assert_array_equal(getattr(a, attr), getattr(b, attr))
+
+
+def test_csr_layout(ft06):
+  assert (ft06.n_jobs, ft06.n_tasks, ft06.n_groups) == (6, 36, 6)
+  np.testing.assert_array_equal(ft06.job_ptr, np.arange(7) * 6)
+  np.testing.assert_array_equal(ft06.group_ptr, np.arange(7))
+  np.testing.assert_array_equal(ft06.task_job, np.repeat(np.arange(6), 6))
+  # ft06, job 0: (2, 1) (0, 3) (1, 6) (3, 7) (5, 3) (4, 6)
+  np.testing.assert_array_equal(ft06.task_group[:6], [2, 0, 1, 3, 5, 4])
+  np.testing.assert_array_equal(ft06.task_duration[:6], [1, 3, 6, 7, 3, 6])
+  assert not ft06.has_revisit()
+
+
+def test_select_jobs(fjsp):
+  jobs = [2, 0]
+  sub = fjsp.select_jobs(jobs)
+  assert sub.n_jobs == 2
+  np.testing.assert_array_equal(sub.job_id, fjsp.job_id[jobs])
+  tasks = np.concatenate([np.arange(fjsp.job_ptr[j], fjsp.job_ptr[j + 1])
+                          for j in jobs])
+  np.testing.assert_array_equal(sub.task_group, fjsp.task_group[tasks])
+  np.testing.assert_array_equal(np.diff(sub.job_ptr),
+                                np.diff(fjsp.job_ptr)[jobs])
+
+
+def test_objects_round_trip(fjsp):
+  _same(JSPInstance.from_objects(*fjsp.to_objects()), fjsp)
+
+
+def test_proto_round_trip(fjsp):
+  message = fjsp.to_proto()
+  _same(JSPInstance.from_proto(message), fjsp)
+  _same(JSPInstance.from_proto(message.SerializeToString()), fjsp)
+  assert JSPInstance.from_proto(message).fingerprint() == fjsp.fingerprint()
+
+
+@pytest.mark.parametrize('attr', ['job_id', 'group_id', 'machine_id'])
+def test_proto_non_integer_ids(ft06, attr):
+  ids = getattr(ft06, attr)
+  setattr(ft06, attr, np.array([f'x{i}' for i in ids.tolist()]))
+  with pytest.raises(ValueError, match=attr):
+    ft06.to_proto()
+
+
+def test_plan_proto_round_trip():
+  random.seed(1)
+  instance = Plan.rd_instance(3, 3, 4)
+  message = Plan.instance_to_proto(instance)
+  back = Plan.instance_from_proto(message.SerializeToString())
+  for attr in ('lead_time', 'demand', 'inventory'):
+    values = getattr(back, attr)
+    assert values == getattr(instance, attr)
+    assert all(type(v) is int for v in values.values())
+  assert back.bom == pytest.approx(instance.bom)
+  assert all(type(v) is float for v in back.bom.values())
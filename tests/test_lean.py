@@ -0,0 +1,26 @@
+import pytest
+
+from sched.jobshop.model import JSP
+from conftest import CP_KWARGS, FT06_OPTIMUM, check_schedule
+
+
+def _solve(instance, **kwargs):
+  jsp = JSP(instance)
+  jsp.cp_create_model(**kwargs, **CP_KWARGS)
+  assert jsp.cp_solver.StatusName(jsp.cp_status) == 'OPTIMAL'
+  return jsp, check_schedule(instance, jsp.cp_solution)
+
+
+def test_lean_ft06(ft06):
+  lean, makespan = _solve(ft06, lean=True)
+  full, _makespan = _solve(ft06, lean=False)
+  assert makespan == _makespan == FT06_OPTIMUM
+  # no per-machine variables for the groups of a single machine
+  assert lean.cp_stats.counters['variables'] \
+         < full.cp_stats.counters['variables']
+
+
+@pytest.mark.parametrize('lean', [True, False])
+def test_lean_fjsp(fjsp, lean):
+  _, makespan = _solve(fjsp, lean=lean)
+  assert makespan == _solve(fjsp)[1]
@@ -0,0 +1,16 @@
+from sched.jobshop.model import JSP
+from conftest import FT06_OPTIMUM, check_schedule
+
+
+def test_ln_solve(ft06):
+  jsp = JSP(ft06)
+  seen = []
+
+  def on_iteration(sol):
+    seen.append(sol.makespan)
+    return sol.makespan == FT06_OPTIMUM
+
+  sol = jsp.ln_solve(max_sec=20, iter_sec=1, seed=0, num_workers=1,
+                     log_search_progress=False, on_iteration=on_iteration)
+  assert check_schedule(ft06, sol) == FT06_OPTIMUM
+  assert seen == sorted(seen, reverse=True)
@@ -0,0 +1,48 @@
+import numpy as np
+import pytest
+
+from sched.jobshop.loader import (UnsupportedBenchmarkError, load_benchmark,
+                                  load_benchmark_dir, load_brandimarte,
+                                  sniff_format)
+
+# two groups of identical machines, {1, 2} and {3}
+FJS_GROUPS = """2 3 1.5
+2 2 1 4 2 4 1 3 5
+1 1 3 2
+"""
+
+# machine-dependent durations, as in Mk01-Mk10
+FJS_MK = """2 3 1.5
+2 2 1 4 2 6 1 3 5
+1 2 2 3 3 2
+"""
+
+
+def test_orlib(ft06):
+  assert (ft06.n_jobs, ft06.n_tasks, ft06.n_groups) == (6, 36, 6)
+  assert (ft06.group_size == 1).all()
+  assert ft06.task_duration.sum() == 197
+
+
+def test_brandimarte(tmp_path):
+  fp = tmp_path / 'groups.fjs'
+  fp.write_text(FJS_GROUPS)
+  assert sniff_format(str(fp)) == 'brandimarte'
+  instance = load_brandimarte(str(fp))
+  assert instance.job_ptr.tolist() == [0, 2, 3]
+  assert instance.task_duration.tolist() == [4, 5, 2]
+  assert instance.group_size.tolist() == [2, 1]
+  assert instance.task_group.tolist() == [0, 1, 1]
+  assert np.array_equal(instance.machine_id, [0, 1, 2])
+
+
+def test_brandimarte_unsupported(tmp_path):
+  (tmp_path / 'a.fjs').write_text(FJS_GROUPS)
+  (tmp_path / 'mk.fjs').write_text(FJS_MK)
+  with pytest.raises(UnsupportedBenchmarkError):
+    load_benchmark(str(tmp_path / 'mk.fjs'))
+  with pytest.raises(UnsupportedBenchmarkError):
+    list(load_benchmark_dir(str(tmp_path)))
+  names = [name for name, _ in
+           load_benchmark_dir(str(tmp_path), skip_unsupported=True)]
+  assert names == ['a']
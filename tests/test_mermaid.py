@@ -0,0 +1,30 @@
+from sched.util.mermaid import render_meimaid_html, render_mermaid_stream
+
+LINES = ['gantt', 'section M0', 'a :active, a0, 0, 1m']
+
+
+def test_render_record(tmp_path):
+  fp = str(tmp_path / 'result.html')
+  content = render_meimaid_html('', record_ls=LINES, fp=fp)
+  assert '\n'.join(LINES) in content
+  with open(fp) as f:
+    assert f.read() == content
+
+
+def test_render_record_file(tmp_path):
+  record_path = tmp_path / 'gantt.record'
+  record_path.write_text('\n'.join(LINES) + '\n')
+  content = render_meimaid_html(str(record_path),
+                                fp=str(tmp_path / 'result.html'))
+  assert '\n'.join(LINES) in content
+
+
+def test_render_stream(tmp_path):
+  fp = str(tmp_path / 'result.html')
+  assert render_mermaid_stream(iter(LINES), fp=fp) == fp
+  streamed = render_meimaid_html('', record_ls=iter(LINES), stream=True,
+                                 fp=str(tmp_path / 'stream.html'))
+  with open(fp) as f, open(streamed) as g:
+    content = f.read()
+    assert content == g.read()
+  assert ''.join(f'    {line}\n' for line in LINES) in content
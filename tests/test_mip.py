@@ -0,0 +1,70 @@
+import numpy as np
+import pytest
+import scipy.sparse as sp
+from scipy.optimize import Bounds, LinearConstraint, milp
+
+from sched.jobshop.bounds import heads_tails, makespan_lb
+from sched.jobshop import mip as formulations
+from sched.jobshop.mip import MIP_FORMULATIONS, mip_decode
+from sched.jobshop.model import JSP
+from conftest import CP_KWARGS, FT06_OPTIMUM, check_schedule
+
+
+def _optimum(instance):
+  jsp = JSP(instance)
+  jsp.cp_create_model(**CP_KWARGS)
+  assert jsp.cp_solver.StatusName(jsp.cp_status) == 'OPTIMAL'
+  return jsp.cp_solution.makespan
+
+
+def _milp(instance, formulation):
+  """solve a formulation by the HiGHS of scipy, no solver needed"""
+  data = instance
+  jsp = JSP(data)
+  head, tail = heads_tails(data.job_ptr, data.task_duration, data.job_release)
+  lb = makespan_lb(head, tail, data.task_group, data.task_duration,
+                   data.group_size)
+  ub = max(jsp.hr_dispatch()[0], lb)
+  mip = getattr(formulations, formulation)(data, head, tail, lb, ub)
+  A = sp.csr_matrix((mip.vals, (mip.rows, mip.cols)),
+                    shape=(mip.rhs.size, mip.lb.size))
+  res = milp(mip.obj,
+             constraints=LinearConstraint(
+               A, np.where(mip.sense == '<', -np.inf, mip.rhs),
+               np.where(mip.sense == '>', np.inf, mip.rhs)),
+             bounds=Bounds(mip.lb, mip.ub),
+             integrality=(mip.vtype != 'C').astype(int),
+             options=dict(time_limit=30))
+  assert res.status == 0
+  start, machine = mip_decode(data, mip, res.x)
+  return jsp.sol_from_arrays(
+    job=data.job_id[data.task_job].tolist(),
+    group=data.group_id[data.task_group].tolist(),
+    machine=data.machine_id[machine].tolist(),
+    start=start,
+    end=start + data.task_duration)
+
+
+@pytest.mark.parametrize('formulation', MIP_FORMULATIONS)
+def test_formulation_fjsp(fjsp, formulation):
+  sol = _milp(fjsp, formulation)
+  assert check_schedule(fjsp, sol) == _optimum(fjsp)
+
+
+def test_disjunctive_ft06(ft06):
+  assert check_schedule(ft06, _milp(ft06, 'disjunctive')) == FT06_OPTIMUM
+
+
+def test_formulation_name(ft06):
+  with pytest.raises(ValueError):
+    JSP(ft06).mp_create_model('big_m')
+
+
+@pytest.mark.parametrize('formulation', MIP_FORMULATIONS)
+def test_mp_create_model(fjsp, formulation):
+  pytest.importorskip('gurobipy')
+  jsp = JSP(fjsp)
+  sol = jsp.mp_create_model(formulation, solver='gurobi', max_sec=30)
+  assert sol is not None
+  assert check_schedule(fjsp, sol) == _optimum(fjsp)
+  assert jsp.mp_stats.counters['formulation'] == formulation
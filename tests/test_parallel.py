@@ -0,0 +1,92 @@
+import itertools
+
+import numpy as np
+import pytest
+
+from sched.parallel.heuristic import LIST_RULES, list_schedule, processing_time
+from sched.parallel.model import Parallel
+from conftest import CP_KWARGS
+
+
+def _check(problem, sol):
+  """a job once on a machine for its time, no overlap; the makespan"""
+  times = processing_time(problem.duration, problem.speed[sol.machine])
+  np.testing.assert_array_equal(sol.end - sol.start, times)
+  assert (sol.start >= 0).all()
+  for i in range(problem.n_machines):
+    on_i = np.flatnonzero(sol.machine == i)
+    order = on_i[np.argsort(sol.start[on_i], kind='stable')]
+    assert (sol.start[order][1:] >= sol.end[order][:-1]).all()
+  assert sol.makespan == int(sol.end.max(initial=0))
+  return sol.makespan
+
+
+def _optimum(problem):
+  """by enumeration of the assignments"""
+  times = processing_time(problem.duration[:, None], problem.speed[None, :])
+  best = None
+  for machine in itertools.product(range(problem.n_machines),
+                                   repeat=problem.n_jobs):
+    load = np.bincount(machine, weights=times[np.arange(problem.n_jobs),
+                                               machine],
+                       minlength=problem.n_machines)
+    best = load.max() if best is None else min(best, load.max())
+  return int(best)
+
+
+@pytest.mark.parametrize('speeds', [1, 3])
+@pytest.mark.parametrize('seed', range(3))
+def test_cp_optimum(speeds, seed):
+  problem = Parallel(*Parallel.rd_instance(7, 3, speeds=speeds, seed=seed))
+  problem.cp_create_model(**CP_KWARGS)
+  assert problem.cp_solver.StatusName(problem.cp_status) == 'OPTIMAL'
+  assert _check(problem, problem.cp_solution) == _optimum(problem)
+  assert problem.makespan_lb() <= problem.cp_solution.makespan \
+         <= problem.hr_solution.makespan
+
+
+@pytest.mark.parametrize('rule', LIST_RULES)
+def test_list_schedule(rule):
+  problem = Parallel(*Parallel.rd_instance(50, 4, speeds=3, seed=1))
+  _check(problem, problem.hr_create_sol(rule))
+
+
+def test_lpt_bound():
+  # Graham, LPT is within 4/3 - 1/(3m) of the optimum on identical machines
+  for seed in range(5):
+    problem = Parallel(*Parallel.rd_instance(8, 3, seed=seed))
+    lpt = problem.hr_create_sol('lpt').makespan
+    assert 3 * 3 * lpt <= (4 * 3 - 1) * _optimum(problem)
+
+
+def test_lpt_example():
+  # LPT gives 3 2 2 | 3 2, a makespan of 7, the optimum is 3 3 | 2 2 2
+  machine, start = list_schedule([3, 3, 2, 2, 2], [1, 1], rule='lpt')
+  np.testing.assert_array_equal(machine, [0, 1, 0, 1, 0])
+  np.testing.assert_array_equal(start, [0, 0, 3, 3, 5])
+
+
+def test_invalid():
+  with pytest.raises(ValueError):
+    Parallel([1, 2], [1, 0])
+  with pytest.raises(ValueError):
+    Parallel([1, -2], 2)
+  with pytest.raises(ValueError):
+    list_schedule([1, 2], [1], rule='edd')
+
+
+def test_dump_load(tmp_path):
+  problem = Parallel(*Parallel.rd_instance(10, 3, speeds=2, seed=0))
+  for protocol in ('pickle', 'numpy'):
+    fp, = problem.dump_instance(str(tmp_path), protocol=protocol)
+    duration, speed = Parallel.load_instance(fp)
+    np.testing.assert_array_equal(duration, problem.duration)
+    np.testing.assert_array_equal(speed, problem.speed)
+
+
+def test_zero_durations():
+  # more jobs of 0 than the horizon
+  problem = Parallel([0] * 10 + [1], 1)
+  problem.cp_create_model(**CP_KWARGS)
+  assert problem.cp_solver.StatusName(problem.cp_status) == 'OPTIMAL'
+  assert _check(problem, problem.cp_solution) == 1
@@ -0,0 +1,38 @@
+import multiprocessing
+
+import numpy as np
+
+from sched.jobshop.gantt import schedule_arrays
+from sched.jobshop.model import JSP
+from sched.jobshop.portfolio import _publish, pf_best, pf_shared, pf_tasks
+from conftest import FT06_OPTIMUM, check_schedule
+
+
+def test_pf_solve(ft06):
+  jsp = JSP(ft06)
+  sol = jsp.pf_solve(max_sec=20, strategies=['cp', 'cp_lns'])
+  assert check_schedule(ft06, sol) == FT06_OPTIMUM
+  assert jsp.pf_stats.counters['optimal']
+
+
+def test_pf_shared_schedule(fjsp):
+  jsp = JSP(fjsp)
+  sol = jsp.hr_create_sol('spt')
+  tasks = pf_tasks(fjsp)
+  task_start, task_machine = tasks(schedule_arrays(sol))
+  shared = pf_shared(
+    stop=multiprocessing.Event(),
+    best=multiprocessing.Value('q', sol.makespan + 1),
+    lb=multiprocessing.Value('q', 0),
+    start=multiprocessing.Array('q', np.zeros_like(task_start).tolist(),
+                                lock=False),
+    machine=multiprocessing.Array('q', np.zeros_like(task_machine).tolist(),
+                                  lock=False))
+  messages = multiprocessing.Queue()
+  assert _publish(shared, messages, 'spt', sol, tasks)
+  # not better than the best
+  assert not _publish(shared, messages, 'spt', sol, tasks)
+  assert messages.get(timeout=5)[:3] == ('solution', 'spt', sol.makespan)
+  best = pf_best(shared, fjsp)
+  assert np.array_equal(tasks(best)[0], task_start)
+  assert check_schedule(fjsp, jsp.sol_from_arrays(*best)) == sol.makespan
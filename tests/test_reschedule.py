@@ -0,0 +1,63 @@
+import numpy as np
+import pytest
+
+from sched.jobshop.gantt import schedule_arrays
+from sched.jobshop.model import JSP
+from conftest import CP_KWARGS, FT06_OPTIMUM, check_schedule
+
+
+def _tasks(sol):
+  job, group, machine, start, end = (np.asarray(v).tolist()
+                                     for v in schedule_arrays(sol))
+  return {(j, g): (m, s, e)
+          for j, g, m, s, e in zip(job, group, machine, start, end)}
+
+
+@pytest.fixture
+def solved(ft06):
+  jsp = JSP(ft06)
+  jsp.cp_create_model(**CP_KWARGS)
+  assert jsp.cp_solution.makespan == FT06_OPTIMUM
+  return jsp
+
+
+def test_freeze_before(solved):
+  before = _tasks(solved.cp_solution)
+  n = solved.freeze_before(20)
+  assert n == sum(s < 20 for _, s, _ in before.values())
+  sol = solved.cp_resolve(**CP_KWARGS)
+  assert check_schedule(solved.instance, sol) == FT06_OPTIMUM
+  for k, (m, s, e) in _tasks(sol).items():
+    if before[k][1] < 20:
+      assert (m, s, e) == before[k]
+    else:
+      assert s >= 20
+
+
+def test_add_jobs(solved, ft06):
+  rush = ft06.select_jobs([0, 1])
+  rush.job_id = np.array([100, 101])
+  solved.freeze_before(10)
+  solved.add_jobs(rush)
+  assert solved.instance.n_jobs == ft06.n_jobs + 2
+  sol = solved.cp_resolve(**CP_KWARGS)
+  assert check_schedule(solved.instance, sol) >= FT06_OPTIMUM
+  assert all(s >= 10 for (j, _), (_, s, _) in _tasks(sol).items()
+             if j >= 100)
+  with pytest.raises(ValueError):
+    solved.add_jobs(rush)
+
+
+def test_remove_machine(fjsp):
+  jsp = JSP(fjsp)
+  jsp.cp_create_model(**CP_KWARGS)
+  g = int(fjsp.group_id[np.argmax(fjsp.group_size)])
+  m_id = jsp.groups[g][0].idx
+  jsp.freeze_before(5)
+  at = jsp.remove_machine(g, m_id)
+  sol = jsp.cp_resolve(**CP_KWARGS)
+  check_schedule(fjsp, sol)
+  assert all(e <= at for (_, _g), (m, _, e) in _tasks(sol).items()
+             if (_g, m) == (g, m_id))
+  with pytest.raises(ValueError):
+    jsp.remove_machine(g, -1)
@@ -0,0 +1,12 @@
+from sched.jobshop.instance import JSPInstance
+from sched.jobshop.model import JSP
+from conftest import check_schedule
+
+
+def test_rh_solve():
+  instance = JSPInstance.rd_instance(12, 4, copy=2, seed=5)
+  jsp = JSP(instance)
+  sol = jsp.rh_solve(window=5, overlap=2, max_sec=5, num_workers=1,
+                     log_search_progress=False)
+  check_schedule(instance, sol)
+  assert sol.makespan <= jsp.hr_create_sol('best').makespan
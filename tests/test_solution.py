@@ -0,0 +1,41 @@
+import pickle
+
+import numpy as np
+
+from sched.jobshop.model import JSP
+from sched.jobshop.solution import JSPSchedule, evaluate
+from conftest import CP_KWARGS, check_schedule
+
+
+def test_evaluate():
+  values = np.array([5, 7, 0])
+  # a variable, a constant, 2 * x1 + 3
+  terms = np.array([[0, 1, 0], [-1, 0, 4], [1, 2, 3]])
+  np.testing.assert_array_equal(evaluate(values, terms), [5, 4, 17])
+
+
+def test_schedule_views(fjsp):
+  jsp = JSP(fjsp)
+  jsp.cp_create_model(**CP_KWARGS)
+  sol, solver, cp_vars = jsp.cp_solution, jsp.cp_solver, jsp.cp_vars
+  assert isinstance(sol, JSPSchedule)
+  check_schedule(fjsp, sol)
+  assert sol.makespan == solver.Value(cp_vars.makespan)
+  assert len(sol) == fjsp.n_tasks
+  for k, v in cp_vars.task_start.items():
+    assert sol.task_start[k] == solver.Value(v)
+    assert sol['task_end'][k] == solver.Value(cp_vars.task_end[k])
+  for k, v in cp_vars.task_opt_on_m.items():
+    assert sol.task_opt_on_m[k] == solver.Value(v)
+  # the rows are the machines used
+  assert set(zip(sol.job.tolist(), sol.group.tolist(),
+                 sol.machine.tolist())) \
+         == {k for k, v in sol.task_opt_on_m.items() if v}
+
+
+def test_schedule_pickle(ft06):
+  jsp = JSP(ft06)
+  jsp.cp_create_model(**CP_KWARGS)
+  sol = pickle.loads(pickle.dumps(jsp.cp_solution))
+  assert check_schedule(ft06, sol) == jsp.cp_solution.makespan
+  assert sol._asdict()['task_start'] == jsp.cp_solution.task_start
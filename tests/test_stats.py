@@ -0,0 +1,40 @@
+import json
+
+from sched.jobshop.model import JSP
+from sched.util.stats import PhaseStats
+from conftest import CP_KWARGS
+
+
+def test_phase_stats():
+  stats = PhaseStats('test')
+  for _ in range(2):
+    with stats.phase('a'):
+      pass
+  stats.count(n=3)
+  assert stats.phases['a']['calls'] == 2
+  assert stats.wall('a') == stats.wall() >= 0
+  assert stats.wall('b') == 0
+  assert json.loads(stats.to_json()) == stats.as_dict()
+
+
+def test_cp_stats(ft06, tmp_path):
+  fp = str(tmp_path / 'stats.jsonl')
+  jsp = JSP(ft06)
+  for _ in range(2):
+    jsp.cp_create_model(stats_fp=fp, **CP_KWARGS)
+  stats = jsp.cp_stats
+  assert {'bounds', 'variables', 'constraints', 'index', 'hints', 'solve',
+          'extract'} <= set(stats.phases)
+  assert all(v['calls'] >= 1 and v['wall'] >= 0
+             for v in stats.phases.values())
+  counters = stats.counters
+  assert counters['status'] == 'OPTIMAL'
+  assert counters['variables'] == len(jsp.cp_model.Proto().variables)
+  # the intervals apart
+  assert counters['constraints'] + counters['intervals'] \
+         == len(jsp.cp_model.Proto().constraints)
+  # a line per solve
+  with open(fp) as f:
+    lines = [json.loads(line) for line in f]
+  assert len(lines) == 2
+  assert lines[-1] == stats.as_dict()
@@ -0,0 +1,18 @@
+import numpy as np
+import pytest
+
+from sched.jobshop.instance import JSPInstance
+from sched.jobshop.store import JSPStore
+
+
+def test_store_round_trip(ft06, fjsp, tmp_path):
+  instances = [ft06, fjsp, JSPInstance.rd_instance(20, 5, copy=2, seed=0)]
+  store = JSPStore.write(str(tmp_path), iter(instances), chunk=7)
+  assert len(store) == 3
+  store = JSPStore(str(tmp_path))
+  for a, b in zip(store, instances):
+    for attr in JSPInstance.__slots__:
+      np.testing.assert_array_equal(getattr(a, attr), getattr(b, attr))
+  assert store[-1].fingerprint() == instances[-1].fingerprint()
+  with pytest.raises(IndexError):
+    store[3]
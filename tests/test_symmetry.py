@@ -0,0 +1,60 @@
+import pytest
+
+from sched.jobshop.gantt import schedule_arrays
+from sched.jobshop.model import JSP
+from conftest import CP_KWARGS, check_schedule
+
+
+@pytest.fixture
+def optimum(fjsp):
+  jsp = JSP(fjsp)
+  jsp.cp_create_model(**CP_KWARGS)
+  assert jsp.cp_solver.StatusName(jsp.cp_status) == 'OPTIMAL'
+  return jsp.cp_solution.makespan
+
+
+@pytest.mark.parametrize('symmetry', [True, 'first_use', 'load'])
+def test_same_optimum(fjsp, optimum, symmetry):
+  jsp = JSP(fjsp)
+  jsp.cp_create_model(symmetry=symmetry, **CP_KWARGS)
+  assert jsp.cp_stats.counters['symmetry_groups'] > 0
+  assert jsp.cp_solver.StatusName(jsp.cp_status) == 'OPTIMAL'
+  assert check_schedule(fjsp, jsp.cp_solution) == optimum
+
+
+@pytest.mark.parametrize('symmetry', ['first_use', 'load'])
+def test_symmetric_hint(fjsp, symmetry):
+  jsp = JSP(fjsp)
+  jsp.cp_create_model(symmetry=symmetry, solve=False)
+  # the schedule of the ub, the machines of each group in reverse
+  job, group, machine, start, end = schedule_arrays(jsp.hr_solution)
+  reverse = {(g, m.idx): m_list[-1 - k].idx
+             for g, m_list in jsp.groups.items()
+             for k, m in enumerate(m_list)}
+  sol = jsp.as_sol_dict(jsp.sol_from_arrays(
+    job, group, [reverse[k] for k in zip(group.tolist(), machine.tolist())],
+    start, end))
+  # not a solution under the symmetry as it is
+  _fix = dict(fix_variables_to_their_hinted_value=True)
+  jsp.cp_model.Proto().solution_hint.Clear()
+  jsp.cp_add_hints(jsp.cp_model, sol)
+  jsp.cp_solve(parameters=_fix, **CP_KWARGS)
+  assert jsp.cp_solver.StatusName(jsp.cp_status) == 'INFEASIBLE'
+  hint = jsp.cp_symmetric_sol(sol)
+  # the same schedule up to the labels of the machines
+  assert check_schedule(fjsp, jsp.cp_sol_container(**hint)) \
+         == sol['makespan']
+  assert hint['task_start'] == sol['task_start']
+  # the solver completes it with the hinted values fixed
+  jsp.cp_model.Proto().solution_hint.Clear()
+  jsp.cp_add_hints(jsp.cp_model, hint)
+  jsp.cp_solve(parameters=_fix, **CP_KWARGS)
+  assert jsp.cp_solver.StatusName(jsp.cp_status) in ('OPTIMAL', 'FEASIBLE')
+  assert jsp.cp_solution.makespan == sol['makespan']
+  assert jsp.cp_solution.task_opt_on_m == hint['task_opt_on_m']
+  assert jsp.cp_solution.task_start == hint['task_start']
+
+
+def test_symmetry_rule(fjsp):
+  with pytest.raises(ValueError):
+    JSP(fjsp).cp_create_model(symmetry='sorted', solve=False)
@@ -0,0 +1,50 @@
+import pytest
+
+from sched.jobshop.model import JSP
+from conftest import CP_KWARGS, check_schedule
+
+
+@pytest.fixture
+def incumbent(ft06):
+  jsp = JSP(ft06)
+  return jsp.hr_create_sol('spt')
+
+
+@pytest.mark.parametrize('bounds', [True, False])
+def test_hints(ft06, incumbent, bounds):
+  jsp = JSP(ft06)
+  jsp.cp_create_model(warm_start=incumbent, bounds=bounds, **CP_KWARGS)
+  proto = jsp.cp_model.Proto()
+  hints = dict(zip(proto.solution_hint.vars, proto.solution_hint.values))
+  assert len(hints) > ft06.n_tasks
+  makespan = jsp.cp_vars.makespan.Index()
+  assert hints[makespan] == incumbent.makespan
+  # the makespan is capped by the incumbent
+  assert proto.variables[makespan].domain[-1] == incumbent.makespan
+  for k, v in jsp.cp_vars.task_start.items():
+    assert hints[v.Index()] == incumbent.task_start[k]
+
+
+def _check_no_worse(ft06, incumbent, warm_start):
+  jsp = JSP(ft06)
+  jsp.cp_create_model(warm_start=warm_start, **CP_KWARGS)
+  assert check_schedule(ft06, jsp.cp_solution) <= incumbent.makespan
+
+
+def test_warm_start_file(ft06, incumbent, tmp_path):
+  fp = JSP(ft06).dump_solution(str(tmp_path), sol=incumbent)
+  _check_no_worse(ft06, incumbent, fp)
+
+
+def test_warm_start_fjsp(fjsp):
+  # the hint of a complete dispatching schedule is feasible
+  jsp = JSP(fjsp)
+  incumbent = jsp.hr_create_sol('mwkr')
+  _check_no_worse(fjsp, incumbent, incumbent._asdict())
+
+
+def test_warm_start_proto(ft06, incumbent, tmp_path):
+  jsp = JSP(ft06)
+  _check_no_worse(ft06, incumbent, jsp.sol_to_proto(incumbent))
+  fp = jsp.dump_solution(str(tmp_path), sol=incumbent, protocol='protobuf')
+  _check_no_worse(ft06, incumbent, fp)